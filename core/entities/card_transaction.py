@@ -0,0 +1,55 @@
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from core.entities.ids import uuid7
+from core.entities.slots import slotted
+
+
+class CardTransactionType(str, Enum):
+    """
+    Tipos de movimentação do cartão de transporte.
+    """
+    OPENING_BALANCE = "OPENING_BALANCE"  # Saldo existente antes do extrato
+    RECHARGE = "RECHARGE"  # Recarga
+    CHARGE = "CHARGE"  # Cobrança (passagem)
+
+
+@slotted
+@dataclass
+class CardTransaction:
+    """
+    Lançamento do extrato do cartão. O valor tem sinal (débitos negativos), então a soma
+    dos lançamentos de um cartão é igual ao saldo; balance_after é o saldo logo após o lançamento.
+    """
+    card_id: UUID
+    user_id: UUID
+    transaction_type: CardTransactionType
+    amount: Decimal
+    balance_after: Decimal
+    description: Optional[str] = None
+    id: UUID = None
+    created_at: datetime = None
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = uuid7()
+        if self.created_at is None:
+            self.created_at = datetime.now()
+
+    @classmethod
+    def from_row(cls, row) -> "CardTransaction":
+        """Cria o lançamento a partir de uma linha já persistida, sem passar pelo __post_init__"""
+        transaction = cls.__new__(cls)
+        transaction.id = row.id
+        transaction.card_id = row.card_id
+        transaction.user_id = row.user_id
+        transaction.transaction_type = row.transaction_type
+        transaction.amount = row.amount
+        transaction.balance_after = row.balance_after
+        transaction.description = row.description
+        transaction.created_at = row.created_at
+        return transaction
@@ -0,0 +1,38 @@
+from dataclasses import dataclass
+from decimal import Decimal
+from enum import Enum
+from typing import Optional
+from uuid import UUID
+
+from core.entities.slots import slotted
+
+
+class ChargeEventStatus(str, Enum):
+    """
+    Resultado de cada passagem de um lote enviado pelos validadores.
+    """
+    ACCEPTED = "accepted"  # Cobrada e lançada no extrato
+    INSUFFICIENT = "insufficient"  # Saldo insuficiente no momento da passagem
+    DUPLICATE = "duplicate"  # Evento já processado (reenvio do validador)
+    NOT_FOUND = "not_found"  # Usuário sem cartão de transporte
+
+
+@slotted
+@dataclass
+class ChargeEvent:
+    """
+    Passagem registrada no validador. O event_id é gerado no validador e vira o id do
+    lançamento no extrato, o que torna o reenvio do mesmo evento detectável.
+    """
+    event_id: UUID
+    user_id: UUID
+    amount: Decimal
+    description: Optional[str] = None
+
+
+@slotted
+@dataclass
+class ChargeEventResult:
+    event_id: UUID
+    status: ChargeEventStatus
+    balance: Optional[Decimal] = None
@@ -2,11 +2,15 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional, Any
 from uuid import UUID
-from uuid import uuid4
 from enum import Enum, auto
 from typing import List
 import logging
 
+from core.entities.ids import uuid7
+from core.entities.slots import slotted
+
+logger = logging.getLogger(__name__)
+
 
 class DocumentType(str, Enum):
     """
@@ -51,6 +55,7 @@ class DocumentType(str, Enum):
         return cls.OUTRO
 
 
+@slotted
 @dataclass
 class Document:
     user_id: UUID
@@ -63,7 +68,7 @@ class Document:
 
     def __post_init__(self):
         if self.id is None:
-            self.id = uuid4()
+            self.id = uuid7()
         if self.created_at is None:
             self.created_at = datetime.now()
         if self.updated_at is None:
@@ -73,4 +78,18 @@ class Document:
         if not isinstance(self.document_type, DocumentType):
             self.document_type = DocumentType(self.document_type)
 
-
+    @classmethod
+    def from_row(cls, row) -> "Document":
+        """
+        Cria o documento a partir de uma linha já persistida, sem gerar padrões nem
+        revalidar o tipo: a coluna é do enum documenttype e já chega como DocumentType.
+        """
+        document = cls.__new__(cls)
+        document.id = row.id
+        document.user_id = row.user_id
+        document.document_type = row.document_type
+        document.file_path = row.file_path
+        document.name = row.name
+        document.created_at = row.created_at
+        document.updated_at = row.updated_at
+        return document
@@ -0,0 +1,39 @@
+import os
+import threading
+import time
+from uuid import UUID
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+_COUNTER_MAX = 0xFFF
+_RAND_B_MASK = (1 << 62) - 1
+
+
+def uuid7() -> UUID:
+    """
+    UUID versão 7 (RFC 9562): 48 bits de timestamp em ms, seguidos de um contador de 12 bits
+    e 62 bits aleatórios.
+
+    Chaves geradas em sequência são crescentes, inclusive dentro do mesmo milissegundo
+    (o contador começa em um valor aleatório e é incrementado), então novos registros vão
+    para o fim do índice da chave primária em vez de espalhados pela B-tree.
+    """
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Metade inferior do intervalo: sobra espaço para incrementar no mesmo ms
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            # Mesmo ms (ou relógio voltou): mantém a ordem pelo contador
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                _last_ms += 1
+                _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        timestamp_ms, counter = _last_ms, _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & _RAND_B_MASK
+    return UUID(int=(timestamp_ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b)
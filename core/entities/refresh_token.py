@@ -0,0 +1,24 @@
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from core.entities.ids import uuid7
+
+
+@dataclass
+class RefreshToken:
+    user_id: UUID
+    token_hash: str
+    family_id: UUID
+    expires_at: datetime
+    id: UUID = None
+    created_at: datetime = None
+    revoked_at: Optional[datetime] = None
+    replaced_by_id: Optional[UUID] = None
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = uuid7()
+        if self.created_at is None:
+            self.created_at = datetime.now()
@@ -0,0 +1,21 @@
+from dataclasses import fields
+from typing import Type, TypeVar
+
+T = TypeVar("T")
+
+
+def slotted(cls: Type[T]) -> Type[T]:
+    """
+    Recria a dataclass com __slots__ declarados a partir dos seus campos, como faz
+    @dataclass(slots=True), que só existe a partir do Python 3.10. Deve ficar acima do
+    @dataclass; os valores padrão continuam no __init__ gerado.
+    """
+    names = tuple(field.name for field in fields(cls))
+    namespace = dict(cls.__dict__)
+    for name in names:
+        namespace.pop(name, None)
+    namespace.pop("__dict__", None)
+    namespace.pop("__weakref__", None)
+    namespace["__slots__"] = names
+    namespace["__qualname__"] = cls.__qualname__
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
@@ -1,10 +1,14 @@
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
-from uuid import UUID, uuid4
+from uuid import UUID
+
+from core.entities.ids import uuid7
+from core.entities.slots import slotted
 from decimal import Decimal
 from core.exceptions.transport_exceptions import InsufficientBalanceError, InvalidAmountError
 
+@slotted
 @dataclass
 class TransportCard:
     user_id: UUID
@@ -15,11 +19,22 @@ class TransportCard:
     
     def __post_init__(self):
         if self.id is None:
-            self.id = uuid4()
+            self.id = uuid7()
         if self.created_at is None:
             self.created_at = datetime.now()
         self.updated_at = self.created_at
     
+    @classmethod
+    def from_row(cls, row) -> "TransportCard":
+        """Cria o cartão a partir de uma linha já persistida, mantendo o updated_at do banco"""
+        transport_card = cls.__new__(cls)
+        transport_card.id = row.id
+        transport_card.user_id = row.user_id
+        transport_card.balance = row.balance
+        transport_card.created_at = row.created_at
+        transport_card.updated_at = row.updated_at
+        return transport_card
+    
     def add_balance(self, amount: Decimal) -> None:
         if amount <= Decimal('0'):
             raise InvalidAmountError("O valor deve ser maior que zero")
@@ -3,7 +3,9 @@ from datetime import datetime
 from typing import Optional
 from enum import Enum
 from uuid import UUID
-from uuid import uuid4
+
+from core.entities.ids import uuid7
+from core.entities.slots import slotted
 
 
 class AuthProvider(Enum):
@@ -12,6 +14,7 @@ class AuthProvider(Enum):
     FACEBOOK = "facebook"
 
 
+@slotted
 @dataclass
 class User:
     email: str
@@ -28,9 +31,28 @@ class User:
 
     def __post_init__(self):
         if self.id is None:
-            self.id = uuid4()
+            self.id = uuid7()
         if self.created_at is None:
             self.created_at = datetime.now()
         if self.updated_at is None:
             self.updated_at = datetime.now()
-    
+
+    @classmethod
+    def from_row(cls, row) -> "User":
+        """
+        Cria o usuário a partir de uma linha já persistida (ORM ou Core), sem passar
+        pelo __post_init__: todos os campos vêm do banco e não precisam de padrão.
+        """
+        user = cls.__new__(cls)
+        user.id = row.id
+        user.email = row.email
+        user.hashed_password = row.hashed_password
+        user.is_active = row.is_active
+        user.is_admin = row.is_admin
+        user.created_at = row.created_at
+        user.updated_at = row.updated_at
+        user.mfa_enabled = row.mfa_enabled
+        user.mfa_secret = row.mfa_secret
+        user.auth_provider = row.auth_provider
+        user.profile_picture = row.profile_picture
+        return user
@@ -0,0 +1,15 @@
+from .base import ApplicationError
+
+class IdempotencyError(ApplicationError):
+    """Erro base para requisições com Idempotency-Key"""
+    pass
+
+class IdempotencyKeyReuseError(IdempotencyError):
+    """A chave já foi usada com outra requisição (outro endpoint ou outro corpo)"""
+    def __init__(self, message: str = "Idempotency-Key já utilizada com uma requisição diferente"):
+        super().__init__(message)
+
+class IdempotencyKeyInProgressError(IdempotencyError):
+    """A chave foi registrada, mas a requisição original não gravou a resposta"""
+    def __init__(self, message: str = "Requisição com esta Idempotency-Key ainda em processamento"):
+        super().__init__(message)
@@ -20,9 +20,10 @@ class InvalidCredentialsError(UserError):
         super().__init__(message)
 
 class MFARequiredError(UserError):
-    def __init__(self, message: str = "Autenticação de múltiplos fatores (MFA) obrigatória", user_id: str = None):
+    def __init__(self, message: str = "Autenticação de múltiplos fatores (MFA) obrigatória", user_id: str = None, challenge_token: str = None):
         self.message = message
         self.user_id = user_id
+        self.challenge_token = challenge_token
         super().__init__(self.message)
 
 class InvalidMFACodeError(UserError):
@@ -30,6 +31,11 @@ class InvalidMFACodeError(UserError):
         self.message = message
         super().__init__(self.message)
 
+class InvalidMFAChallengeError(UserError):
+    """Token de desafio MFA inválido, expirado ou já utilizado"""
+    def __init__(self, message: str = "Desafio MFA inválido ou expirado"):
+        super().__init__(message)
+
 class MFAAlreadyEnabledError(UserError):
     def __init__(self, message: str = "MFA já está habilitado para este usuário"):
         self.message = message
@@ -38,4 +44,25 @@ class MFAAlreadyEnabledError(UserError):
 class MFANotEnabledError(UserError):
     def __init__(self, message: str = "MFA não está habilitado para este usuário"):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class PasswordHasherOverloadedError(UserError):
+    """Pool de hashing de senhas saturado"""
+    def __init__(self, message: str = "Serviço de autenticação sobrecarregado. Tente novamente em instantes"):
+        super().__init__(message)
+
+class InvalidRefreshTokenError(UserError):
+    """Refresh token inexistente, expirado ou revogado"""
+    def __init__(self, message: str = "Refresh token inválido ou expirado"):
+        super().__init__(message)
+
+class RefreshTokenReuseError(InvalidRefreshTokenError):
+    """Refresh token já rotacionado foi reutilizado"""
+    def __init__(self, message: str = "Refresh token reutilizado. Sessão revogada"):
+        super().__init__(message)
+
+class TooManyLoginAttemptsError(UserError):
+    """Limite de tentativas de login excedido"""
+    def __init__(self, message: str = "Muitas tentativas de login. Tente novamente mais tarde", retry_after: int = 60):
+        self.retry_after = retry_after
+        super().__init__(message)
\ No newline at end of file
@@ -1,11 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from datetime import datetime
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
 from uuid import UUID
 from decimal import Decimal
 
 from core.entities.user import User
 from core.entities.document import Document, DocumentType
 from core.entities.transport_card import TransportCard
+from core.entities.card_transaction import CardTransaction
+from core.entities.refresh_token import RefreshToken
 
 
 class UserRepository(ABC):
@@ -13,6 +16,11 @@ class UserRepository(ABC):
     async def create(self, user: User) -> User:
         pass
     
+    @abstractmethod
+    async def create_if_absent(self, user: User) -> Optional[User]:
+        """Cria o usuário se o email estiver livre; retorna None em caso de conflito"""
+        pass
+    
     @abstractmethod
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
         pass
@@ -25,6 +33,14 @@ class UserRepository(ABC):
     async def update(self, user: User) -> User:
         pass
     
+    @abstractmethod
+    async def update_password_hash(self, user_id: UUID, hashed_password: str) -> bool:
+        """
+        Atualização opcional do hash, isolada da transação em curso: uma falha é desfeita
+        sozinha e retorna False em vez de lançar exceção.
+        """
+        pass
+    
     @abstractmethod
     async def delete(self, user_id: UUID) -> bool:
         pass
@@ -59,4 +75,75 @@ class TransportCardRepository(ABC):
     
     @abstractmethod
     async def update(self, transport_card: TransportCard) -> TransportCard:
+        pass
+    
+    @abstractmethod
+    async def add_balance(self, user_id: UUID, amount: Decimal, description: Optional[str] = None) -> TransportCard:
+        """Soma ao saldo no próprio banco, criando o cartão na primeira recarga, e lança no extrato."""
+        pass
+    
+    @abstractmethod
+    async def deduct_balance(self, user_id: UUID, amount: Decimal, description: Optional[str] = None) -> Optional[TransportCard]:
+        """Debita no próprio banco se houver saldo e lança no extrato. Retorna None se não há cartão ou saldo suficiente."""
+        pass
+    
+    @abstractmethod
+    async def lock_by_user_ids(self, user_ids: Iterable[UUID]) -> Dict[UUID, TransportCard]:
+        """Cartões dos usuários (por user_id), bloqueados até o fim da transação."""
+        pass
+    
+    @abstractmethod
+    async def apply_charges(self, transport_cards: List[TransportCard], transactions: List[CardTransaction]) -> None:
+        """Grava os novos saldos e os lançamentos do extrato em lote, na transação atual."""
+        pass
+
+
+class CardTransactionRepository(ABC):
+    """Extrato do cartão (somente leitura: os lançamentos são gravados junto com o saldo)"""
+    
+    @abstractmethod
+    async def get_by_card_id(
+        self,
+        card_id: UUID,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[CardTransaction]:
+        """
+        Lançamentos mais recentes primeiro. before é a chave (created_at, id) do último
+        lançamento da página anterior; a página começa logo depois dele.
+        """
+        pass
+    
+    @abstractmethod
+    def stream_by_card_id(self, card_id: UUID) -> AsyncIterator[CardTransaction]:
+        """Todos os lançamentos, mais recentes primeiro, sem carregar o extrato inteiro em memória."""
+        pass
+    
+    @abstractmethod
+    async def get_existing_ids(self, transaction_ids: List[UUID]) -> Set[UUID]:
+        """Quais dos ids informados já estão no extrato."""
+        pass
+    
+    @abstractmethod
+    async def get_ledger_balance(self, card_id: UUID) -> Decimal:
+        """Soma dos lançamentos; deve ser igual ao saldo do cartão (auditoria)."""
+        pass
+
+
+class RefreshTokenRepository(ABC):
+    @abstractmethod
+    async def create(self, refresh_token: RefreshToken) -> RefreshToken:
+        pass
+    
+    @abstractmethod
+    async def get_by_token_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        pass
+    
+    @abstractmethod
+    async def revoke(self, token_id: UUID, replaced_by_id: Optional[UUID] = None) -> bool:
+        """Revoga o token se ainda estiver ativo. Retorna False se já estava revogado."""
+        pass
+    
+    @abstractmethod
+    async def revoke_family(self, family_id: UUID) -> int:
         pass
\ No newline at end of file
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from uuid import UUID
 
+from core.entities.user import User
+
 class PasswordHasher(ABC):
     @abstractmethod
     def hash_password(self, plain_password: str) -> str:
@@ -13,6 +15,21 @@ class PasswordHasher(ABC):
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
         """Verify if a plain password matches a hashed password"""
         pass
+    
+    @abstractmethod
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Check if a hash uses an outdated algorithm or cost factor"""
+        pass
+    
+    @abstractmethod
+    async def hash_password_async(self, plain_password: str) -> str:
+        """Hash a plain password without blocking the event loop"""
+        pass
+    
+    @abstractmethod
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        pass
 
 
 class TokenService(ABC):
@@ -39,8 +56,13 @@ class MFAService(ABC):
         pass
     
     @abstractmethod
-    def generate_qr_code(self, provisioning_uri: str) -> str:
-        """Generate a QR code as base64 string for the provisioning URI"""
+    def generate_qr_code(self, provisioning_uri: str, image_format: str = "png") -> str:
+        """Generate a QR code (png or svg) as base64 data URI for the provisioning URI"""
+        pass
+    
+    @abstractmethod
+    def release_setup(self, secret: str, email: str) -> None:
+        """Discard cached setup artifacts once the setup is verified or abandoned"""
         pass
     
     @abstractmethod
@@ -49,6 +71,23 @@ class MFAService(ABC):
         pass
     
     @abstractmethod
-    async def setup_mfa(self, email: str) -> dict:
-        """Setup MFA for a user and return the necessary information"""
-        pass
\ No newline at end of file
+    async def setup_mfa(self, email: str, image_format: str = "png", secret: Optional[str] = None) -> dict:
+        """Setup MFA for a user and return the necessary information; reuses `secret` when given (pending setup)"""
+        pass
+
+
+class MFAChallengeService(ABC):
+    @abstractmethod
+    def issue(self, user: User) -> str:
+        """Issue a short-lived signed token proving the password step succeeded"""
+        pass
+    
+    @abstractmethod
+    def resolve(self, challenge_token: str) -> Tuple[UUID, Optional[User]]:
+        """Validate a challenge token and return the user id and, if still held, the user snapshot"""
+        pass
+    
+    @abstractmethod
+    def discard(self, challenge_token: str) -> None:
+        """Discard a challenge after the second step succeeds"""
+        pass
@@ -1,11 +1,14 @@
 from uuid import UUID
+from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple
 
+from core.entities.card_transaction import CardTransaction, CardTransactionType
+from core.entities.charge_event import ChargeEvent, ChargeEventResult, ChargeEventStatus
 from core.entities.transport_card import TransportCard
 from core.exceptions.transport_exceptions import TransportCardNotFoundError, InvalidAmountError, InsufficientBalanceError
 from core.exceptions.user_exceptions import UserNotFoundError
-from core.interfaces.repositories import TransportCardRepository, UserRepository
+from core.interfaces.repositories import CardTransactionRepository, TransportCardRepository, UserRepository
 
 
 class GetTransportCardBalanceUseCase:
@@ -22,9 +25,8 @@ class GetTransportCardBalanceUseCase:
         # Buscar cartão de transporte
         transport_card = await self.transport_card_repository.get_by_user_id(user_id)
         if not transport_card:
-            # Se não existe, criar um cartão com saldo zero
-            transport_card = TransportCard(user_id=user_id, balance=Decimal('0.00'))
-            transport_card = await self.transport_card_repository.create(transport_card)
+            # Somente leitura (pode rodar na réplica): o cartão é criado na primeira recarga
+            return Decimal('0.00')
         
         return transport_card.balance
 
@@ -34,7 +36,7 @@ class RechargeTransportCardUseCase:
         self.transport_card_repository = transport_card_repository
         self.user_repository = user_repository
     
-    async def execute(self, user_id: UUID, amount: Decimal) -> TransportCard:
+    async def execute(self, user_id: UUID, amount: Decimal, description: Optional[str] = None) -> TransportCard:
         # Verificar se o valor é válido
         if amount <= Decimal('0'):
             raise InvalidAmountError("O valor de recarga deve ser maior que zero")
@@ -44,19 +46,8 @@ class RechargeTransportCardUseCase:
         if not user:
             raise UserNotFoundError()
         
-        # Buscar ou criar cartão de transporte
-        transport_card = await self.transport_card_repository.get_by_user_id(user_id)
-        if not transport_card:
-            transport_card = TransportCard(user_id=user_id, balance=Decimal('0.00'))
-            transport_card = await self.transport_card_repository.create(transport_card)
-        
-        # Adicionar saldo
-        transport_card.add_balance(amount)
-        
-        # Atualizar no repositório
-        updated_card = await self.transport_card_repository.update(transport_card)
-        
-        return updated_card
+        # Soma no banco, criando o cartão na primeira recarga
+        return await self.transport_card_repository.add_balance(user_id, amount, description)
 
 
 class ChargeTransportCardUseCase:
@@ -77,18 +68,111 @@ class ChargeTransportCardUseCase:
         if not user:
             raise UserNotFoundError()
         
-        # Buscar cartão de transporte
+        # Debita no banco somente se houver saldo (checagem e débito no mesmo statement)
+        updated_card = await self.transport_card_repository.deduct_balance(user_id, amount, description)
+        if updated_card is None:
+            # Caminho de falha: uma leitura a mais só para escolher o erro certo
+            transport_card = await self.transport_card_repository.get_by_user_id(user_id)
+            if not transport_card:
+                raise TransportCardNotFoundError("Usuário não possui cartão de transporte ativo")
+            raise InsufficientBalanceError(
+                f"Saldo insuficiente. Disponível: R$ {transport_card.balance}, Necessário: R$ {amount}"
+            )
+        
+        return updated_card
+
+class GetCardStatementUseCase:
+    """Extrato do cartão: páginas por chave (keyset) ou todos os lançamentos em streaming"""
+    
+    def __init__(self, transport_card_repository: TransportCardRepository, card_transaction_repository: CardTransactionRepository):
+        self.transport_card_repository = transport_card_repository
+        self.card_transaction_repository = card_transaction_repository
+    
+    async def get_card(self, user_id: UUID) -> TransportCard:
         transport_card = await self.transport_card_repository.get_by_user_id(user_id)
         if not transport_card:
             raise TransportCardNotFoundError("Usuário não possui cartão de transporte ativo")
+        return transport_card
+    
+    async def get_page(
+        self,
+        card_id: UUID,
+        limit: int,
+        before: Optional[Tuple[datetime, UUID]] = None
+    ) -> Tuple[List[CardTransaction], Optional[Tuple[datetime, UUID]]]:
+        """Devolve a página e a chave para a próxima (None na última página)"""
+        # Um lançamento a mais indica se há próxima página, sem COUNT
+        transactions = await self.card_transaction_repository.get_by_card_id(card_id, limit + 1, before)
+        if len(transactions) <= limit:
+            return transactions, None
+        
+        transactions = transactions[:limit]
+        last = transactions[-1]
+        return transactions, (last.created_at, last.id)
+    
+    def stream(self, card_id: UUID) -> AsyncIterator[CardTransaction]:
+        return self.card_transaction_repository.stream_by_card_id(card_id)
+
+
+class ChargeBatchUseCase:
+    """
+    Aplica um lote de passagens enviado pelos validadores em uma única transação.
+
+    Os cartões envolvidos são bloqueados de uma vez; a decisão de cada passagem é feita
+    em ordem, sobre o saldo corrente do cartão, e os saldos finais e os lançamentos são
+    gravados em lote no final.
+    """
+    
+    def __init__(self, transport_card_repository: TransportCardRepository, card_transaction_repository: CardTransactionRepository):
+        self.transport_card_repository = transport_card_repository
+        self.card_transaction_repository = card_transaction_repository
+    
+    async def execute(self, events: List[ChargeEvent]) -> List[ChargeEventResult]:
+        if any(event.amount <= Decimal('0') for event in events):
+            raise InvalidAmountError("O valor de cobrança deve ser maior que zero")
+        # Saldo e lançamentos são gravados como NUMERIC(10,2) em casts separados; um valor
+        # com mais casas seria arredondado de forma diferente em cada um e quebraria o extrato
+        if any(event.amount != event.amount.quantize(Decimal('0.01')) for event in events):
+            raise InvalidAmountError("O valor de cobrança deve ter no máximo duas casas decimais")
         
-        # Deduzir saldo (já faz as validações necessárias)
-        transport_card.deduct_balance(amount)
+        # Bloqueio antes da checagem de duplicados: um reenvio simultâneo do mesmo lote
+        # espera este terminar e então encontra os eventos já lançados
+        cards = await self.transport_card_repository.lock_by_user_ids({event.user_id for event in events})
+        seen = await self.card_transaction_repository.get_existing_ids([event.event_id for event in events])
         
-        # Atualizar no repositório
-        updated_card = await self.transport_card_repository.update(transport_card)
+        results = []
+        transactions = []
+        changed_cards = {}
+        for event in events:
+            if event.event_id in seen:
+                results.append(ChargeEventResult(event.event_id, ChargeEventStatus.DUPLICATE))
+                continue
+            seen.add(event.event_id)
+            
+            transport_card = cards.get(event.user_id)
+            if transport_card is None:
+                results.append(ChargeEventResult(event.event_id, ChargeEventStatus.NOT_FOUND))
+                continue
+            
+            try:
+                transport_card.deduct_balance(event.amount)
+            except InsufficientBalanceError:
+                results.append(ChargeEventResult(event.event_id, ChargeEventStatus.INSUFFICIENT, transport_card.balance))
+                continue
+            
+            changed_cards[transport_card.id] = transport_card
+            transactions.append(CardTransaction(
+                card_id=transport_card.id,
+                user_id=transport_card.user_id,
+                transaction_type=CardTransactionType.CHARGE,
+                amount=-event.amount,
+                balance_after=transport_card.balance,
+                description=event.description,
+                id=event.event_id
+            ))
+            results.append(ChargeEventResult(event.event_id, ChargeEventStatus.ACCEPTED, transport_card.balance))
         
-        # Aqui poderia ser registrado um histórico de transações
-        # em um repositório específico para isso
+        if transactions:
+            await self.transport_card_repository.apply_charges(list(changed_cards.values()), transactions)
         
-        return updated_card
\ No newline at end of file
+        return results
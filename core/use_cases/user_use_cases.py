@@ -1,15 +1,19 @@
 from datetime import timedelta, datetime, timezone
-from uuid import UUID
-from typing import Dict, Any, Optional
+from uuid import UUID, uuid4
+from typing import Dict, Any, Optional, Tuple
+import hashlib
 import logging
+import secrets
 
 from core.entities.user import User
+from core.entities.refresh_token import RefreshToken
 from core.exceptions.user_exceptions import (
     UserNotFoundError, UserAlreadyExistsError, InvalidCredentialsError,
-    MFARequiredError, InvalidMFACodeError, MFAAlreadyEnabledError, MFANotEnabledError
+    MFARequiredError, InvalidMFACodeError, MFAAlreadyEnabledError, MFANotEnabledError,
+    InvalidMFAChallengeError, PasswordHasherOverloadedError, InvalidRefreshTokenError, RefreshTokenReuseError
 )
-from core.interfaces.repositories import UserRepository
-from core.interfaces.security import PasswordHasher, TokenService, MFAService
+from core.interfaces.repositories import UserRepository, RefreshTokenRepository
+from core.interfaces.security import PasswordHasher, TokenService, MFAService, MFAChallengeService
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +25,9 @@ class RegisterUserUseCase:
     
     async def execute(self, email: str, password: str) -> User:
         try:
-            existing_user = await self.user_repository.get_by_email(email)
-            
-            if existing_user:
-                logger.warning(f"Tentativa de registro com email já existente: {email}")
-                raise UserAlreadyExistsError()
-            
-            hashed_password = self.password_hasher.hash_password(password)
+            # O hash é calculado antes de saber se o email existe: a unicidade é
+            # resolvida pelo próprio INSERT, sem consulta prévia
+            hashed_password = await self.password_hasher.hash_password_async(password)
             
             new_user = User(
                 email=email,
@@ -37,29 +37,65 @@ class RegisterUserUseCase:
                 created_at=datetime.now(timezone.utc)
             )
             
-            created_user = await self.user_repository.create(new_user)
+            created_user = await self.user_repository.create_if_absent(new_user)
+            
+            if created_user is None:
+                logger.warning(f"Tentativa de registro com email já existente: {email}")
+                raise UserAlreadyExistsError()
+            
             logger.info(f"Usuário criado com sucesso. ID: {created_user.id}")
             return created_user
                 
-        except UserAlreadyExistsError:
+        except (UserAlreadyExistsError, PasswordHasherOverloadedError):
             raise
         except Exception as e:
             logger.error(f"Erro durante registro: {str(e)}")
             raise
 
 
+def hash_refresh_token(refresh_token: str) -> str:
+    # Refresh tokens são aleatórios com alta entropia; SHA-256 basta e mantém a busca indexada
+    return hashlib.sha256(refresh_token.encode()).hexdigest()
+
+
+class IssueRefreshTokenUseCase:
+    def __init__(self, refresh_token_repository: RefreshTokenRepository, refresh_token_expire_days: int):
+        self.refresh_token_repository = refresh_token_repository
+        self.refresh_token_expire_days = refresh_token_expire_days
+    
+    async def execute(self, user_id: UUID, family_id: Optional[UUID] = None) -> Tuple[str, RefreshToken]:
+        """
+        Gera um novo refresh token opaco e persiste apenas o seu hash.
+        
+        Returns:
+            Tuple[str, RefreshToken]: Token em texto puro (nunca armazenado) e a entidade persistida
+        """
+        plain_token = secrets.token_urlsafe(48)
+        refresh_token = RefreshToken(
+            user_id=user_id,
+            token_hash=hash_refresh_token(plain_token),
+            family_id=family_id or uuid4(),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=self.refresh_token_expire_days)
+        )
+        
+        created = await self.refresh_token_repository.create(refresh_token)
+        return plain_token, created
+
+
 class LoginUserUseCase:
     def __init__(
         self, 
         user_repository: UserRepository, 
         password_hasher: PasswordHasher,
         token_service: TokenService,
-        access_token_expire_minutes: int
+        access_token_expire_minutes: int,
+        refresh_token_issuer: Optional[IssueRefreshTokenUseCase] = None
     ):
         self.user_repository = user_repository
         self.password_hasher = password_hasher
         self.token_service = token_service
         self.access_token_expire_minutes = access_token_expire_minutes
+        self.refresh_token_issuer = refresh_token_issuer
     
     async def execute(self, email: str, password: str) -> dict:
         try:
@@ -69,10 +105,12 @@ class LoginUserUseCase:
                 logger.warning(f"Usuário não encontrado: {email}")
                 raise InvalidCredentialsError()
             
-            if not self.password_hasher.verify_password(password, user.hashed_password):
+            if not await self.password_hasher.verify_password_async(password, user.hashed_password):
                 logger.warning(f"Senha incorreta: {email}")
                 raise InvalidCredentialsError()
             
+            await self._rehash_if_needed(user, password)
+            
             expires_delta = timedelta(minutes=self.access_token_expire_minutes)
             token_data = {"sub": str(user.id), "email": user.email}
             
@@ -83,16 +121,42 @@ class LoginUserUseCase:
             
             logger.info(f"Login bem-sucedido: {email}")
             
-            return {
+            response = {
                 "access_token": access_token,
                 "token_type": "bearer"
             }
+            
+            if self.refresh_token_issuer:
+                refresh_token, _ = await self.refresh_token_issuer.execute(user.id)
+                response["refresh_token"] = refresh_token
+            
+            return response
                 
-        except InvalidCredentialsError:
+        except (InvalidCredentialsError, PasswordHasherOverloadedError):
             raise
         except Exception as e:
             logger.error(f"Erro durante login: {str(e)}")
             raise
+    
+    async def _rehash_if_needed(self, user: User, password: str) -> None:
+        """
+        Refaz o hash com o custo atual quando o armazenado estiver desatualizado.
+        
+        Aproveita a senha em texto puro disponível no login; falhas aqui não impedem o login.
+        """
+        if not self.password_hasher.needs_rehash(user.hashed_password):
+            return
+        
+        try:
+            hashed_password = await self.password_hasher.hash_password_async(password)
+            # Gravação isolada (savepoint): uma falha não aborta a transação do login
+            if not await self.user_repository.update_password_hash(user.id, hashed_password):
+                logger.warning(f"Não foi possível atualizar o hash de senha de {user.id}")
+                return
+            user.hashed_password = hashed_password
+            logger.info(f"Hash de senha atualizado para o custo atual: {user.id}")
+        except Exception as e:
+            logger.warning(f"Não foi possível atualizar o hash de senha de {user.id}: {str(e)}")
 
 
 class GetUserUseCase:
@@ -121,7 +185,7 @@ class SetupMFAUseCase:
         self.user_repository = user_repository
         self.mfa_service = mfa_service
     
-    async def execute(self, user_id: UUID) -> dict:
+    async def execute(self, user_id: UUID, image_format: str = "png") -> dict:
         try:
             user = await self.user_repository.get_by_id(user_id)
             
@@ -133,10 +197,13 @@ class SetupMFAUseCase:
                 logger.warning(f"MFA já habilitado: {user_id}")
                 raise MFAAlreadyEnabledError()
             
-            mfa_setup_info = await self.mfa_service.setup_mfa(user.email)
+            # Configuração pendente (ainda não verificada): reaproveita o segredo, então o
+            # URI de provisionamento é o mesmo e o QR code sai do cache
+            mfa_setup_info = await self.mfa_service.setup_mfa(user.email, image_format, user.mfa_secret)
             
-            user.mfa_secret = mfa_setup_info["secret"]
-            await self.user_repository.update(user)
+            if user.mfa_secret != mfa_setup_info["secret"]:
+                user.mfa_secret = mfa_setup_info["secret"]
+                await self.user_repository.update(user)
             
             logger.info(f"MFA configurado: {user_id}")
             return mfa_setup_info
@@ -174,6 +241,7 @@ class VerifyMFAUseCase:
             if not user.mfa_enabled:
                 user.mfa_enabled = True
                 await self.user_repository.update(user)
+                self.mfa_service.release_setup(user.mfa_secret, user.email)
                 logger.info(f"MFA habilitado: {user_id}")
             
             return True
@@ -222,13 +290,17 @@ class LoginWithMFAUseCase:
         password_hasher: PasswordHasher,
         token_service: TokenService,
         mfa_service: MFAService,
-        access_token_expire_minutes: int
+        access_token_expire_minutes: int,
+        refresh_token_issuer: Optional[IssueRefreshTokenUseCase] = None,
+        challenge_service: Optional[MFAChallengeService] = None
     ):
         self.user_repository = user_repository
         self.password_hasher = password_hasher
         self.token_service = token_service
         self.mfa_service = mfa_service
         self.access_token_expire_minutes = access_token_expire_minutes
+        self.refresh_token_issuer = refresh_token_issuer
+        self.challenge_service = challenge_service
     
     async def execute(self, email: str, password: str, mfa_code: str) -> dict:
         try:
@@ -238,50 +310,90 @@ class LoginWithMFAUseCase:
                 logger.warning(f"Usuário não encontrado: {email}")
                 raise InvalidCredentialsError()
             
-            if not self.password_hasher.verify_password(password, user.hashed_password):
+            if not await self.password_hasher.verify_password_async(password, user.hashed_password):
                 logger.warning(f"Senha incorreta: {email}")
                 raise InvalidCredentialsError()
             
-            if not user.mfa_enabled or not user.mfa_secret:
-                logger.warning(f"MFA não habilitado: {email}")
-                raise MFANotEnabledError()
-            
-            is_valid = await self.mfa_service.verify_code(user.mfa_secret, mfa_code)
-            
-            if not is_valid:
-                logger.warning(f"Código MFA inválido: {email}")
-                raise InvalidMFACodeError()
-            
-            expires_delta = timedelta(minutes=self.access_token_expire_minutes)
-            token_data = {"sub": str(user.id), "email": user.email}
+            return await self._complete_login(user, mfa_code)
+                
+        except (InvalidCredentialsError, MFANotEnabledError, InvalidMFACodeError, PasswordHasherOverloadedError):
+            raise
+        except Exception as e:
+            logger.error(f"Erro durante login com MFA: {str(e)}")
+            raise
+    
+    async def execute_with_challenge(self, challenge_token: str, mfa_code: str) -> dict:
+        """
+        Segunda etapa do login a partir do desafio emitido por LoginFirstStepUseCase.
+        
+        A senha já foi verificada na primeira etapa, então não há um novo bcrypt; o usuário
+        vem do próprio desafio e só é buscado por id se o desafio foi emitido por outro worker.
+        """
+        try:
+            if not self.challenge_service:
+                raise InvalidMFAChallengeError()
             
-            access_token = self.token_service.create_access_token(
-                data=token_data, 
-                expires_delta=expires_delta
-            )
+            user_id, user = self.challenge_service.resolve(challenge_token)
+            if user is None:
+                user = await self.user_repository.get_by_id(user_id)
             
-            logger.info(f"Login com MFA bem-sucedido: {email}")
+            if not user or not user.is_active:
+                logger.warning(f"Desafio MFA de usuário inexistente ou inativo: {user_id}")
+                raise InvalidMFAChallengeError()
             
-            return {
-                "access_token": access_token,
-                "token_type": "bearer"
-            }
+            response = await self._complete_login(user, mfa_code)
+            self.challenge_service.discard(challenge_token)
+            return response
                 
-        except (InvalidCredentialsError, MFANotEnabledError, InvalidMFACodeError):
+        except (InvalidMFAChallengeError, MFANotEnabledError, InvalidMFACodeError):
             raise
         except Exception as e:
-            logger.error(f"Erro durante login com MFA: {str(e)}")
+            logger.error(f"Erro durante login com desafio MFA: {str(e)}")
             raise
+    
+    async def _complete_login(self, user: User, mfa_code: str) -> dict:
+        if not user.mfa_enabled or not user.mfa_secret:
+            logger.warning(f"MFA não habilitado: {user.email}")
+            raise MFANotEnabledError()
+        
+        is_valid = await self.mfa_service.verify_code(user.mfa_secret, mfa_code)
+        
+        if not is_valid:
+            logger.warning(f"Código MFA inválido: {user.email}")
+            raise InvalidMFACodeError()
+        
+        expires_delta = timedelta(minutes=self.access_token_expire_minutes)
+        token_data = {"sub": str(user.id), "email": user.email}
+        
+        access_token = self.token_service.create_access_token(
+            data=token_data, 
+            expires_delta=expires_delta
+        )
+        
+        logger.info(f"Login com MFA bem-sucedido: {user.email}")
+        
+        response = {
+            "access_token": access_token,
+            "token_type": "bearer"
+        }
+        
+        if self.refresh_token_issuer:
+            refresh_token, _ = await self.refresh_token_issuer.execute(user.id)
+            response["refresh_token"] = refresh_token
+        
+        return response
 
 
 class LoginFirstStepUseCase:
     def __init__(
         self, 
         user_repository: UserRepository, 
-        password_hasher: PasswordHasher
+        password_hasher: PasswordHasher,
+        challenge_service: Optional[MFAChallengeService] = None
     ):
         self.user_repository = user_repository
         self.password_hasher = password_hasher
+        self.challenge_service = challenge_service
     
     async def execute(self, email: str, password: str) -> UUID:
         try:
@@ -291,19 +403,100 @@ class LoginFirstStepUseCase:
                 logger.warning(f"Usuário não encontrado: {email}")
                 raise InvalidCredentialsError()
             
-            if not self.password_hasher.verify_password(password, user.hashed_password):
+            if not await self.password_hasher.verify_password_async(password, user.hashed_password):
                 logger.warning(f"Senha incorreta: {email}")
                 raise InvalidCredentialsError()
             
             if user.mfa_enabled:
                 logger.info(f"MFA requerido: {email}")
-                raise MFARequiredError(user.id)
+                challenge_token = self.challenge_service.issue(user) if self.challenge_service else None
+                raise MFARequiredError(user_id=user.id, challenge_token=challenge_token)
             
             logger.info(f"Primeira etapa do login bem-sucedida: {email}")
             return user.id
                 
-        except (InvalidCredentialsError, MFARequiredError):
+        except (InvalidCredentialsError, MFARequiredError, PasswordHasherOverloadedError):
             raise
         except Exception as e:
             logger.error(f"Erro durante primeira etapa do login: {str(e)}")
+            raise
+
+
+class RefreshAccessTokenUseCase:
+    def __init__(
+        self,
+        refresh_token_repository: RefreshTokenRepository,
+        user_repository: UserRepository,
+        token_service: TokenService,
+        refresh_token_issuer: IssueRefreshTokenUseCase,
+        access_token_expire_minutes: int
+    ):
+        self.refresh_token_repository = refresh_token_repository
+        self.user_repository = user_repository
+        self.token_service = token_service
+        self.refresh_token_issuer = refresh_token_issuer
+        self.access_token_expire_minutes = access_token_expire_minutes
+    
+    async def execute(self, refresh_token: str) -> dict:
+        """
+        Troca um refresh token válido por um novo access token, rotacionando o refresh token.
+        
+        A busca é feita pelo hash do token (índice único), sem nenhum hashing de senha.
+        Se um token já rotacionado for apresentado novamente, toda a família de tokens
+        é revogada, pois indica que o token vazou.
+        
+        Raises:
+            InvalidRefreshTokenError: Se o token não existir, estiver expirado ou o usuário estiver inativo
+            RefreshTokenReuseError: Se o token já tiver sido rotacionado ou revogado
+        """
+        try:
+            stored_token = await self.refresh_token_repository.get_by_token_hash(
+                hash_refresh_token(refresh_token)
+            )
+            
+            if not stored_token:
+                logger.warning("Refresh token não encontrado")
+                raise InvalidRefreshTokenError()
+            
+            if stored_token.revoked_at is not None:
+                logger.warning(f"Reuso de refresh token detectado: user_id={stored_token.user_id}")
+                await self.refresh_token_repository.revoke_family(stored_token.family_id)
+                raise RefreshTokenReuseError()
+            
+            if stored_token.expires_at <= datetime.now(timezone.utc):
+                logger.warning(f"Refresh token expirado: user_id={stored_token.user_id}")
+                raise InvalidRefreshTokenError()
+            
+            user = await self.user_repository.get_by_id(stored_token.user_id)
+            if not user or not user.is_active:
+                logger.warning(f"Refresh token de usuário inexistente ou inativo: {stored_token.user_id}")
+                raise InvalidRefreshTokenError()
+            
+            new_refresh_token, new_stored_token = await self.refresh_token_issuer.execute(
+                user.id, family_id=stored_token.family_id
+            )
+            
+            # Outra requisição rotacionou o mesmo token ao mesmo tempo: trata como reuso
+            if not await self.refresh_token_repository.revoke(stored_token.id, new_stored_token.id):
+                logger.warning(f"Rotação concorrente de refresh token: user_id={user.id}")
+                await self.refresh_token_repository.revoke_family(stored_token.family_id)
+                raise RefreshTokenReuseError()
+            
+            access_token = self.token_service.create_access_token(
+                data={"sub": str(user.id), "email": user.email},
+                expires_delta=timedelta(minutes=self.access_token_expire_minutes)
+            )
+            
+            logger.info(f"Access token renovado: {user.id}")
+            
+            return {
+                "access_token": access_token,
+                "token_type": "bearer",
+                "refresh_token": new_refresh_token
+            }
+        
+        except InvalidRefreshTokenError:
+            raise
+        except Exception as e:
+            logger.error(f"Erro ao renovar access token: {str(e)}")
             raise
\ No newline at end of file
@@ -1,8 +1,17 @@
+import base64
+import json
+import os
 from decimal import Decimal
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional, Tuple
 from uuid import UUID
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+from core.entities.card_transaction import CardTransactionType
+from core.entities.charge_event import ChargeEventStatus
+
+# Passagens aceitas por requisição no envio em lote dos validadores
+CHARGE_BATCH_MAX_EVENTS = int(os.getenv("CHARGE_BATCH_MAX_EVENTS", "10000"))
 
 
 class TransportCardRecharge(BaseModel):
@@ -29,6 +38,57 @@ class CardChargeRequest(BaseModel):
         }
 
 
+class CardChargeEvent(BaseModel):
+    event_id: UUID = Field(..., description="UUIDv7 da passagem gerado no validador no momento da leitura; reenvios com o mesmo id são ignorados")
+    user_id: UUID
+    amount: Decimal = Field(..., gt=0, max_digits=10, decimal_places=2, description="Valor a ser cobrado (deve ser positivo, com até duas casas decimais)")
+    description: Optional[str] = Field(None, max_length=100, description="Descrição da cobrança")
+
+    @field_validator("event_id")
+    @classmethod
+    def check_event_id_version(cls, event_id: UUID) -> UUID:
+        # Todas as passagens do lote são gravadas com o mesmo created_at, então o extrato
+        # as ordena pelo id: só um UUIDv7 (prefixo de timestamp) preserva a ordem de uso
+        if event_id.version != 7:
+            raise ValueError("event_id deve ser um UUIDv7")
+        return event_id
+
+
+class CardChargeBatchRequest(BaseModel):
+    events: List[CardChargeEvent] = Field(..., min_length=1, max_length=CHARGE_BATCH_MAX_EVENTS)
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "events": [
+                    {
+                        "event_id": "01929f4e-8a3b-7c2d-9e1f-123456789abc",
+                        "user_id": "3fa85f64-5717-4562-b3fc-2c963f66afa6",
+                        "amount": 4.40,
+                        "description": "Catraca linha 42"
+                    }
+                ]
+            }
+        }
+
+
+class CardChargeEventResult(BaseModel):
+    event_id: UUID
+    status: ChargeEventStatus
+    balance: Optional[Decimal] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CardChargeBatchResponse(BaseModel):
+    results: List[CardChargeEventResult]
+    accepted: int
+    insufficient: int
+    duplicate: int
+    not_found: int
+
+
 class TransportCardResponse(BaseModel):
     id: UUID
     user_id: UUID
@@ -48,4 +108,38 @@ class TransportCardBalanceResponse(BaseModel):
             "example": {
                 "balance": 135.60
             }
-        }
\ No newline at end of file
+        }
+
+
+class CardTransactionResponse(BaseModel):
+    id: UUID
+    transaction_type: CardTransactionType
+    amount: Decimal
+    balance_after: Decimal
+    description: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class CardStatementResponse(BaseModel):
+    items: List[CardTransactionResponse]
+    next_cursor: Optional[str] = Field(None, description="Cursor da próxima página (ausente na última)")
+
+
+def encode_statement_cursor(key: Tuple[datetime, UUID]) -> str:
+    """Cursor opaco com a chave (created_at, id) do último lançamento da página"""
+    created_at, transaction_id = key
+    payload = json.dumps([created_at.isoformat(), str(transaction_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_statement_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """Inverso de encode_statement_cursor; ValueError se o cursor for inválido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, transaction_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), UUID(transaction_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor de paginação inválido") from e
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, model_validator
 
 from core.entities.user import AuthProvider
 
@@ -39,6 +39,11 @@ class UserResponse(UserBase):
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    refresh_token: str = Field(..., min_length=1)
 
 
 class MFASetupResponse(BaseModel):
@@ -57,10 +62,18 @@ class MFAVerifyResponse(BaseModel):
 
 
 class MFALoginRequest(BaseModel):
-    email: EmailStr
-    password: str
+    """Segunda etapa do login: challenge_token de /auth/check-mfa ou email e senha"""
+    email: Optional[EmailStr] = None
+    password: Optional[str] = None
+    challenge_token: Optional[str] = None
     mfa_code: str = Field(..., min_length=6, max_length=6, pattern=r"^[0-9]+$")
 
+    @model_validator(mode="after")
+    def check_credentials(self):
+        if not self.challenge_token and not (self.email and self.password):
+            raise ValueError("Informe challenge_token ou email e senha")
+        return self
+
 
 class OAuthUserInfo(BaseModel):
     email: EmailStr
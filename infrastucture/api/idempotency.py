@@ -0,0 +1,217 @@
+import hashlib
+import logging
+import os
+import random
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional, Tuple
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities.slots import slotted
+from core.exceptions.idempotency_exceptions import IdempotencyKeyInProgressError, IdempotencyKeyReuseError
+
+logger = logging.getLogger(__name__)
+
+# Por quanto tempo uma Idempotency-Key devolve a resposta original
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", "86400"))
+# Respostas mantidas em memória por processo na frente da tabela (0 desabilita)
+IDEMPOTENCY_CACHE_MAX_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_MAX_SIZE", "10000"))
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+
+def request_fingerprint(operation: str, payload: BaseModel) -> str:
+    """Digest da operação e do corpo: a mesma chave com outra requisição é recusada"""
+    return hashlib.sha256(f"{operation}\n{payload.model_dump_json()}".encode()).hexdigest()
+
+
+@slotted
+@dataclass
+class StoredResponse:
+    request_hash: str
+    status_code: int
+    body: Any
+    expires_at: float
+
+    def to_response(self) -> JSONResponse:
+        return JSONResponse(status_code=self.status_code, content=self.body, headers={REPLAYED_HEADER: "true"})
+
+
+class IdempotencyCache:
+    """
+    Cache LRU em memória das respostas já gravadas, na frente da tabela idempotency_keys.
+
+    Só recebe respostas de transações já confirmadas: uma entrada no cache nunca
+    corresponde a uma operação que foi desfeita. As entradas expiram junto com a chave.
+    """
+
+    def __init__(self, max_size: int = IDEMPOTENCY_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[UUID, str], StoredResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: UUID, key: str) -> Optional[StoredResponse]:
+        if self.max_size <= 0:
+            return None
+
+        entry = self._entries.get((user_id, key))
+        if entry is None:
+            self.misses += 1
+            return None
+
+        if entry.expires_at <= time.time():
+            del self._entries[(user_id, key)]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end((user_id, key))
+        self.hits += 1
+        return entry
+
+    def set(self, user_id: UUID, key: str, stored: StoredResponse) -> None:
+        if self.max_size <= 0 or stored.expires_at <= time.time():
+            return
+
+        self._entries[(user_id, key)] = stored
+        self._entries.move_to_end((user_id, key))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class IdempotencyStore:
+    """
+    Idempotency-Key das operações de saldo, gravada na mesma transação da operação.
+
+    begin() reserva a chave com um INSERT ... ON CONFLICT: uma requisição repetida em
+    paralelo espera a primeira terminar no índice único e então encontra a resposta
+    gravada. complete() grava a resposta e faz o commit junto com a alteração do saldo;
+    se a operação falhar, o rollback libera a chave e a próxima tentativa executa de novo.
+    """
+
+    CLAIM_QUERY = text("""
+        INSERT INTO idempotency_keys (user_id, key, request_hash, expires_at)
+        VALUES (:user_id, :key, :request_hash, :expires_at)
+        ON CONFLICT (user_id, key) DO UPDATE SET
+            request_hash = EXCLUDED.request_hash,
+            status_code = NULL,
+            response = NULL,
+            created_at = now(),
+            expires_at = EXCLUDED.expires_at
+        WHERE idempotency_keys.expires_at <= now()
+        RETURNING user_id
+    """)
+
+    SELECT_QUERY = text("""
+        SELECT request_hash, status_code, response, expires_at
+        FROM idempotency_keys
+        WHERE user_id = :user_id AND key = :key
+    """)
+
+    COMPLETE_QUERY = text("""
+        UPDATE idempotency_keys SET status_code = :status_code, response = CAST(:response AS JSONB)
+        WHERE user_id = :user_id AND key = :key
+    """)
+
+    # Remoção em lotes das chaves expiradas; SKIP LOCKED evita fila entre requisições
+    CLEANUP_QUERY = text("""
+        DELETE FROM idempotency_keys
+        WHERE ctid = ANY(ARRAY(
+            SELECT ctid FROM idempotency_keys
+            WHERE expires_at < now()
+            LIMIT :batch_size
+            FOR UPDATE SKIP LOCKED
+        ))
+    """)
+
+    def __init__(
+        self,
+        cache: Optional[IdempotencyCache] = None,
+        ttl_seconds: int = IDEMPOTENCY_KEY_TTL_SECONDS,
+        cleanup_probability: float = 0.01,
+        cleanup_batch_size: int = 1000
+    ):
+        self.cache = cache if cache is not None else IdempotencyCache()
+        self.ttl_seconds = ttl_seconds
+        self.cleanup_probability = cleanup_probability
+        self.cleanup_batch_size = cleanup_batch_size
+        self.replayed = 0
+
+    async def begin(self, session: AsyncSession, user_id: UUID, key: str, request_hash: str) -> Optional[StoredResponse]:
+        """
+        Devolve a resposta gravada para repetir, ou None se a chave foi reservada agora
+        e a operação deve ser executada.
+        """
+        stored = self.cache.get(user_id, key)
+        if stored is None:
+            expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+            result = await session.execute(
+                self.CLAIM_QUERY,
+                {"user_id": user_id, "key": key, "request_hash": request_hash, "expires_at": expires_at}
+            )
+            if result.first() is not None:
+                if random.random() < self.cleanup_probability:
+                    await session.execute(self.CLEANUP_QUERY, {"batch_size": self.cleanup_batch_size})
+                return None
+
+            row = (await session.execute(self.SELECT_QUERY, {"user_id": user_id, "key": key})).one()
+            if row.status_code is None:
+                raise IdempotencyKeyInProgressError()
+            stored = StoredResponse(row.request_hash, row.status_code, row.response, row.expires_at.timestamp())
+            # Linha já confirmada por outra transação: pode ir para o cache
+            self.cache.set(user_id, key, stored)
+
+        if stored.request_hash != request_hash:
+            raise IdempotencyKeyReuseError()
+
+        self.replayed += 1
+        logger.info(f"Repetindo resposta da Idempotency-Key {key} do usuário {user_id}")
+        return stored
+
+    async def complete(
+        self,
+        session: AsyncSession,
+        user_id: UUID,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        response: BaseModel
+    ) -> None:
+        """Grava a resposta e confirma a transação da requisição (operação e chave juntas)"""
+        await session.execute(
+            self.COMPLETE_QUERY,
+            {"user_id": user_id, "key": key, "status_code": status_code, "response": response.model_dump_json()}
+        )
+        await session.commit()
+
+        self.cache.set(user_id, key, StoredResponse(
+            request_hash, status_code, response.model_dump(mode="json"), time.time() + self.ttl_seconds
+        ))
+
+    def get_stats(self) -> dict:
+        return {
+            "ttl_seconds": self.ttl_seconds,
+            "replayed": self.replayed,
+            "cache": self.cache.get_stats(),
+        }
+
+
+idempotency_store = IdempotencyStore()
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body, Form
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Form, Query, Request
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text, select
 import os
+import hashlib
 import logging
 from typing import Optional
 from uuid import UUID
@@ -12,23 +13,29 @@ from datetime import timedelta
 from infrastucture.api.dtos.user_dtos import (
     UserCreate, UserLogin, TokenResponse, 
     MFASetupResponse, MFAVerifyRequest, MFAVerifyResponse,
-    MFALoginRequest
+    MFALoginRequest, RefreshTokenRequest
 )
 from infrastucture.database.session import get_db
 from infrastucture.database.models import UserModel
 from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
+from infrastucture.repositories.refresh_token_repository import SQLAlchemyRefreshTokenRepository
 from infrastucture.security.password import BCryptPasswordHasher
 from infrastucture.security.token import JWTTokenService
 from infrastucture.security.mfa import PyOTPMFAService
+from infrastucture.security.mfa_challenge import get_mfa_challenge_service
 from infrastucture.security.dependencies import get_current_user
+from infrastucture.security.rate_limiter import client_ip, login_throttle
 from core.use_cases.user_use_cases import (
     RegisterUserUseCase, LoginUserUseCase, 
     SetupMFAUseCase, VerifyMFAUseCase, DisableMFAUseCase, 
-    LoginWithMFAUseCase, LoginFirstStepUseCase
+    LoginWithMFAUseCase, LoginFirstStepUseCase,
+    IssueRefreshTokenUseCase, RefreshAccessTokenUseCase
 )
 from core.exceptions.user_exceptions import (
     UserAlreadyExistsError, InvalidCredentialsError, 
-    MFARequiredError, InvalidMFACodeError, MFAAlreadyEnabledError, MFANotEnabledError
+    MFARequiredError, InvalidMFACodeError, MFAAlreadyEnabledError, MFANotEnabledError,
+    InvalidMFAChallengeError, PasswordHasherOverloadedError, InvalidRefreshTokenError,
+    RefreshTokenReuseError, TooManyLoginAttemptsError
 )
 from core.entities.user import User
 
@@ -38,6 +45,13 @@ load_dotenv()
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
+
+def build_refresh_token_issuer(db: AsyncSession) -> IssueRefreshTokenUseCase:
+    return IssueRefreshTokenUseCase(
+        SQLAlchemyRefreshTokenRepository(db),
+        int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+    )
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
 async def register_user(
     user_data: UserCreate,
@@ -73,6 +87,13 @@ async def register_user(
             status_code=status.HTTP_409_CONFLICT,
             detail=str(e)
         )
+    except PasswordHasherOverloadedError as e:
+        logger.warning(f"Pool de hashing saturado: {user_data.email}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Erro no registro: {str(e)}")
         
@@ -99,11 +120,14 @@ async def register_user(
 @router.post("/login", response_model=TokenResponse)
 async def login_user(
     login_data: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     try:
         logger.info(f"Tentativa de login: {login_data.email}")
         
+        await login_throttle.check(login_data.email, client_ip(request))
+        
         user_repository = SQLAlchemyUserRepository(db)
         password_hasher = BCryptPasswordHasher()
         token_service = JWTTokenService()
@@ -112,7 +136,8 @@ async def login_user(
             user_repository, 
             password_hasher, 
             token_service, 
-            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+            build_refresh_token_issuer(db)
         )
         
         login_result = await login_use_case.execute(login_data.email, login_data.password)
@@ -126,6 +151,19 @@ async def login_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
+    except TooManyLoginAttemptsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except PasswordHasherOverloadedError as e:
+        logger.warning(f"Pool de hashing saturado: {login_data.email}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Erro no login: {str(e)}")
         raise HTTPException(
@@ -136,6 +174,7 @@ async def login_user(
 
 @router.post("/token", response_model=TokenResponse)
 async def login_for_access_token(
+    request: Request,
     username: str = Form(...),
     password: str = Form(...),
     grant_type: str = Form("password", pattern="^password$"),
@@ -154,6 +193,8 @@ async def login_for_access_token(
                 headers={"WWW-Authenticate": "Bearer"}
             )
         
+        await login_throttle.check(username, client_ip(request))
+        
         user_repository = SQLAlchemyUserRepository(db)
         password_hasher = BCryptPasswordHasher()
         token_service = JWTTokenService()
@@ -162,7 +203,8 @@ async def login_for_access_token(
             user_repository, 
             password_hasher, 
             token_service, 
-            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+            build_refresh_token_issuer(db)
         )
         
         try:
@@ -184,6 +226,19 @@ async def login_for_access_token(
             detail="Credenciais inválidas",
             headers={"WWW-Authenticate": "Bearer"}
         )
+    except TooManyLoginAttemptsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except PasswordHasherOverloadedError as e:
+        logger.warning(f"Pool de hashing saturado: {username}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -194,8 +249,55 @@ async def login_for_access_token(
         )
 
 
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_access_token(
+    refresh_data: RefreshTokenRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Troca um refresh token por um novo access token, sem reenviar a senha.
+    
+    O refresh token apresentado é rotacionado: a resposta traz um novo refresh token
+    e o anterior deixa de ser aceito. Reutilizar um token já rotacionado revoga
+    todos os tokens da mesma sessão.
+    """
+    try:
+        refresh_use_case = RefreshAccessTokenUseCase(
+            SQLAlchemyRefreshTokenRepository(db),
+            SQLAlchemyUserRepository(db),
+            JWTTokenService(),
+            build_refresh_token_issuer(db),
+            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+        )
+        
+        return await refresh_use_case.execute(refresh_data.refresh_token)
+    
+    except RefreshTokenReuseError as e:
+        # Persistir a revogação da família mesmo respondendo com erro
+        await db.commit()
+        logger.warning("Reuso de refresh token, sessão revogada")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    except InvalidRefreshTokenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e),
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    except Exception as e:
+        logger.error(f"Erro ao renovar token: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro interno do servidor: {str(e)}"
+        )
+
+
 @router.post("/mfa/setup", response_model=MFASetupResponse)
 async def setup_mfa(
+    qr_format: str = Query("png", pattern="^(png|svg)$"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -210,7 +312,7 @@ async def setup_mfa(
         user_repository = SQLAlchemyUserRepository(db)
         
         setup_use_case = SetupMFAUseCase(user_repository, mfa_service)
-        setup_info = await setup_use_case.execute(current_user.id)
+        setup_info = await setup_use_case.execute(current_user.id, qr_format)
         
         logger.info(f"Configuração MFA iniciada: {current_user.id}")
         return setup_info
@@ -324,10 +426,15 @@ async def disable_mfa(
 @router.post("/mfa/login", response_model=TokenResponse)
 async def login_with_mfa(
     login_data: MFALoginRequest,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     try:
-        logger.info(f"Tentativa de login MFA: {login_data.email}")
+        logger.info(f"Tentativa de login MFA: {login_data.email or 'desafio'}")
+        
+        # Com desafio, o limite por "email" é aplicado ao próprio desafio
+        throttle_key = login_data.email or hashlib.sha256(login_data.challenge_token.encode()).hexdigest()
+        await login_throttle.check(throttle_key, client_ip(request))
         
         user_repository = SQLAlchemyUserRepository(db)
         password_hasher = BCryptPasswordHasher()
@@ -339,16 +446,24 @@ async def login_with_mfa(
             password_hasher,
             token_service,
             mfa_service,
-            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+            int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30")),
+            build_refresh_token_issuer(db),
+            get_mfa_challenge_service()
         )
         
-        login_result = await login_mfa_use_case.execute(
-            login_data.email, 
-            login_data.password, 
-            login_data.mfa_code
-        )
+        if login_data.challenge_token:
+            login_result = await login_mfa_use_case.execute_with_challenge(
+                login_data.challenge_token,
+                login_data.mfa_code
+            )
+        else:
+            login_result = await login_mfa_use_case.execute(
+                login_data.email, 
+                login_data.password, 
+                login_data.mfa_code
+            )
         
-        logger.info(f"Login MFA bem-sucedido: {login_data.email}")
+        logger.info(f"Login MFA bem-sucedido: {login_data.email or 'desafio'}")
         return login_result
     
     except InvalidCredentialsError:
@@ -357,6 +472,12 @@ async def login_with_mfa(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
+    except InvalidMFAChallengeError as e:
+        logger.warning("Desafio MFA inválido ou expirado")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=str(e)
+        )
     except MFANotEnabledError as e:
         logger.warning(f"MFA não habilitado: {login_data.email}")
         raise HTTPException(
@@ -369,6 +490,19 @@ async def login_with_mfa(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Código MFA inválido"
         )
+    except TooManyLoginAttemptsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except PasswordHasherOverloadedError as e:
+        logger.warning(f"Pool de hashing saturado: {login_data.email}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Erro ao realizar login MFA: {str(e)}")
         raise HTTPException(
@@ -380,15 +514,22 @@ async def login_with_mfa(
 @router.post("/check-mfa", response_model=dict)
 async def check_mfa_status(
     login_data: UserLogin,
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ):
     try:
         logger.info(f"Verificando status MFA: {login_data.email}")
         
+        await login_throttle.check(login_data.email, client_ip(request))
+        
         user_repository = SQLAlchemyUserRepository(db)
         password_hasher = BCryptPasswordHasher()
         
-        first_step_use_case = LoginFirstStepUseCase(user_repository, password_hasher)
+        first_step_use_case = LoginFirstStepUseCase(
+            user_repository,
+            password_hasher,
+            get_mfa_challenge_service()
+        )
         
         try:
             user_id = await first_step_use_case.execute(login_data.email, login_data.password)
@@ -401,7 +542,8 @@ async def check_mfa_status(
             logger.info(f"MFA requerido: {login_data.email}")
             return {
                 "mfa_required": True,
-                "user_id": str(mfa_error.user_id)
+                "user_id": str(mfa_error.user_id),
+                "challenge_token": mfa_error.challenge_token
             }
         except InvalidCredentialsError:
             logger.warning(f"Credenciais inválidas: {login_data.email}")
@@ -410,6 +552,19 @@ async def check_mfa_status(
                 detail="Credenciais inválidas"
             )
     
+    except TooManyLoginAttemptsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except PasswordHasherOverloadedError as e:
+        logger.warning(f"Pool de hashing saturado: {login_data.email}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Erro ao verificar status MFA: {str(e)}")
         raise HTTPException(
@@ -8,7 +8,7 @@ from typing import List, Set, Dict, Any
 from uuid import UUID
 
 from infrastucture.api.dtos.document_dtos import DocumentResponse
-from infrastucture.database.session import get_db
+from infrastucture.database.session import get_db, get_read_db, get_read_only_db
 from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
 from infrastucture.repositories.document_repository import SQLAlchemyDocumentRepository
 from infrastucture.security.dependencies import get_current_user
@@ -187,7 +187,7 @@ async def create_document(
 @router.get("/", response_model=List[DocumentResponse])
 async def get_user_documents(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtém todos os documentos do usuário atual.
@@ -221,7 +221,7 @@ async def get_user_documents(
 async def get_document_info(
     document_id: UUID = Path(..., description="ID do documento a ser visualizado"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Obtém informações de um documento específico.
@@ -272,7 +272,7 @@ async def get_document_info(
 async def download_document(
     document_id: UUID = Path(..., description="ID do documento a ser baixado"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_only_db)
 ):
     """
     Faz o download do arquivo de um documento específico.
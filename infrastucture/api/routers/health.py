@@ -3,7 +3,12 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 
-from infrastucture.database.session import get_db
+from infrastucture.api.idempotency import idempotency_store
+from infrastucture.database.base import engine, read_engine
+from infrastucture.database.pool import get_pool_stats
+from infrastucture.database.session import get_read_only_db, replica_monitor
+from infrastucture.security.password import get_password_hashing_service
+from infrastucture.security.rate_limiter import login_throttle
 
 router = APIRouter(
     prefix="/health",
@@ -16,7 +21,7 @@ async def health_check():
     return {"status": "ok", "message": "API is running"}
 
 @router.get("/db")
-async def db_check(db: AsyncSession = Depends(get_db)):
+async def db_check(db: AsyncSession = Depends(get_read_only_db)):
     try:
         # Testar conexão com o banco de dados
         result = await db.execute(text("SELECT 1"))
@@ -31,4 +36,32 @@ async def db_check(db: AsyncSession = Depends(get_db)):
         return JSONResponse(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             content={"status": "error", "database": "error", "message": f"Database error: {str(e)}"}
-        ) 
\ No newline at end of file
+        ) 
+
+@router.get("/db/pool")
+async def db_pool_stats():
+    # Conexões em uso, ociosas e em overflow, e tempo de espera por uma conexão
+    return {
+        "status": "ok",
+        "pool": get_pool_stats(engine),
+        "replica_pool": get_pool_stats(read_engine) if read_engine else None,
+        "replica": replica_monitor.get_stats()
+    }
+
+
+@router.get("/password-hasher")
+async def password_hasher_stats():
+    # Profundidade de fila, rejeições e latência do pool de bcrypt
+    return {"status": "ok", "password_hasher": get_password_hashing_service().get_stats()}
+
+
+@router.get("/rate-limit")
+async def rate_limit_stats():
+    # Tentativas de login aceitas e rejeitadas (por email e por IP)
+    return {"status": "ok", "login_throttle": login_throttle.get_stats()}
+
+
+@router.get("/idempotency")
+async def idempotency_stats():
+    # Respostas repetidas por Idempotency-Key e acertos do cache em memória
+    return {"status": "ok", "idempotency": idempotency_store.get_stats()}
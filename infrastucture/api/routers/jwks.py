@@ -0,0 +1,22 @@
+import os
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+from infrastucture.security.jwt_keys import get_jwt_key_store
+
+# Servido na raiz (fora do prefixo da API), como esperado por gateways e outros serviços
+router = APIRouter(tags=["auth"])
+
+JWKS_CACHE_MAX_AGE = int(os.getenv("JWKS_CACHE_MAX_AGE", "300"))
+
+@router.get("/.well-known/jwks.json")
+async def get_jwks():
+    """
+    Chaves públicas usadas para verificar os access tokens emitidos pela API.
+    
+    Cada chave é identificada pelo `kid` presente no cabeçalho do JWT.
+    """
+    return JSONResponse(
+        content=get_jwt_key_store().jwks(),
+        headers={"Cache-Control": f"public, max-age={JWKS_CACHE_MAX_AGE}"}
+    )
\ No newline at end of file
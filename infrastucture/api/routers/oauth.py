@@ -16,6 +16,7 @@ from infrastucture.security.token import JWTTokenService
 from core.use_cases.user_use_cases import RegisterUserUseCase
 from infrastucture.security.password import BCryptPasswordHasher
 from core.entities.user import AuthProvider
+from core.exceptions.user_exceptions import PasswordHasherOverloadedError
 from infrastucture.api.dtos.user_dtos import OAuthUserInfo
 
 logger = logging.getLogger(__name__)
@@ -139,6 +140,13 @@ async def process_oauth_user(
             "provider": oauth_user_info.provider.value
         })
     
+    except PasswordHasherOverloadedError as e:
+        logger.warning(f"Pool de hashing saturado: {oauth_user_info.email}")
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(e)},
+            headers={"Retry-After": "1"}
+        )
     except Exception as e:
         logger.error(f"Erro ao processar usuário OAuth: {str(e)}")
         return JSONResponse(
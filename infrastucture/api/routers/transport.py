@@ -1,17 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Body
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Header, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
+from typing import AsyncIterator, Optional
+from uuid import UUID
 import logging
 
-from infrastucture.api.dtos.transport_dtos import TransportCardRecharge, TransportCardResponse, TransportCardBalanceResponse, CardChargeRequest
-from infrastucture.database.session import get_db
+from infrastucture.api.dtos.transport_dtos import (
+    TransportCardRecharge, TransportCardResponse, TransportCardBalanceResponse, CardChargeRequest,
+    CardTransactionResponse, CardStatementResponse, encode_statement_cursor, decode_statement_cursor,
+    CardChargeBatchRequest, CardChargeBatchResponse, CardChargeEventResult
+)
+from infrastucture.api.idempotency import IDEMPOTENCY_KEY_MAX_LENGTH, idempotency_store, request_fingerprint
+from infrastucture.database.session import get_db, get_read_db
 from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
 from infrastucture.repositories.transport_card_repository import SQLAlchemyTransportCardRepository
+from infrastucture.repositories.card_transaction_repository import SQLAlchemyCardTransactionRepository
 from infrastucture.security.dependencies import get_current_user
 from core.entities.user import User
-from core.use_cases.transport_card_use_cases import GetTransportCardBalanceUseCase, RechargeTransportCardUseCase, ChargeTransportCardUseCase
+from core.entities.charge_event import ChargeEvent, ChargeEventStatus
+from core.use_cases.transport_card_use_cases import (
+    GetTransportCardBalanceUseCase, RechargeTransportCardUseCase, ChargeTransportCardUseCase, GetCardStatementUseCase,
+    ChargeBatchUseCase
+)
 from core.exceptions.transport_exceptions import TransportCardNotFoundError, InvalidAmountError, InsufficientBalanceError
 from core.exceptions.user_exceptions import UserNotFoundError
+from core.exceptions.idempotency_exceptions import IdempotencyKeyInProgressError, IdempotencyKeyReuseError
 
 logger = logging.getLogger(__name__)
 
@@ -20,7 +34,7 @@ router = APIRouter(prefix="/transport", tags=["transport"])
 @router.get("/card/balance", response_model=TransportCardBalanceResponse)
 async def get_transport_card_balance(
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Consulta o saldo do cartão de transporte do usuário.
@@ -69,13 +83,16 @@ async def get_transport_card_balance(
 async def recharge_transport_card(
     recharge_data: TransportCardRecharge,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=IDEMPOTENCY_KEY_MAX_LENGTH)
 ):
     """
     Recarrega o cartão de transporte do usuário.
     
     ## Parâmetros:
     - **amount**: Valor a ser recarregado (mínimo R$ 5,00)
+    - **Idempotency-Key** (header, opcional): repetições com a mesma chave devolvem a resposta
+      original sem recarregar de novo
     
     ## Retorna:
     - Informações do cartão após a recarga, incluindo o novo saldo
@@ -94,6 +111,13 @@ async def recharge_transport_card(
                 detail="O valor mínimo de recarga é R$ 5,00"
             )
         
+        # Repetição de uma recarga já feita: devolve a resposta gravada sem tocar no saldo
+        request_hash = request_fingerprint("recharge", recharge_data)
+        if idempotency_key:
+            stored = await idempotency_store.begin(db, current_user.id, idempotency_key, request_hash)
+            if stored:
+                return stored.to_response()
+        
         # Repositórios
         user_repository = SQLAlchemyUserRepository(db)
         transport_card_repository = SQLAlchemyTransportCardRepository(db)
@@ -103,7 +127,10 @@ async def recharge_transport_card(
         transport_card = await recharge_use_case.execute(current_user.id, recharge_data.amount)
         
         logger.info(f"Recarga realizada com sucesso. Novo saldo: {transport_card.balance}")
-        return transport_card
+        response = TransportCardResponse.model_validate(transport_card)
+        if idempotency_key:
+            await idempotency_store.complete(db, current_user.id, idempotency_key, request_hash, status.HTTP_200_OK, response)
+        return response
     
     except UserNotFoundError as e:
         logger.error(f"Usuário não encontrado: {str(e)}")
@@ -117,6 +144,17 @@ async def recharge_transport_card(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except IdempotencyKeyReuseError as e:
+        logger.warning(f"Idempotency-Key reutilizada com outra requisição: {idempotency_key}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except IdempotencyKeyInProgressError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erro ao processar recarga: {str(e)}")
         raise HTTPException(
@@ -129,7 +167,8 @@ async def recharge_transport_card(
 async def charge_transport_card(
     charge_data: CardChargeRequest,
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=IDEMPOTENCY_KEY_MAX_LENGTH)
 ):
     """
     Simula o pagamento de uma passagem usando o cartão de transporte.
@@ -137,6 +176,8 @@ async def charge_transport_card(
     ## Parâmetros:
     - **amount**: Valor a ser cobrado (por exemplo, R$ 4,40 para uma passagem de ônibus)
     - **description**: Descrição da cobrança (opcional)
+    - **Idempotency-Key** (header, opcional): repetições com a mesma chave devolvem a resposta
+      original sem cobrar de novo
     
     ## Retorna:
     - Informações do cartão após a cobrança, incluindo o novo saldo
@@ -148,6 +189,13 @@ async def charge_transport_card(
     try:
         logger.info(f"Processando cobrança para usuário {current_user.id}: {charge_data.amount}, {charge_data.description}")
         
+        # Repetição de uma cobrança já feita: devolve a resposta gravada sem tocar no saldo
+        request_hash = request_fingerprint("charge", charge_data)
+        if idempotency_key:
+            stored = await idempotency_store.begin(db, current_user.id, idempotency_key, request_hash)
+            if stored:
+                return stored.to_response()
+        
         # Repositórios
         user_repository = SQLAlchemyUserRepository(db)
         transport_card_repository = SQLAlchemyTransportCardRepository(db)
@@ -161,7 +209,10 @@ async def charge_transport_card(
         )
         
         logger.info(f"Cobrança realizada com sucesso. Novo saldo: {transport_card.balance}")
-        return transport_card
+        response = TransportCardResponse.model_validate(transport_card)
+        if idempotency_key:
+            await idempotency_store.complete(db, current_user.id, idempotency_key, request_hash, status.HTTP_200_OK, response)
+        return response
     
     except UserNotFoundError as e:
         logger.error(f"Usuário não encontrado: {str(e)}")
@@ -187,9 +238,164 @@ async def charge_transport_card(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e)
         )
+    except IdempotencyKeyReuseError as e:
+        logger.warning(f"Idempotency-Key reutilizada com outra requisição: {idempotency_key}")
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except IdempotencyKeyInProgressError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
     except Exception as e:
         logger.error(f"Erro ao processar cobrança: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao processar cobrança: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+def _statement_use_case(db: AsyncSession) -> GetCardStatementUseCase:
+    return GetCardStatementUseCase(SQLAlchemyTransportCardRepository(db), SQLAlchemyCardTransactionRepository(db))
+
+
+async def _stream_statement_ndjson(card_id: UUID) -> AsyncIterator[str]:
+    # Sessão própria: a da dependência pode ser fechada antes de o corpo terminar de ser enviado
+    async for db in get_read_db():
+        async for transaction in _statement_use_case(db).stream(card_id):
+            yield CardTransactionResponse.model_validate(transaction).model_dump_json() + "\n"
+
+
+@router.get("/card/transactions", response_model=CardStatementResponse)
+async def get_card_transactions(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="next_cursor da página anterior"),
+    response_format: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    user_id: Optional[UUID] = Query(None, description="Usuário consultado (somente administradores)"),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Extrato do cartão de transporte, lançamentos mais recentes primeiro.
+    
+    ## Parâmetros:
+    - **limit**: Lançamentos por página (1 a 200)
+    - **cursor**: Cursor devolvido em next_cursor para buscar a página seguinte
+    - **format**: json (paginado) ou ndjson (extrato completo em streaming, um lançamento por linha)
+    - **user_id**: Consulta o extrato de outro usuário (suporte; requer administrador)
+    
+    ## Retorna:
+    - Página de lançamentos e o cursor da próxima página, ou o extrato completo em NDJSON
+    
+    ## Requer:
+    - Autenticação via token JWT (Bearer)
+    """
+    target_user_id = user_id or current_user.id
+    if target_user_id != current_user.id and not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem consultar o extrato de outro usuário"
+        )
+    
+    try:
+        before = decode_statement_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    
+    try:
+        logger.info(f"Consultando extrato do cartão para usuário: {target_user_id} ({response_format})")
+        
+        # Caso de uso
+        statement_use_case = _statement_use_case(db)
+        transport_card = await statement_use_case.get_card(target_user_id)
+        
+        if response_format == "ndjson":
+            return StreamingResponse(_stream_statement_ndjson(transport_card.id), media_type="application/x-ndjson")
+        
+        transactions, next_key = await statement_use_case.get_page(transport_card.id, limit, before)
+        return CardStatementResponse(
+            items=[CardTransactionResponse.model_validate(transaction) for transaction in transactions],
+            next_cursor=encode_statement_cursor(next_key) if next_key else None
+        )
+    
+    except TransportCardNotFoundError as e:
+        logger.error(f"Cartão de transporte não encontrado: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erro ao consultar extrato: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar solicitação: {str(e)}"
+        )
+
+
+@router.post("/card/charges/batch", response_model=CardChargeBatchResponse)
+async def charge_transport_cards_batch(
+    batch: CardChargeBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Aplica em lote as passagens acumuladas pelos validadores (catracas).
+    
+    ## Parâmetros:
+    - **events**: Passagens na ordem em que ocorreram, cada uma com event_id, user_id, amount e description.
+      O event_id deve ser um UUIDv7 gerado no validador no momento da passagem: os lançamentos do
+      lote compartilham o created_at e o extrato os ordena pelo id
+    
+    ## Retorna:
+    - Resultado de cada passagem, na ordem enviada: accepted (com o saldo após a cobrança),
+      insufficient (com o saldo disponível), duplicate (event_id já processado) ou not_found
+      (usuário sem cartão), e os totais por resultado
+    
+    ## Requer:
+    - Autenticação via token JWT (Bearer) de um administrador (conta do validador)
+    """
+    if not current_user.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Apenas administradores podem enviar lotes de passagens"
+        )
+    
+    try:
+        logger.info(f"Processando lote de {len(batch.events)} passagens")
+        
+        # Caso de uso: um bloqueio dos cartões, uma checagem de duplicados e uma gravação por lote
+        charge_batch_use_case = ChargeBatchUseCase(SQLAlchemyTransportCardRepository(db), SQLAlchemyCardTransactionRepository(db))
+        results = await charge_batch_use_case.execute([
+            ChargeEvent(event.event_id, event.user_id, event.amount, event.description) for event in batch.events
+        ])
+        
+        counts = {event_status: 0 for event_status in ChargeEventStatus}
+        for result in results:
+            counts[result.status] += 1
+        logger.info(f"Lote processado: {counts[ChargeEventStatus.ACCEPTED]} de {len(results)} passagens aceitas")
+        
+        return CardChargeBatchResponse(
+            results=[CardChargeEventResult.model_validate(result) for result in results],
+            accepted=counts[ChargeEventStatus.ACCEPTED],
+            insufficient=counts[ChargeEventStatus.INSUFFICIENT],
+            duplicate=counts[ChargeEventStatus.DUPLICATE],
+            not_found=counts[ChargeEventStatus.NOT_FOUND]
+        )
+    
+    except InvalidAmountError as e:
+        logger.error(f"Valor de cobrança inválido no lote: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Erro ao processar lote de passagens: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Erro ao processar lote de passagens: {str(e)}"
+        )
@@ -1,32 +1,147 @@
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy import orm
+from sqlalchemy import orm, event
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.dml import UpdateBase
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.sql.selectable import CTE
 import os
+import uuid
 from dotenv import load_dotenv
 import logging
 
+from .pool import TimedAsyncAdaptedQueuePool
+
 # Configurar logger
 logger = logging.getLogger(__name__)
 
 # Carregar variáveis de ambiente
 load_dotenv()
 
-# Configurações do banco de dados - Valores fixos para ambiente de desenvolvimento
-DB_USER = "carteira"
-DB_PASSWORD = "carteira123"
+# Configurações do banco de dados (padrões para o ambiente de desenvolvimento)
+DB_USER = os.getenv("DB_USER", "carteira")
+DB_PASSWORD = os.getenv("DB_PASSWORD", "carteira123")
 # Em ambiente de contêiner Docker, usar "db" como host
 # Em ambiente de desenvolvimento local, usar "localhost"
 DB_HOST = os.getenv("DB_HOST", "db")
 if os.getenv("TESTING", "False").lower() == "true":
     DB_HOST = "localhost"  # Forçar localhost para testes
-DB_PORT = "5432"
-DB_NAME = "carteira_db"
+DB_PORT = os.getenv("DB_PORT", "5432")
+DB_NAME = os.getenv("DB_NAME", "carteira_db")
+
+DATABASE_URL = os.getenv(
+    "DATABASE_URL",
+    f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+)
+
+# Pool de conexões por worker: (DB_POOL_SIZE + DB_MAX_OVERFLOW) x workers deve ficar
+# abaixo do max_connections do Postgres
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+DB_ECHO = os.getenv("DB_ECHO", os.getenv("DEBUG", "False")).lower() == "true"
+
+# "session": conexão direta ao Postgres (ou PgBouncer em pool_mode=session)
+# "transaction": PgBouncer em pool_mode=transaction; desliga o cache de prepared statements
+# e o pool local, já que cada transação pode cair em outro backend
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "session").lower()
+if DB_POOL_MODE not in ("session", "transaction"):
+    raise ValueError(f"DB_POOL_MODE inválido: {DB_POOL_MODE} (use 'session' ou 'transaction')")
 
-DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Réplica de leitura opcional (vazio = leituras vão para o primário)
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL", "")
 
 logger.info(f"Conectando ao banco de dados em: {DB_HOST}:{DB_PORT}")
 
-engine = create_async_engine(DATABASE_URL, echo=True if os.getenv('DEBUG', 'False').lower() == 'true' else False)
-async_session = sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
-Base = orm.declarative_base()
\ No newline at end of file
+def _unique_statement_name() -> str:
+    return f"__asyncpg_{uuid.uuid4()}__"
+
+
+def transaction_pooler_connect_args() -> dict:
+    """
+    connect_args do asyncpg para um pooler em modo transação.
+
+    Nomes de prepared statement únicos evitam colisão entre clientes que compartilham o
+    mesmo backend, e sem cache nenhum statement preparado em uma transação é reutilizado
+    em outra (que pode estar em outro backend).
+    """
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": _unique_statement_name,
+    }
+
+
+def build_engine(url: str, pool_name: str, pool_mode: str = DB_POOL_MODE):
+    if pool_mode == "transaction":
+        # O PgBouncer já faz o pool; manter conexões ociosas aqui só prenderia clientes dele
+        return create_async_engine(
+            url,
+            echo=DB_ECHO,
+            poolclass=NullPool,
+            pool_logging_name=pool_name,
+            connect_args=transaction_pooler_connect_args()
+        )
+
+    return create_async_engine(
+        url,
+        echo=DB_ECHO,
+        poolclass=TimedAsyncAdaptedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        pool_logging_name=pool_name
+    )
+
+
+class WriteTrackingSession(orm.Session):
+    """Session que registra em `info["has_writes"]` se algum statement de escrita foi executado"""
+
+
+def _has_dml_cte(statement) -> bool:
+    """SELECT com CTE de escrita (WITH x AS (UPDATE ... RETURNING) SELECT ...) também é escrita"""
+    ctes = list(getattr(statement, "_independent_ctes", ()))
+    ctes += [from_ for from_ in statement.get_final_froms() if isinstance(from_, CTE)]
+    return any(isinstance(cte.element, UpdateBase) for cte in ctes)
+
+
+@event.listens_for(WriteTrackingSession, "do_orm_execute")
+def _track_execute(orm_execute_state):
+    statement = orm_execute_state.statement
+    if isinstance(statement, TextClause):
+        is_read = statement.text.lstrip().upper().startswith("SELECT")
+    else:
+        is_read = orm_execute_state.is_select and not _has_dml_cte(statement)
+    if not is_read:
+        orm_execute_state.session.info["has_writes"] = True
+
+
+@event.listens_for(WriteTrackingSession, "after_flush")
+def _track_flush(session, flush_context):
+    session.info["has_writes"] = True
+
+
+def session_has_writes(session: AsyncSession) -> bool:
+    return bool(session.info.get("has_writes") or session.new or session.dirty or session.deleted)
+
+
+def build_sessionmaker(bind, read_only: bool = False):
+    if read_only:
+        # BEGIN READ ONLY no próprio início da transação (asyncpg), sem round-trip extra
+        bind = bind.execution_options(postgresql_readonly=True)
+    return sessionmaker(bind, class_=AsyncSession, sync_session_class=WriteTrackingSession, expire_on_commit=False)
+
+
+engine = build_engine(DATABASE_URL, "primary")
+async_session = build_sessionmaker(engine)
+read_only_session = build_sessionmaker(engine, read_only=True)
+
+read_engine = build_engine(DATABASE_READ_URL, "replica") if DATABASE_READ_URL else None
+read_async_session = build_sessionmaker(read_engine, read_only=True) if read_engine else None
+
+Base = orm.declarative_base()
@@ -1,148 +1,115 @@
-import logging
 import asyncio
-from sqlalchemy.ext.asyncio import AsyncSession
+import hashlib
+import logging
+from typing import Callable, Dict, List, Tuple
+
 from sqlalchemy import text
+from sqlalchemy.engine import Connection
 
 from core.entities.document import DocumentType
 
 logger = logging.getLogger(__name__)
 
-async def ensure_document_type_enum(db_session: AsyncSession):
+# Chave do advisory lock que serializa os passos de schema entre deploys/processos concorrentes
+SCHEMA_STEPS_LOCK_ID = 0x63617274  # "cart"
+
+
+def document_type_enum_version() -> str:
+    """Versão do enum derivada dos valores no código: muda sempre que um tipo é adicionado"""
+    values = ",".join(e.value for e in DocumentType)
+    return hashlib.sha256(values.encode()).hexdigest()[:16]
+
+
+def ensure_document_type_enum(connection: Connection) -> None:
     """
-    Garante que o enum DocumentType no banco de dados tenha todos os valores necessários.
-    Cria o enum se não existir ou o atualiza se estiver desatualizado.
-    
-    Também corrige automaticamente documentos com valores de enum inválidos.
+    Garante que o enum documenttype no banco tenha todos os valores de DocumentType.
+    Cria o tipo se não existir e adiciona os valores que faltarem.
     """
-    try:
-        logger.info("Verificando e atualizando o enum DocumentType no banco de dados")
-        
-        # Verificar se o tipo documenttype existe
-        check_query = text("SELECT EXISTS (SELECT 1 FROM pg_type WHERE typname = 'documenttype') as exists")
-        result = await db_session.execute(check_query)
-        row = result.fetchone()
-        
-        enum_exists = row[0] if row else False
-        
-        # Obter todos os valores do enum no código
-        enum_values = [e.value for e in DocumentType]
+    enum_values = [e.value for e in DocumentType]
+
+    result = connection.execute(text("""
+        SELECT e.enumlabel
+        FROM pg_type t
+        LEFT JOIN pg_enum e ON e.enumtypid = t.oid
+        WHERE t.typname = 'documenttype'
+    """))
+    rows = result.fetchall()
+
+    if not rows:
+        logger.info("Enum DocumentType não encontrado, criando...")
         values_str = "', '".join(enum_values)
-        
-        if enum_exists:
-            logger.info("Enum DocumentType encontrado, verificando valores")
-            
-            # Verificar se precisamos atualizar
-            check_values_query = text("""
-                SELECT e.enumlabel
-                FROM pg_enum e
-                JOIN pg_type t ON e.enumtypid = t.oid
-                WHERE t.typname = 'documenttype'
-            """)
-            result = await db_session.execute(check_values_query)
-            existing_values = [row[0] for row in result.fetchall()]
-            
-            # Verificar se há valores faltando
-            missing_values = [v for v in enum_values if v not in existing_values]
-            
-            if missing_values:
-                logger.warning(f"Valores faltando no enum: {missing_values}")
-                
-                # Estratégia mais abrangente:
-                # 1. Criar função de conversão segura
-                # 2. Criar um tipo temporário com todos os valores
-                # 3. Converter dados existentes para o novo tipo
-                # 4. Substituir o tipo antigo pelo novo
-                
-                # Criar função de conversão segura para o enum
-                await db_session.execute(text(f"""
-                    CREATE OR REPLACE FUNCTION text_to_documenttype(text) RETURNS documenttype AS $$
-                    BEGIN
-                        BEGIN
-                            RETURN $1::documenttype;
-                        EXCEPTION WHEN OTHERS THEN
-                            RETURN 'OUTRO'::documenttype;
-                        END;
-                    END;
-                    $$ LANGUAGE plpgsql IMMUTABLE;
-                """))
-                
-                # Corrigir documentos existentes com valores inválidos
-                # Verificar se a tabela documents existe
-                table_exists_query = text("""
-                    SELECT EXISTS (
-                        SELECT FROM information_schema.tables 
-                        WHERE table_schema = 'public' AND table_name = 'documents'
-                    ) as exists
-                """)
-                result = await db_session.execute(table_exists_query)
-                table_exists = result.fetchone()[0]
-                
-                if table_exists:
-                    try:
-                        # Listar valores válidos para a cláusula IN
-                        valid_values = "', '".join(existing_values)
-                        
-                        # Verificar se há documentos com valores inválidos
-                        check_invalid_docs = text(f"""
-                            SELECT COUNT(*) FROM documents 
-                            WHERE CAST(document_type AS TEXT) NOT IN ('{valid_values}')
-                        """)
-                        result = await db_session.execute(check_invalid_docs)
-                        invalid_count = result.scalar()
-                        
-                        if invalid_count > 0:
-                            logger.warning(f"Encontrados {invalid_count} documentos com tipos inválidos")
-                            
-                            # Usar a função de conversão segura para atualizar valores inválidos para 'OUTRO'
-                            update_invalid_query = text("""
-                                UPDATE documents 
-                                SET document_type = 'OUTRO'::documenttype
-                                WHERE text_to_documenttype(CAST(document_type AS TEXT)) = 'OUTRO'::documenttype
-                            """)
-                            await db_session.execute(update_invalid_query)
-                            logger.info(f"Corrigidos {invalid_count} documentos com tipos inválidos")
-                    except Exception as e:
-                        logger.error(f"Erro ao corrigir documentos: {str(e)}")
-                
-                logger.info("Inicialização do DocumentType concluída")
-                await db_session.commit()
-            else:
-                logger.info("Enum DocumentType está atualizado")
-        else:
-            logger.info("Enum DocumentType não encontrado, criando...")
-            
-            # Criar o enum
-            create_enum_query = text(f"""
-                CREATE TYPE documenttype AS ENUM ('{values_str}');
-            """)
-            
-            await db_session.execute(create_enum_query)
-            
-            # Criar função de conversão segura para o enum
-            await db_session.execute(text(f"""
-                CREATE OR REPLACE FUNCTION text_to_documenttype(text) RETURNS documenttype AS $$
-                BEGIN
-                    BEGIN
-                        RETURN $1::documenttype;
-                    EXCEPTION WHEN OTHERS THEN
-                        RETURN 'OUTRO'::documenttype;
-                    END;
-                END;
-                $$ LANGUAGE plpgsql IMMUTABLE;
-            """))
-            
-            await db_session.commit()
-            logger.info("Enum DocumentType e função de conversão criados com sucesso")
-    
-    except Exception as e:
-        logger.error(f"Erro ao configurar enum DocumentType: {str(e)}")
-        logger.error(f"Detalhes: {getattr(e, '__cause__', 'Sem causa adicional')}")
-        # Não propagar a exceção, apenas logar
-        # Permitiremos que o sistema tente funcionar com string direta
-
-
-async def initialize_enums(db_session: AsyncSession):
+        connection.execute(text(f"CREATE TYPE documenttype AS ENUM ('{values_str}')"))
+        return
+
+    existing_values = {row[0] for row in rows}
+    missing_values = [v for v in enum_values if v not in existing_values]
+    if not missing_values:
+        logger.info("Enum DocumentType está atualizado")
+        return
+
+    logger.warning(f"Valores faltando no enum: {missing_values}")
+    # Os novos valores só podem ser usados depois do commit desta transação
+    for value in missing_values:
+        connection.execute(text(f"ALTER TYPE documenttype ADD VALUE IF NOT EXISTS '{value}'"))
+
+
+# Passos de schema versionados: nome -> (versão atual, função que aplica o passo)
+SCHEMA_STEPS: Dict[str, Tuple[Callable[[], str], Callable[[Connection], None]]] = {
+    "documenttype_enum": (document_type_enum_version, ensure_document_type_enum),
+}
+
+
+def run_schema_steps(connection: Connection) -> List[str]:
     """
-    Inicializa todos os enums necessários no banco de dados.
+    Aplica os passos de schema cuja versão registrada em schema_versions está desatualizada.
+
+    Roda dentro da transação da conexão, com um advisory lock de transação: processos
+    concorrentes esperam o primeiro terminar e depois encontram as versões já registradas.
+    Devolve os nomes dos passos aplicados.
     """
-    await ensure_document_type_enum(db_session) 
\ No newline at end of file
+    connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SCHEMA_STEPS_LOCK_ID})
+
+    result = connection.execute(text("SELECT name, version FROM schema_versions"))
+    applied_versions = {row[0]: row[1] for row in result.fetchall()}
+
+    applied = []
+    for name, (current_version, apply_step) in SCHEMA_STEPS.items():
+        version = current_version()
+        if applied_versions.get(name) == version:
+            continue
+
+        logger.info(f"Aplicando passo de schema {name} (versão {version})")
+        apply_step(connection)
+        connection.execute(
+            text("""
+                INSERT INTO schema_versions (name, version, applied_at)
+                VALUES (:name, :version, now())
+                ON CONFLICT (name) DO UPDATE SET version = EXCLUDED.version, applied_at = EXCLUDED.applied_at
+            """),
+            {"name": name, "version": version}
+        )
+        applied.append(name)
+
+    return applied
+
+
+async def main() -> None:
+    from infrastucture.database.base import engine
+
+    async with engine.begin() as connection:
+        applied = await connection.run_sync(run_schema_steps)
+    await engine.dispose()
+
+    if applied:
+        logger.info(f"Passos de schema aplicados: {', '.join(applied)}")
+    else:
+        logger.info("Schema já está na versão atual")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    asyncio.run(main())
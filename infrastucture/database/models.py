@@ -1,16 +1,17 @@
-import uuid
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Numeric
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Enum, Numeric, Integer, BigInteger, Index
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.sql import func
 
 from .base import Base
+from core.entities.card_transaction import CardTransactionType
 from core.entities.document import DocumentType
+from core.entities.ids import uuid7
 from core.entities.user import AuthProvider
 
 class UserModel(Base):
     __tablename__ = "users"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     email = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
@@ -25,8 +26,11 @@ class UserModel(Base):
 
 class DocumentModel(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_user_id_created_at", "user_id", "created_at"),
+    )
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     document_type = Column(Enum(DocumentType), nullable=False)
     file_path = Column(String, nullable=False)
@@ -38,8 +42,79 @@ class DocumentModel(Base):
 class TransportCardModel(Base):
     __tablename__ = "transport_cards"
     
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), unique=True, nullable=False)
     balance = Column(Numeric(10, 2), nullable=False, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+class CardTransactionModel(Base):
+    __tablename__ = "card_transactions"
+    # Extrato do cartão paginado por (created_at, id); o INCLUDE cobre as demais colunas
+    # para a leitura ser só do índice (index-only scan)
+    __table_args__ = (
+        Index(
+            "ix_card_transactions_statement", "card_id", "created_at", "id",
+            postgresql_include=["user_id", "transaction_type", "amount", "balance_after", "description"]
+        ),
+    )
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    card_id = Column(UUID(as_uuid=True), ForeignKey("transport_cards.id"), nullable=False)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    transaction_type = Column(Enum(CardTransactionType), nullable=False)
+    amount = Column(Numeric(10, 2), nullable=False)
+    balance_after = Column(Numeric(10, 2), nullable=False)
+    description = Column(String(100), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class RefreshTokenModel(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)
+    family_id = Column(UUID(as_uuid=True), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
+    replaced_by_id = Column(UUID(as_uuid=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RateLimitCounterModel(Base):
+    __tablename__ = "rate_limit_counters"
+    # Contadores efêmeros: UNLOGGED evita WAL a cada tentativa de login
+    __table_args__ = (
+        Index("ix_rate_limit_counters_window_start", "window_start"),
+        {"prefixes": ["UNLOGGED"]},
+    )
+    
+    key = Column(String, primary_key=True)
+    window_start = Column(BigInteger, primary_key=True)
+    hits = Column(Integer, nullable=False, default=0)
+
+
+class IdempotencyKeyModel(Base):
+    __tablename__ = "idempotency_keys"
+    # Respostas das operações de saldo por Idempotency-Key; expiradas são removidas aos poucos
+    __table_args__ = (
+        Index("ix_idempotency_keys_expires_at", "expires_at"),
+    )
+    
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class SchemaVersionModel(Base):
+    __tablename__ = "schema_versions"
+    
+    name = Column(String, primary_key=True)
+    version = Column(String, nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolWaitStats:
+    """Tempo de espera para obter uma conexão do pool (inclui abrir conexões de overflow)"""
+
+    def __init__(self, window: int = 1000):
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            self._recent.append(wait_ms)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            recent = sorted(self._recent)
+
+        def percentile(p: float) -> Optional[float]:
+            if not recent:
+                return None
+            return round(recent[min(len(recent) - 1, int(len(recent) * p))], 3)
+
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else None,
+            "p50_ms": percentile(0.50),
+            "p95_ms": percentile(0.95),
+            "p99_ms": percentile(0.99),
+            "max_ms": round(self.max_wait_ms, 3),
+        }
+
+
+# Métricas por pool, indexadas pelo pool_logging_name do engine (preservado quando o pool é recriado)
+_wait_stats: Dict[str, PoolWaitStats] = {}
+
+
+def get_wait_stats(pool_name: Optional[str]) -> PoolWaitStats:
+    return _wait_stats.setdefault(pool_name or "default", PoolWaitStats())
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool que mede quanto tempo cada checkout esperou por uma conexão"""
+
+    def _do_get(self):
+        wait_stats = get_wait_stats(self._orig_logging_name)
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            # Só o esgotamento do pool; falhas ao conectar (recusa, autenticação) não são espera
+            wait_stats.record_timeout()
+            raise
+        wait_stats.record((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def get_pool_stats(engine: AsyncEngine) -> dict:
+    """Conexões em uso, ociosas e em overflow, mais o tempo de espera por checkout"""
+    pool = engine.pool
+    stats = {"pool_class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            # overflow() é negativo enquanto o pool ainda não abriu todas as conexões base
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout_seconds": pool.timeout(),
+        })
+
+    stats["wait"] = get_wait_stats(pool._orig_logging_name).get_stats()
+    return stats
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+# Atraso máximo aceito na réplica antes de enviar as leituras ao primário
+DB_REPLICA_MAX_LAG_SECONDS = float(os.getenv("DB_REPLICA_MAX_LAG_SECONDS", "5"))
+# Intervalo mínimo entre medições do atraso (por processo)
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", "1"))
+
+
+class ReplicaLagMonitor:
+    """
+    Mede o atraso de replicação e decide se as leituras podem ir para a réplica.
+
+    A medição é feita no máximo uma vez por intervalo; as requisições nesse meio tempo
+    usam o último valor. Réplica inacessível conta como atrasada. Quando todo o WAL
+    recebido já foi aplicado o atraso é zero, mesmo que o primário esteja ocioso há tempo.
+    """
+
+    LAG_QUERY = text("""
+        SELECT CASE
+            WHEN NOT pg_is_in_recovery() THEN 0
+            WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+            ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+        END AS lag_seconds
+    """)
+
+    def __init__(
+        self,
+        read_engine: Optional[AsyncEngine],
+        max_lag_seconds: float = DB_REPLICA_MAX_LAG_SECONDS,
+        check_interval: float = DB_REPLICA_LAG_CHECK_INTERVAL
+    ):
+        self.read_engine = read_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval = check_interval
+        self.lag_seconds: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.replica_reads = 0
+        self.primary_fallbacks = 0
+
+    async def use_replica(self) -> bool:
+        if self.read_engine is None:
+            return False
+
+        if time.monotonic() - self._checked_at >= self.check_interval and not self._lock.locked():
+            async with self._lock:
+                await self._measure_lag()
+
+        healthy = self.lag_seconds is not None and self.lag_seconds <= self.max_lag_seconds
+        if healthy:
+            self.replica_reads += 1
+        else:
+            self.primary_fallbacks += 1
+        return healthy
+
+    async def _measure_lag(self) -> None:
+        try:
+            async with self.read_engine.connect() as connection:
+                result = await connection.execute(self.LAG_QUERY)
+                self.lag_seconds = float(result.scalar())
+            self.last_error = None
+        except Exception as e:
+            if self.last_error is None:
+                logger.warning(f"Réplica de leitura indisponível, usando o primário: {str(e)}")
+            self.lag_seconds = None
+            self.last_error = str(e)
+        finally:
+            self._checked_at = time.monotonic()
+
+        if self.lag_seconds is not None and self.lag_seconds > self.max_lag_seconds:
+            logger.warning(f"Réplica atrasada {self.lag_seconds:.1f}s, usando o primário")
+
+    def get_stats(self) -> dict:
+        return {
+            "configured": self.read_engine is not None,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "replica_reads": self.replica_reads,
+            "primary_fallbacks": self.primary_fallbacks,
+            "last_error": self.last_error,
+        }
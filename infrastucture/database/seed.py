@@ -0,0 +1,260 @@
+"""
+Gera dados sintéticos em volume de produção (usuários, documentos e cartões) para testes de carga.
+
+Carrega via COPY (asyncpg copy_records_to_table), em lotes com commit próprio:
+
+    python -m infrastucture.database.seed --users 1000000
+"""
+import argparse
+import asyncio
+import base64
+import logging
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+
+from core.entities.card_transaction import CardTransactionType
+from core.entities.document import DocumentType
+from infrastucture.database.base import engine
+
+logger = logging.getLogger(__name__)
+
+USER_COLUMNS = [
+    "id", "email", "hashed_password", "is_active", "is_admin", "mfa_enabled",
+    "mfa_secret", "auth_provider", "profile_picture", "created_at", "updated_at"
+]
+DOCUMENT_COLUMNS = ["id", "user_id", "document_type", "file_path", "name", "created_at", "updated_at"]
+CARD_COLUMNS = ["id", "user_id", "balance", "created_at", "updated_at"]
+CARD_TRANSACTION_COLUMNS = [
+    "id", "card_id", "user_id", "transaction_type", "amount", "balance_after", "description", "created_at"
+]
+
+# Distribuições aproximadas da base real
+EMAIL_DOMAINS = (["gmail.com"] * 55 + ["hotmail.com"] * 20 + ["outlook.com"] * 10
+                 + ["yahoo.com.br"] * 10 + ["empresa.com.br"] * 5)
+AUTH_PROVIDERS = ["LOCAL", "GOOGLE", "FACEBOOK"]
+AUTH_PROVIDER_WEIGHTS = [80, 15, 5]
+DOCUMENT_TYPES = [DocumentType.CPF, DocumentType.ID, DocumentType.DRIVING_LICENSE, DocumentType.PASSPORT, DocumentType.OUTRO]
+DOCUMENT_TYPE_WEIGHTS = [35, 30, 20, 5, 10]
+DOCUMENT_NAMES = {
+    DocumentType.CPF: "CPF",
+    DocumentType.ID: "RG",
+    DocumentType.DRIVING_LICENSE: "CNH",
+    DocumentType.PASSPORT: "Passaporte",
+    DocumentType.OUTRO: "Comprovante de residência",
+}
+MFA_RATIO = 0.10
+INACTIVE_RATIO = 0.03
+HISTORY_DAYS = 730
+
+# Conteúdo dos arquivos de exemplo: um PDF mínimo, suficiente para o download
+PLACEHOLDER_CONTENT = b"%PDF-1.4\n% documento gerado para teste de carga\n%%EOF\n"
+
+
+class SyntheticDataGenerator:
+    """
+    Gera os registros (tuplas na ordem das colunas acima) de forma determinística pela semente.
+
+    Documentos por usuário seguem uma cauda longa: a maioria tem até três, poucos têm muitos.
+    Saldos seguem uma log-normal (muitos cartões com pouco saldo, poucos com saldo alto).
+    """
+
+    def __init__(
+        self,
+        hashed_password: str,
+        seed: int = 42,
+        prefix: str = "seed",
+        card_ratio: float = 0.7,
+        documents_mean: float = 2.0,
+        shared_files: bool = True,
+        now: Optional[datetime] = None
+    ):
+        self.rng = random.Random(seed)
+        self.hashed_password = hashed_password
+        self.prefix = prefix
+        self.card_ratio = card_ratio
+        self.documents_mean = documents_mean
+        self.shared_files = shared_files
+        self.now = now or datetime.now(timezone.utc)
+        self.placeholder_files: List[str] = []
+
+    def _uuid(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def _created_at(self) -> datetime:
+        # Mais cadastros recentes que antigos
+        days_ago = HISTORY_DAYS * (1 - self.rng.random() ** 0.5)
+        return self.now - timedelta(days=days_ago)
+
+    def _documents_count(self) -> int:
+        # Geométrica com a média configurada
+        p = 1 / (self.documents_mean + 1)
+        count = 0
+        while self.rng.random() > p:
+            count += 1
+        return count
+
+    def document_file_path(self, user_id: uuid.UUID, document_type: DocumentType) -> str:
+        """Caminho relativo a UPLOAD_DIR, no mesmo formato usado pelo upload"""
+        if self.shared_files:
+            return os.path.join(self.prefix, f"{document_type.value.lower()}.pdf")
+        file_path = os.path.join(str(user_id), f"{self._uuid()}.pdf")
+        self.placeholder_files.append(file_path)
+        return file_path
+
+    def batch(self, start: int, count: int) -> Tuple[list, list, list, list]:
+        """Usuários de número start até start + count, com seus cartões, documentos e extratos"""
+        rng = self.rng
+        users, cards, documents, card_transactions = [], [], [], []
+
+        for n in range(start, start + count):
+            user_id = self._uuid()
+            created_at = self._created_at()
+            mfa_enabled = rng.random() < MFA_RATIO
+            auth_provider = rng.choices(AUTH_PROVIDERS, AUTH_PROVIDER_WEIGHTS)[0]
+
+            users.append((
+                user_id,
+                f"{self.prefix}-{n}@{rng.choice(EMAIL_DOMAINS)}",
+                self.hashed_password,
+                rng.random() >= INACTIVE_RATIO,
+                False,
+                mfa_enabled,
+                base64.b32encode(rng.getrandbits(160).to_bytes(20, "big")).decode() if mfa_enabled else None,
+                auth_provider,
+                None,
+                created_at,
+                created_at,
+            ))
+
+            if rng.random() < self.card_ratio:
+                balance = Decimal(min(rng.lognormvariate(3, 1.2), 5000)).quantize(Decimal("0.01"))
+                card_id = self._uuid()
+                cards.append((card_id, user_id, balance, created_at, created_at))
+                # Saldo inicial lançado no extrato: a soma do extrato continua igual ao saldo
+                card_transactions.append((
+                    self._uuid(), card_id, user_id, CardTransactionType.OPENING_BALANCE.value,
+                    balance, balance, "Saldo inicial", created_at,
+                ))
+
+            for _ in range(self._documents_count()):
+                document_type = rng.choices(DOCUMENT_TYPES, DOCUMENT_TYPE_WEIGHTS)[0]
+                document_created_at = created_at + (self.now - created_at) * rng.random()
+                documents.append((
+                    self._uuid(),
+                    user_id,
+                    document_type.value,
+                    self.document_file_path(user_id, document_type),
+                    DOCUMENT_NAMES[document_type],
+                    document_created_at,
+                    document_created_at,
+                ))
+
+        return users, cards, documents, card_transactions
+
+
+def write_placeholder_files(upload_dir: str, generator: SyntheticDataGenerator) -> int:
+    """Cria os arquivos referenciados pelos documentos do último lote e devolve quantos foram escritos"""
+    if generator.shared_files:
+        paths = [os.path.join(generator.prefix, f"{document_type.value.lower()}.pdf") for document_type in DOCUMENT_TYPES]
+    else:
+        paths, generator.placeholder_files = generator.placeholder_files, []
+
+    written = 0
+    for relative_path in paths:
+        file_path = os.path.join(upload_dir, relative_path)
+        if os.path.exists(file_path):
+            continue
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as buffer:
+            buffer.write(PLACEHOLDER_CONTENT)
+        written += 1
+    return written
+
+
+async def seed(
+    users: int,
+    batch_size: int,
+    generator: SyntheticDataGenerator,
+    upload_dir: str
+) -> dict:
+    totals = {"users": 0, "transport_cards": 0, "card_transactions": 0, "documents": 0, "files": 0}
+    start_time = time.perf_counter()
+
+    try:
+        for start in range(0, users, batch_size):
+            user_records, card_records, document_records, transaction_records = generator.batch(
+                start, min(batch_size, users - start)
+            )
+
+            # Um commit por lote: memória limitada e progresso preservado se o processo cair
+            async with engine.begin() as connection:
+                raw_connection = await connection.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+                await driver_connection.copy_records_to_table("users", records=user_records, columns=USER_COLUMNS)
+                await driver_connection.copy_records_to_table("transport_cards", records=card_records, columns=CARD_COLUMNS)
+                await driver_connection.copy_records_to_table(
+                    "card_transactions", records=transaction_records, columns=CARD_TRANSACTION_COLUMNS
+                )
+                await driver_connection.copy_records_to_table("documents", records=document_records, columns=DOCUMENT_COLUMNS)
+
+            totals["files"] += write_placeholder_files(upload_dir, generator)
+            totals["users"] += len(user_records)
+            totals["transport_cards"] += len(card_records)
+            totals["card_transactions"] += len(transaction_records)
+            totals["documents"] += len(document_records)
+
+            elapsed = time.perf_counter() - start_time
+            logger.info(f"{totals['users']}/{users} usuários ({totals['users'] / elapsed:,.0f}/s)")
+
+        # Estatísticas atualizadas para os planos refletirem o volume novo
+        async with engine.begin() as connection:
+            await connection.execute(text("ANALYZE users, transport_cards, card_transactions, documents"))
+    finally:
+        await engine.dispose()
+
+    totals["seconds"] = round(time.perf_counter() - start_time, 1)
+    return totals
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+
+    parser = argparse.ArgumentParser(description="Popula o banco com dados sintéticos via COPY para testes de carga")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=50_000, help="Usuários por lote (um COPY e um commit por lote)")
+    parser.add_argument("--documents-mean", type=float, default=2.0, help="Média de documentos por usuário")
+    parser.add_argument("--card-ratio", type=float, default=0.7, help="Fração de usuários com cartão de transporte")
+    parser.add_argument("--password", default="senha-de-teste", help="Senha de todos os usuários gerados")
+    parser.add_argument("--prefix", default=f"seed-{int(time.time())}", help="Prefixo dos e-mails (deve ser único por execução)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--upload-dir", default=os.path.join(os.getcwd(), "uploads"))
+    parser.add_argument(
+        "--file-per-document", action="store_true",
+        help="Cria um arquivo por documento (lento); por padrão todos apontam para um arquivo por tipo"
+    )
+    args = parser.parse_args()
+
+    from infrastucture.security.password import BCryptPasswordHasher
+
+    # Um único hash para todos: o custo do bcrypt por usuário dominaria o tempo da carga
+    generator = SyntheticDataGenerator(
+        hashed_password=BCryptPasswordHasher().hash_password(args.password),
+        seed=args.seed,
+        prefix=args.prefix,
+        card_ratio=args.card_ratio,
+        documents_mean=args.documents_mean,
+        shared_files=not args.file_per_document
+    )
+
+    totals = asyncio.run(seed(args.users, args.batch_size, generator, args.upload_dir))
+    logger.info(f"Carga concluída: {totals}")
@@ -1,11 +1,35 @@
 from typing import AsyncGenerator
-from .base import async_session
+from .base import async_session, read_only_session, read_async_session, read_engine, session_has_writes
+from .replica import ReplicaLagMonitor
+
+replica_monitor = ReplicaLagMonitor(read_engine)
 
 async def get_db() -> AsyncGenerator:
+    """
+    Sessão no primário. A conexão só é retirada do pool no primeiro statement, e o COMMIT
+    só é enviado se houve escrita; transações só de leitura terminam no rollback feito
+    pelo pool ao devolver a conexão.
+    """
     async with async_session() as session:
         try:
             yield session
-            await session.commit()
+            if session_has_writes(session):
+                await session.commit()
         except Exception:
             await session.rollback()
-            raise
\ No newline at end of file
+            raise
+
+async def get_read_only_db() -> AsyncGenerator:
+    """Sessão no primário com a transação declarada READ ONLY; escritas falham no banco"""
+    async with read_only_session() as session:
+        yield session
+
+async def get_read_db() -> AsyncGenerator:
+    """
+    Sessão somente leitura: usa a réplica quando configurada e dentro do atraso aceito,
+    senão o primário. Nunca faz commit; usar apenas em rotas que não escrevem e que
+    toleram alguns segundos de atraso em relação às últimas escritas.
+    """
+    session_factory = read_async_session if await replica_monitor.use_replica() else read_only_session
+    async with session_factory() as session:
+        yield session
@@ -0,0 +1,83 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, List, Optional, Set, Tuple
+from uuid import UUID
+from sqlalchemy import any_, bindparam, func, select, tuple_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities.card_transaction import CardTransaction
+from core.interfaces.repositories import CardTransactionRepository
+from infrastucture.database.models import CardTransactionModel
+
+# Linhas lidas do cursor do servidor por ida ao banco no modo streaming
+STREAM_BATCH_SIZE = 500
+
+# Os lançamentos são gravados junto com o saldo (ver transport_card_repository);
+# aqui ficam só as leituras do extrato
+_card_transactions = CardTransactionModel.__table__
+_statement_order = (_card_transactions.c.created_at.desc(), _card_transactions.c.id.desc())
+SELECT_TRANSACTIONS_BY_CARD_ID = (
+    select(*_card_transactions.c)
+    .where(_card_transactions.c.card_id == bindparam("card_id"))
+    .order_by(*_statement_order)
+)
+SELECT_TRANSACTIONS_PAGE = SELECT_TRANSACTIONS_BY_CARD_ID.limit(bindparam("limit"))
+# Keyset: continua a partir do último lançamento da página anterior, sem OFFSET
+SELECT_TRANSACTIONS_PAGE_AFTER = (
+    SELECT_TRANSACTIONS_PAGE
+    .where(
+        tuple_(_card_transactions.c.created_at, _card_transactions.c.id)
+        < tuple_(
+            bindparam("before_created_at", type_=_card_transactions.c.created_at.type),
+            bindparam("before_id", type_=_card_transactions.c.id.type)
+        )
+    )
+)
+# Reenvio de passagens: o id do lançamento é o id do evento gerado no validador
+SELECT_EXISTING_IDS = (
+    select(_card_transactions.c.id)
+    .where(_card_transactions.c.id == any_(bindparam("ids", type_=ARRAY(_card_transactions.c.id.type))))
+)
+SELECT_LEDGER_BALANCE = (
+    select(func.coalesce(func.sum(_card_transactions.c.amount), 0))
+    .where(_card_transactions.c.card_id == bindparam("card_id"))
+)
+
+class SQLAlchemyCardTransactionRepository(CardTransactionRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+    
+    async def get_by_card_id(
+        self,
+        card_id: UUID,
+        limit: int = 50,
+        before: Optional[Tuple[datetime, UUID]] = None
+    ) -> List[CardTransaction]:
+        if before is None:
+            result = await self.session.execute(SELECT_TRANSACTIONS_PAGE, {"card_id": card_id, "limit": limit})
+        else:
+            before_created_at, before_id = before
+            result = await self.session.execute(
+                SELECT_TRANSACTIONS_PAGE_AFTER,
+                {"card_id": card_id, "limit": limit, "before_created_at": before_created_at, "before_id": before_id}
+            )
+        return [CardTransaction.from_row(row) for row in result]
+    
+    async def stream_by_card_id(self, card_id: UUID) -> AsyncIterator[CardTransaction]:
+        # Cursor no servidor: só STREAM_BATCH_SIZE linhas em memória por vez
+        result = await self.session.stream(
+            SELECT_TRANSACTIONS_BY_CARD_ID,
+            {"card_id": card_id},
+            execution_options={"yield_per": STREAM_BATCH_SIZE}
+        )
+        async for row in result:
+            yield CardTransaction.from_row(row)
+    
+    async def get_existing_ids(self, transaction_ids: List[UUID]) -> Set[UUID]:
+        result = await self.session.execute(SELECT_EXISTING_IDS, {"ids": transaction_ids})
+        return set(result.scalars())
+    
+    async def get_ledger_balance(self, card_id: UUID) -> Decimal:
+        result = await self.session.execute(SELECT_LEDGER_BALANCE, {"card_id": card_id})
+        return Decimal(result.scalar())
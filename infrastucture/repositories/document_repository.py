@@ -1,15 +1,24 @@
 from typing import Optional, List
 from uuid import UUID
-from sqlalchemy import select, text
+from sqlalchemy import bindparam, delete, select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
-from core.entities.document import Document, DocumentType
+from core.entities.document import Document
 from core.interfaces.repositories import DocumentRepository
 from infrastucture.database.models import DocumentModel
 
 logger = logging.getLogger(__name__)
 
+# Consultas montadas uma única vez; devolvem linhas simples, sem objetos ORM
+_documents = DocumentModel.__table__
+SELECT_DOCUMENT_BY_ID = select(*_documents.c).where(_documents.c.id == bindparam("document_id"))
+SELECT_DOCUMENTS_BY_USER_ID = (
+    select(*_documents.c)
+    .where(_documents.c.user_id == bindparam("user_id"))
+    .order_by(_documents.c.created_at)
+)
+
 class SQLAlchemyDocumentRepository(DocumentRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -63,56 +72,22 @@ class SQLAlchemyDocumentRepository(DocumentRepository):
             raise
     
     async def get_by_id(self, document_id: UUID) -> Optional[Document]:
-        result = await self.session.execute(
-            select(DocumentModel).where(DocumentModel.id == document_id)
-        )
-        db_document = result.scalars().first()
+        result = await self.session.execute(SELECT_DOCUMENT_BY_ID, {"document_id": document_id})
+        db_document = result.first()
         if not db_document:
             return None
         return self._map_to_entity(db_document)
     
     async def get_by_user_id(self, user_id: UUID) -> List[Document]:
-        result = await self.session.execute(
-            select(DocumentModel).where(DocumentModel.user_id == user_id)
-        )
-        db_documents = result.scalars().all()
-        
-        return [self._map_to_entity(db_doc) for db_doc in db_documents]
+        result = await self.session.execute(SELECT_DOCUMENTS_BY_USER_ID, {"user_id": user_id})
+        return [Document.from_row(row) for row in result]
     
     async def delete(self, document_id: UUID) -> bool:
+        # DELETE ... RETURNING: remove e confirma a existência em um único statement
         result = await self.session.execute(
-            select(DocumentModel).where(DocumentModel.id == document_id)
+            delete(DocumentModel).where(DocumentModel.id == document_id).returning(DocumentModel.id)
         )
-        db_document = result.scalars().first()
-        
-        if db_document:
-            await self.session.delete(db_document)
-            await self.session.flush()
-            return True
-        
-        return False
+        return result.first() is not None
     
     def _map_to_entity(self, db_document: DocumentModel) -> Document:
-        try:
-            # Tenta converter para o enum, mas se falhar, usa o valor original
-            doc_type = db_document.document_type
-            if isinstance(doc_type, str):
-                try:
-                    doc_type = DocumentType(doc_type)
-                except ValueError:
-                    logger.warning(f"Valor de enum não reconhecido no banco: {doc_type}")
-                    # Fallback para OUTRO se o valor não é reconhecido
-                    doc_type = DocumentType.OUTRO
-            
-            return Document(
-                id=db_document.id,
-                user_id=db_document.user_id,
-                document_type=doc_type,
-                file_path=db_document.file_path,
-                name=db_document.name,
-                created_at=db_document.created_at,
-                updated_at=db_document.updated_at
-            )
-        except Exception as e:
-            logger.error(f"Erro ao mapear documento para entidade: {str(e)}")
-            raise
+        return Document.from_row(db_document)
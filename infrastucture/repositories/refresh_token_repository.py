@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from core.entities.refresh_token import RefreshToken
+from core.interfaces.repositories import RefreshTokenRepository
+from infrastucture.database.models import RefreshTokenModel
+
+logger = logging.getLogger(__name__)
+
+class SQLAlchemyRefreshTokenRepository(RefreshTokenRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, refresh_token: RefreshToken) -> RefreshToken:
+        db_token = RefreshTokenModel(
+            id=refresh_token.id,
+            user_id=refresh_token.user_id,
+            token_hash=refresh_token.token_hash,
+            family_id=refresh_token.family_id,
+            expires_at=refresh_token.expires_at
+        )
+
+        self.session.add(db_token)
+        await self.session.flush()
+
+        return self._map_to_entity(db_token)
+
+    async def get_by_token_hash(self, token_hash: str) -> Optional[RefreshToken]:
+        result = await self.session.execute(
+            select(RefreshTokenModel).where(RefreshTokenModel.token_hash == token_hash)
+        )
+        db_token = result.scalars().first()
+        if not db_token:
+            return None
+        return self._map_to_entity(db_token)
+
+    async def revoke(self, token_id: UUID, replaced_by_id: Optional[UUID] = None) -> bool:
+        # UPDATE condicional: apenas uma rotação concorrente consegue revogar o token
+        result = await self.session.execute(
+            update(RefreshTokenModel)
+            .where(RefreshTokenModel.id == token_id, RefreshTokenModel.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc), replaced_by_id=replaced_by_id)
+            .returning(RefreshTokenModel.id)
+        )
+        return result.first() is not None
+
+    async def revoke_family(self, family_id: UUID) -> int:
+        result = await self.session.execute(
+            update(RefreshTokenModel)
+            .where(RefreshTokenModel.family_id == family_id, RefreshTokenModel.revoked_at.is_(None))
+            .values(revoked_at=datetime.now(timezone.utc))
+            .returning(RefreshTokenModel.id)
+        )
+        revoked = len(result.all())
+        logger.warning(f"Família de refresh tokens revogada: family_id={family_id}, tokens={revoked}")
+        return revoked
+
+    def _map_to_entity(self, db_token: RefreshTokenModel) -> RefreshToken:
+        return RefreshToken(
+            id=db_token.id,
+            user_id=db_token.user_id,
+            token_hash=db_token.token_hash,
+            family_id=db_token.family_id,
+            expires_at=db_token.expires_at,
+            created_at=db_token.created_at,
+            revoked_at=db_token.revoked_at,
+            replaced_by_id=db_token.replaced_by_id
+        )
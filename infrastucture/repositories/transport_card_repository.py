@@ -1,11 +1,118 @@
-from typing import Optional
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import any_, bindparam, func, literal, select, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.entities.card_transaction import CardTransaction, CardTransactionType
+from core.entities.ids import uuid7
 from core.entities.transport_card import TransportCard
 from core.interfaces.repositories import TransportCardRepository
-from infrastucture.database.models import TransportCardModel
+from infrastucture.database.models import CardTransactionModel, TransportCardModel
+
+# Consulta do saldo montada uma única vez; devolve linhas simples, sem objetos ORM
+_transport_cards = TransportCardModel.__table__
+SELECT_CARD_BY_USER_ID = select(*_transport_cards.c).where(_transport_cards.c.user_id == bindparam("user_id"))
+
+_card_transactions = CardTransactionModel.__table__
+
+
+def _with_ledger_entry(card_change, transaction_type: CardTransactionType, signed_amount):
+    """
+    Encadeia a alteração do saldo (DML com RETURNING) e o lançamento no extrato em um só
+    statement: WITH card AS (<alteração>), ledger AS (INSERT ... SELECT FROM card) SELECT card.*.
+    Sem linha alterada não há lançamento, e os dois são gravados ou desfeitos juntos.
+    """
+    card = card_change.cte("card")
+    ledger = insert(_card_transactions).from_select(
+        ["id", "card_id", "user_id", "transaction_type", "amount", "balance_after", "description"],
+        select(
+            bindparam("transaction_id", type_=_card_transactions.c.id.type),
+            card.c.id,
+            card.c.user_id,
+            literal(transaction_type, _card_transactions.c.transaction_type.type),
+            signed_amount,
+            card.c.balance,
+            bindparam("description", type_=_card_transactions.c.description.type),
+        ).select_from(card)
+    ).cte("ledger")
+    return select(card).add_cte(ledger)
+
+
+# Saldo alterado no próprio banco, em um único statement: sem ler o saldo antes,
+# operações simultâneas no mesmo cartão não sobrescrevem umas às outras
+_amount = bindparam("amount", type_=_transport_cards.c.balance.type)
+_add_balance_insert = insert(_transport_cards).values(
+    id=bindparam("id"), user_id=bindparam("user_id"), balance=_amount
+)
+ADD_BALANCE = _with_ledger_entry(
+    _add_balance_insert.on_conflict_do_update(
+        index_elements=[_transport_cards.c.user_id],
+        set_={
+            "balance": _transport_cards.c.balance + _add_balance_insert.excluded.balance,
+            "updated_at": func.now(),
+        }
+    ).returning(*_transport_cards.c),
+    CardTransactionType.RECHARGE,
+    _amount
+)
+# O filtro balance >= amount faz a checagem de saldo e o débito sob o mesmo lock de linha
+DEDUCT_BALANCE = _with_ledger_entry(
+    update(_transport_cards)
+    .where(_transport_cards.c.user_id == bindparam("user_id"), _transport_cards.c.balance >= _amount)
+    .values(balance=_transport_cards.c.balance - _amount, updated_at=func.now())
+    .returning(*_transport_cards.c),
+    CardTransactionType.CHARGE,
+    -_amount
+)
+
+# Lote de passagens: cartões bloqueados em ordem de id (lotes simultâneos não entram em deadlock)
+LOCK_CARDS_BY_USER_IDS = (
+    select(*_transport_cards.c)
+    .where(_transport_cards.c.user_id == any_(bindparam("user_ids", type_=ARRAY(_transport_cards.c.user_id.type))))
+    .order_by(_transport_cards.c.id)
+    .with_for_update()
+)
+
+
+def _array_param(name: str, column):
+    return bindparam(name, type_=ARRAY(column.type))
+
+
+# Lançamentos do lote em um único INSERT ... SELECT FROM unnest(arrays), encadeado ao
+# UPDATE dos saldos finais: o lote inteiro custa um statement, qualquer que seja o tamanho
+_charges = func.unnest(
+    _array_param("transaction_ids", _card_transactions.c.id),
+    _array_param("card_ids", _card_transactions.c.card_id),
+    _array_param("user_ids", _card_transactions.c.user_id),
+    _array_param("amounts", _card_transactions.c.amount),
+    _array_param("balances_after", _card_transactions.c.balance_after),
+    _array_param("descriptions", _card_transactions.c.description),
+).table_valued("id", "card_id", "user_id", "amount", "balance_after", "description").render_derived(name="charges")
+_final_balances = func.unnest(
+    _array_param("balance_card_ids", _transport_cards.c.id),
+    _array_param("balances", _transport_cards.c.balance),
+).table_valued("card_id", "balance").render_derived(name="final_balances")
+APPLY_CHARGES = (
+    update(_transport_cards)
+    .where(_transport_cards.c.id == _final_balances.c.card_id)
+    .values(balance=_final_balances.c.balance, updated_at=func.now())
+    .add_cte(
+        insert(_card_transactions).from_select(
+            ["id", "card_id", "user_id", "transaction_type", "amount", "balance_after", "description"],
+            select(
+                _charges.c.id,
+                _charges.c.card_id,
+                _charges.c.user_id,
+                literal(CardTransactionType.CHARGE, _card_transactions.c.transaction_type.type),
+                _charges.c.amount,
+                _charges.c.balance_after,
+                _charges.c.description,
+            )
+        ).cte("ledger")
+    )
+)
 
 class SQLAlchemyTransportCardRepository(TransportCardRepository):
     def __init__(self, session: AsyncSession):
@@ -33,32 +140,63 @@ class SQLAlchemyTransportCardRepository(TransportCardRepository):
         return self._map_to_entity(db_transport_card)
 
     async def get_by_user_id(self, user_id: UUID) -> Optional[TransportCard]:
-        result = await self.session.execute(
-            select(TransportCardModel).where(TransportCardModel.user_id == user_id)
-        )
-        db_transport_card = result.scalars().first()
+        result = await self.session.execute(SELECT_CARD_BY_USER_ID, {"user_id": user_id})
+        db_transport_card = result.first()
         if not db_transport_card:
             return None
         return self._map_to_entity(db_transport_card)
     
-    async def update(self, transport_card: TransportCard) -> TransportCard:
+    async def update(self, transport_card: TransportCard) -> Optional[TransportCard]:
+        # UPDATE ... RETURNING: uma única ida ao banco, mapeada direto para a entidade
         result = await self.session.execute(
-            select(TransportCardModel).where(TransportCardModel.id == transport_card.id)
+            update(TransportCardModel)
+            .where(TransportCardModel.id == transport_card.id)
+            .values(balance=transport_card.balance, updated_at=transport_card.updated_at)
+            .returning(*TransportCardModel.__table__.c)
         )
-        db_transport_card = result.scalars().first()
-        
-        if db_transport_card:
-            db_transport_card.balance = transport_card.balance
-            db_transport_card.updated_at = transport_card.updated_at
-            await self.session.flush()
-            
-        return self._map_to_entity(db_transport_card)
+        row = result.first()
+        if row is None:
+            return None
+        return self._map_to_entity(row)
+
+    async def add_balance(self, user_id: UUID, amount: Decimal, description: Optional[str] = None) -> TransportCard:
+        # INSERT ... ON CONFLICT (user_id) DO UPDATE: a primeira recarga cria o cartão
+        result = await self.session.execute(ADD_BALANCE, {
+            "id": uuid7(),
+            "user_id": user_id,
+            "amount": amount,
+            "transaction_id": uuid7(),
+            "description": description,
+        })
+        return self._map_to_entity(result.first())
+    
+    async def deduct_balance(self, user_id: UUID, amount: Decimal, description: Optional[str] = None) -> Optional[TransportCard]:
+        result = await self.session.execute(DEDUCT_BALANCE, {
+            "user_id": user_id,
+            "amount": amount,
+            "transaction_id": uuid7(),
+            "description": description,
+        })
+        row = result.first()
+        if row is None:
+            return None
+        return self._map_to_entity(row)
+
+    async def lock_by_user_ids(self, user_ids: Iterable[UUID]) -> Dict[UUID, TransportCard]:
+        result = await self.session.execute(LOCK_CARDS_BY_USER_IDS, {"user_ids": list(user_ids)})
+        return {row.user_id: self._map_to_entity(row) for row in result}
+
+    async def apply_charges(self, transport_cards: List[TransportCard], transactions: List[CardTransaction]) -> None:
+        await self.session.execute(APPLY_CHARGES, {
+            "transaction_ids": [transaction.id for transaction in transactions],
+            "card_ids": [transaction.card_id for transaction in transactions],
+            "user_ids": [transaction.user_id for transaction in transactions],
+            "amounts": [transaction.amount for transaction in transactions],
+            "balances_after": [transaction.balance_after for transaction in transactions],
+            "descriptions": [transaction.description for transaction in transactions],
+            "balance_card_ids": [transport_card.id for transport_card in transport_cards],
+            "balances": [transport_card.balance for transport_card in transport_cards],
+        })
 
     def _map_to_entity(self, db_transport_card: TransportCardModel) -> TransportCard:
-        return TransportCard(
-            id=db_transport_card.id,
-            user_id=db_transport_card.user_id,
-            balance=db_transport_card.balance,
-            created_at=db_transport_card.created_at,
-            updated_at=db_transport_card.updated_at
-        )
\ No newline at end of file
+        return TransportCard.from_row(db_transport_card)
@@ -1,15 +1,28 @@
 from typing import Optional
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import bindparam, delete, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 import logging
 
 from core.entities.user import User
 from core.interfaces.repositories import UserRepository
 from infrastucture.database.models import UserModel
+from infrastucture.security.principal_cache import principal_cache
 
 logger = logging.getLogger(__name__)
 
+# Consultas dos caminhos quentes (autenticação) montadas uma única vez: Core sobre a tabela,
+# com a chave de cache já memorizada e linhas simples em vez de objetos ORM no identity map
+_users = UserModel.__table__
+SELECT_USER_BY_ID = select(*_users.c).where(_users.c.id == bindparam("user_id"))
+SELECT_USER_BY_EMAIL = select(*_users.c).where(_users.c.email == bindparam("email"))
+UPDATE_PASSWORD_HASH = (
+    update(_users)
+    .where(_users.c.id == bindparam("user_id"))
+    .values(hashed_password=bindparam("new_hashed_password"))
+)
+
 class SQLAlchemyUserRepository(UserRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -49,13 +62,43 @@ class SQLAlchemyUserRepository(UserRepository):
             logger.error(f"Erro ao criar usuário: {str(e)}")
             raise
     
+    async def create_if_absent(self, user: User) -> Optional[User]:
+        # INSERT ... ON CONFLICT (email) DO NOTHING RETURNING: uma única ida ao banco e sem
+        # corrida entre cadastros simultâneos; nenhuma linha retornada significa email já existente
+        query = (
+            insert(UserModel)
+            .values(
+                id=user.id,
+                email=user.email,
+                hashed_password=user.hashed_password,
+                is_active=user.is_active,
+                is_admin=user.is_admin,
+                mfa_enabled=user.mfa_enabled,
+                mfa_secret=user.mfa_secret
+            )
+            .on_conflict_do_nothing(index_elements=[UserModel.email])
+            .returning(*UserModel.__table__.c)
+        )
+        
+        try:
+            result = await self.session.execute(query)
+            row = result.first()
+        except Exception as e:
+            logger.error(f"Erro ao criar usuário: {str(e)}")
+            raise
+        
+        if row is None:
+            logger.warning(f"Usuário com este email já existe: {user.email}")
+            return None
+        
+        logger.info(f"Usuário criado: id={row.id}")
+        return self._map_to_entity(row)
+    
     async def get_by_id(self, user_id: UUID) -> Optional[User]:
         try:
-            query = select(UserModel).where(UserModel.id == user_id)
-            
             try:
-                result = await self.session.execute(query)
-                db_user = result.scalars().first()
+                result = await self.session.execute(SELECT_USER_BY_ID, {"user_id": user_id})
+                db_user = result.first()
             except Exception as query_error:
                 logger.error(f"Erro na consulta por ID: {str(query_error)}")
                 raise
@@ -71,11 +114,9 @@ class SQLAlchemyUserRepository(UserRepository):
     
     async def get_by_email(self, email: str) -> Optional[User]:
         try:
-            query = select(UserModel).where(UserModel.email == email)
-            
             try:
-                result = await self.session.execute(query)
-                db_user = result.scalars().first()
+                result = await self.session.execute(SELECT_USER_BY_EMAIL, {"email": email})
+                db_user = result.first()
             except Exception as query_error:
                 logger.error(f"Erro na consulta por email: {str(query_error)}")
                 raise
@@ -90,67 +131,68 @@ class SQLAlchemyUserRepository(UserRepository):
             raise
     
     async def update(self, user: User) -> User:
+        # UPDATE ... RETURNING: uma única ida ao banco, sem carregar o objeto ORM antes
+        query = (
+            update(UserModel)
+            .where(UserModel.id == user.id)
+            .values(
+                email=user.email,
+                hashed_password=user.hashed_password,
+                is_active=user.is_active,
+                is_admin=user.is_admin,
+                mfa_enabled=user.mfa_enabled,
+                mfa_secret=user.mfa_secret
+            )
+            .returning(*UserModel.__table__.c)
+        )
+        
         try:
-            query = select(UserModel).where(UserModel.id == user.id)
             result = await self.session.execute(query)
-            db_user = result.scalars().first()
-            
-            if db_user:
-                db_user.email = user.email
-                db_user.hashed_password = user.hashed_password
-                db_user.is_active = user.is_active
-                db_user.is_admin = user.is_admin
-                db_user.mfa_enabled = user.mfa_enabled
-                db_user.mfa_secret = user.mfa_secret
-                
-                try:
-                    await self.session.flush()
-                    logger.info(f"Usuário atualizado: id={user.id}")
-                except Exception as db_error:
-                    logger.error(f"Erro na atualização: {str(db_error)}")
-                    raise
-                
-                return self._map_to_entity(db_user)
-            else:
-                logger.warning(f"Tentativa de atualizar usuário inexistente: id={user.id}")
-                return None
-            
+            row = result.first()
         except Exception as e:
             logger.error(f"Erro na atualização: {str(e)}")
             raise
+        
+        if row is None:
+            logger.warning(f"Tentativa de atualizar usuário inexistente: id={user.id}")
+            return None
+        
+        principal_cache.invalidate_user_on_commit(self.session.sync_session, user.id)
+        logger.info(f"Usuário atualizado: id={user.id}")
+        return self._map_to_entity(row)
+    
+    async def update_password_hash(self, user_id: UUID, hashed_password: str) -> bool:
+        # Savepoint: no Postgres um statement com erro aborta a transação inteira, e o
+        # restante do login (refresh token) roda na mesma sessão
+        try:
+            async with self.session.begin_nested():
+                result = await self.session.execute(
+                    UPDATE_PASSWORD_HASH, {"user_id": user_id, "new_hashed_password": hashed_password}
+                )
+        except Exception as e:
+            logger.warning(f"Falha ao atualizar o hash de senha: id={user_id}: {str(e)}")
+            return False
+        
+        principal_cache.invalidate_user_on_commit(self.session.sync_session, user_id)
+        return result.rowcount > 0
     
     async def delete(self, user_id: UUID) -> bool:
         try:
-            query = select(UserModel).where(UserModel.id == user_id)
-            result = await self.session.execute(query)
-            db_user = result.scalars().first()
-            
-            if db_user:
-                try:
-                    await self.session.delete(db_user)
-                    await self.session.flush()
-                    logger.info(f"Usuário removido: id={user_id}")
-                    return True
-                except Exception as db_error:
-                    logger.error(f"Erro ao remover: {str(db_error)}")
-                    raise
-            else:
-                logger.warning(f"Tentativa de remover usuário inexistente: id={user_id}")
-                return False
-            
+            result = await self.session.execute(
+                delete(UserModel).where(UserModel.id == user_id).returning(UserModel.id)
+            )
+            deleted = result.first() is not None
         except Exception as e:
             logger.error(f"Erro na remoção: {str(e)}")
             raise
+        
+        if not deleted:
+            logger.warning(f"Tentativa de remover usuário inexistente: id={user_id}")
+            return False
+        
+        principal_cache.invalidate_user_on_commit(self.session.sync_session, user_id)
+        logger.info(f"Usuário removido: id={user_id}")
+        return True
     
     def _map_to_entity(self, db_user: UserModel) -> User:
-        return User(
-            id=db_user.id,
-            email=db_user.email,
-            hashed_password=db_user.hashed_password,
-            is_active=db_user.is_active,
-            is_admin=db_user.is_admin,
-            created_at=db_user.created_at,
-            updated_at=db_user.updated_at,
-            mfa_enabled=db_user.mfa_enabled,
-            mfa_secret=db_user.mfa_secret
-        )
\ No newline at end of file
+        return User.from_row(db_user)
@@ -1,13 +1,16 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
+from jose import JWTError
 from sqlalchemy.ext.asyncio import AsyncSession
 import os
 from uuid import UUID
 from dotenv import load_dotenv
 
+from infrastucture.database.base import session_has_writes
 from infrastucture.database.session import get_db
 from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
+from infrastucture.security.principal_cache import principal_cache
+from infrastucture.security.jwt_keys import get_jwt_key_store
 from core.use_cases.user_use_cases import GetUserUseCase
 from core.exceptions.user_exceptions import UserNotFoundError
 
@@ -31,6 +34,9 @@ async def get_current_user(
     """
     Dependência para obter o usuário atual a partir do token JWT.
     Não requer client_id ou client_secret, apenas o token de acesso.
+    
+    Usuários já autenticados são servidos pelo principal_cache, sem decodificar
+    o token nem consultar o banco novamente.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -38,12 +44,15 @@ async def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    cached = principal_cache.get(token)
+    if cached is not None:
+        _, user = cached
+        if not user.is_active:
+            raise credentials_exception
+        return user
+    
     try:
-        payload = jwt.decode(
-            token, 
-            os.getenv("SECRET_KEY"), 
-            algorithms=[os.getenv("ALGORITHM", "HS256")]
-        )
+        payload = get_jwt_key_store().decode(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
@@ -55,8 +64,12 @@ async def get_current_user(
     
     try:
         user = await get_user_use_case.execute(UUID(user_id))
+        if not session_has_writes(db):
+            # Devolve a conexão ao pool; a rota só retira outra se precisar do banco
+            await db.rollback()
         if not user.is_active:
             raise credentials_exception
+        principal_cache.set(token, payload, user)
         return user
     except (UserNotFoundError, ValueError):
         raise credentials_exception
\ No newline at end of file
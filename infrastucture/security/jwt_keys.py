@@ -0,0 +1,162 @@
+import argparse
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+# Algoritmos assimétricos suportados pelo python-jose para assinatura com chave privada
+ASYMMETRIC_ALGORITHMS = {"RS256", "RS384", "RS512", "ES256", "ES384", "ES512"}
+
+
+class JWTKeyStore:
+    """
+    Chaves de assinatura e verificação de JWT, carregadas uma única vez por processo.
+
+    Em modo HS* usa o SECRET_KEY compartilhado. Em modo RS*/ES* lê os arquivos
+    `<kid>.pem` de `keys_dir`: a chave privada de `active_kid` assina os tokens e
+    todas as chaves públicas do diretório são aceitas na verificação. Para rotacionar,
+    adicione a nova chave privada, aponte `JWT_ACTIVE_KID` para ela e mantenha a chave
+    pública anterior no diretório até os tokens antigos expirarem.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        secret_key: Optional[str] = None,
+        keys_dir: Optional[str] = None,
+        active_kid: Optional[str] = None
+    ):
+        self.algorithm = algorithm
+        self.active_kid: Optional[str] = None
+        self._signing_key: Any = None
+        self._verification_keys: Dict[str, Key] = {}
+
+        if self.is_asymmetric:
+            self._load_keys(keys_dir, active_kid)
+        else:
+            self._signing_key = secret_key
+
+        self._jwks = self._build_jwks()
+
+    @property
+    def is_asymmetric(self) -> bool:
+        return self.algorithm in ASYMMETRIC_ALGORITHMS
+
+    def _load_keys(self, keys_dir: Optional[str], active_kid: Optional[str]) -> None:
+        if not keys_dir or not os.path.isdir(keys_dir):
+            raise ValueError(f"Diretório de chaves JWT não encontrado: {keys_dir}")
+
+        private_keys: Dict[str, Key] = {}
+        for filename in sorted(os.listdir(keys_dir)):
+            if not filename.endswith(".pem"):
+                continue
+
+            kid = filename[:-len(".pem")]
+            with open(os.path.join(keys_dir, filename)) as key_file:
+                key = jwk.construct(key_file.read(), self.algorithm)
+
+            if key.is_public():
+                self._verification_keys[kid] = key
+            else:
+                private_keys[kid] = key
+                self._verification_keys[kid] = key.public_key()
+
+        if active_kid is None and len(private_keys) == 1:
+            active_kid = next(iter(private_keys))
+
+        if active_kid not in private_keys:
+            raise ValueError(f"Chave privada ativa não encontrada para kid={active_kid}")
+
+        self.active_kid = active_kid
+        self._signing_key = private_keys[active_kid]
+        logger.info(
+            f"Chaves JWT carregadas: algoritmo={self.algorithm}, kid ativo={active_kid}, "
+            f"chaves de verificação={list(self._verification_keys)}"
+        )
+
+    def _build_jwks(self) -> Dict[str, Any]:
+        keys = []
+        for kid, key in self._verification_keys.items():
+            public_jwk = key.to_dict()
+            public_jwk.update({"kid": kid, "use": "sig", "alg": self.algorithm})
+            keys.append(public_jwk)
+        return {"keys": keys}
+
+    def encode(self, claims: Dict[str, Any]) -> str:
+        headers = {"kid": self.active_kid} if self.active_kid else None
+        return jwt.encode(claims, self._signing_key, algorithm=self.algorithm, headers=headers)
+
+    def decode(self, token: str) -> Dict[str, Any]:
+        """Verifica o token e retorna as claims. Lança JWTError se for inválido."""
+        if not self.is_asymmetric:
+            return jwt.decode(token, self._signing_key, algorithms=[self.algorithm])
+
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._verification_keys.get(kid)
+        if key is None:
+            raise JWTError(f"Chave de verificação desconhecida: kid={kid}")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self) -> Dict[str, Any]:
+        """JWK Set público (vazio em modo HS*, em que não há chave publicável)"""
+        return self._jwks
+
+
+_key_store: Optional[JWTKeyStore] = None
+
+
+def get_jwt_key_store() -> JWTKeyStore:
+    global _key_store
+    if _key_store is None:
+        _key_store = JWTKeyStore(
+            algorithm=os.getenv("ALGORITHM", "HS256"),
+            secret_key=os.getenv("SECRET_KEY"),
+            keys_dir=os.getenv("JWT_KEYS_DIR", "keys"),
+            active_kid=os.getenv("JWT_ACTIVE_KID") or None
+        )
+    return _key_store
+
+
+def reload_jwt_key_store() -> JWTKeyStore:
+    """Recarrega as chaves do disco (ex.: após uma rotação)"""
+    global _key_store
+    _key_store = None
+    return get_jwt_key_store()
+
+
+def generate_key(keys_dir: str, kid: str, algorithm: str) -> str:
+    """Gera um novo par de chaves em `<keys_dir>/<kid>.pem`"""
+    if algorithm.startswith("RS"):
+        import rsa
+        _, private_key = rsa.newkeys(2048)
+        pem = private_key.save_pkcs1()
+    elif algorithm.startswith("ES"):
+        import ecdsa
+        curves = {"ES256": ecdsa.NIST256p, "ES384": ecdsa.NIST384p, "ES512": ecdsa.NIST521p}
+        pem = ecdsa.SigningKey.generate(curve=curves[algorithm]).to_pem()
+    else:
+        raise ValueError(f"Algoritmo não suportado para geração de chaves: {algorithm}")
+
+    os.makedirs(keys_dir, exist_ok=True)
+    path = os.path.join(keys_dir, f"{kid}.pem")
+    with open(path, "wb") as key_file:
+        key_file.write(pem)
+    os.chmod(path, 0o600)
+    return path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera uma chave de assinatura JWT")
+    parser.add_argument("--kid", required=True, help="Identificador da chave (nome do arquivo)")
+    parser.add_argument("--dir", default=os.getenv("JWT_KEYS_DIR", "keys"), help="Diretório das chaves")
+    parser.add_argument("--algorithm", default=os.getenv("ALGORITHM", "RS256"), help="RS256 ou ES256")
+    args = parser.parse_args()
+
+    print(generate_key(args.dir, args.kid, args.algorithm))
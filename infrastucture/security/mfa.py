@@ -1,17 +1,184 @@
-import pyotp
-import qrcode
+import asyncio
 import base64
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
 from io import BytesIO
+from typing import Optional, Tuple
+
+import pyotp
+from pyotp.utils import strings_equal
 
 from core.interfaces.security import MFAService
 from core.exceptions.user_exceptions import InvalidMFACodeError
 
+logger = logging.getLogger(__name__)
+
+# QR codes gerados ficam em cache até a configuração ser verificada ou abandonada (TTL)
+MFA_QR_CACHE_TTL_SECONDS = int(os.getenv("MFA_QR_CACHE_TTL_SECONDS", "600"))
+MFA_QR_CACHE_MAX_SIZE = int(os.getenv("MFA_QR_CACHE_MAX_SIZE", "1000"))
+
+QR_CODE_FORMATS = ("png", "svg")
+
+# Passos de 30s aceitos antes e depois do atual (0 = apenas o passo atual, padrão do pyotp)
+MFA_TOTP_VALID_WINDOW = int(os.getenv("MFA_TOTP_VALID_WINDOW", "0"))
+
+
+def render_qr_code(provisioning_uri: str, image_format: str = "png") -> str:
+    """
+    Renderiza o QR code como data URI.
+    
+    "svg" gera o SVG com a fábrica de paths do qrcode, sem codificar PNG com o Pillow.
+    """
+    import qrcode
+    
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(provisioning_uri)
+    qr.make(fit=True)
+    
+    buffered = BytesIO()
+    if image_format == "svg":
+        from qrcode.image.svg import SvgPathImage
+        qr.make_image(image_factory=SvgPathImage).save(buffered)
+        mime_type = "image/svg+xml"
+    else:
+        qr.make_image(fill_color="black", back_color="white").save(buffered, format="PNG")
+        mime_type = "image/png"
+    
+    return f"data:{mime_type};base64,{base64.b64encode(buffered.getvalue()).decode()}"
+
+
+class QRCodeCache:
+    """
+    Cache LRU dos QR codes renderizados, indexado por (URI de provisionamento, formato).
+    
+    Acessado a partir das threads de renderização, por isso protegido por lock.
+    """
+    
+    def __init__(self, max_size: int = MFA_QR_CACHE_MAX_SIZE, ttl_seconds: int = MFA_QR_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, provisioning_uri: str, image_format: str) -> Optional[str]:
+        key = (provisioning_uri, image_format)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= time.time():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def set(self, provisioning_uri: str, image_format: str, qr_code: str) -> None:
+        if self.max_size <= 0:
+            return
+        
+        with self._lock:
+            self._entries[(provisioning_uri, image_format)] = (time.time() + self.ttl_seconds, qr_code)
+            self._entries.move_to_end((provisioning_uri, image_format))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def discard(self, provisioning_uri: str) -> None:
+        """Remove o QR code de todos os formatos para o URI"""
+        with self._lock:
+            for image_format in QR_CODE_FORMATS:
+                self._entries.pop((provisioning_uri, image_format), None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+qr_code_cache = QRCodeCache()
+
+
+class TOTPReplayCache:
+    """
+    Pares (usuário, passo de tempo) já aceitos, para que um código TOTP não seja usado duas vezes.
+    
+    O usuário é identificado pelo digest do segredo TOTP. Cada entrada expira quando o seu
+    passo sai da janela de validade: o TTL é calculado por quem chama a partir de valid_window
+    e do intervalo do TOTP, e não é fixo. A ordem de inserção é só aproximadamente a de
+    expiração (um passo aceito com offset negativo expira antes de um aceito antes dele com
+    offset positivo), então a limpeza pelo início do dicionário pode atrasar até
+    2 * valid_window passos; uma entrada vencida que ainda não saiu não muda o resultado,
+    pois o seu passo já não é aceito. Mantido por processo, como o InMemoryRateLimitBackend.
+    """
+    
+    def __init__(self, max_size: int = 100000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[Tuple[str, int], float]" = OrderedDict()
+        self.rejected = 0
+    
+    def mark_used(self, secret: str, time_step: int, ttl_seconds: float) -> bool:
+        """Registra o uso do passo; retorna False se ele já tinha sido usado"""
+        now = time.time()
+        self._evict_expired(now)
+        
+        key = (hashlib.sha256(secret.encode()).hexdigest(), time_step)
+        if key in self._entries:
+            self.rejected += 1
+            return False
+        
+        self._entries[key] = now + ttl_seconds
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return True
+    
+    def _evict_expired(self, now: float) -> None:
+        while self._entries:
+            key, expires_at = next(iter(self._entries.items()))
+            if expires_at > now:
+                break
+            del self._entries[key]
+    
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+totp_replay_cache = TOTPReplayCache()
+
 
 class PyOTPMFAService(MFAService):
     """Implementação do serviço MFA usando PyOTP"""
     
-    def __init__(self, issuer_name: str = "Carteira Digital"):
+    def __init__(
+        self,
+        issuer_name: str = "Carteira Digital",
+        qr_cache: Optional[QRCodeCache] = None,
+        replay_cache: Optional[TOTPReplayCache] = None,
+        valid_window: int = MFA_TOTP_VALID_WINDOW
+    ):
         self.issuer_name = issuer_name
+        self.qr_cache = qr_cache or qr_code_cache
+        self.replay_cache = replay_cache or totp_replay_cache
+        self.valid_window = valid_window
     
     def generate_secret(self) -> str:
         """Gera um novo segredo para TOTP"""
@@ -22,45 +189,54 @@ class PyOTPMFAService(MFAService):
         totp = pyotp.TOTP(secret)
         return totp.provisioning_uri(name=email, issuer_name=self.issuer_name)
     
-    def generate_qr_code(self, provisioning_uri: str) -> str:
-        """Gera um QR code como string base64 para o URI de provisionamento"""
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(provisioning_uri)
-        qr.make(fit=True)
-        
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffered = BytesIO()
-        img.save(buffered, format="PNG")
-        return f"data:image/png;base64,{base64.b64encode(buffered.getvalue()).decode()}"
+    def generate_qr_code(self, provisioning_uri: str, image_format: str = "png") -> str:
+        """Gera um QR code como data URI base64 para o URI de provisionamento"""
+        qr_code = self.qr_cache.get(provisioning_uri, image_format)
+        if qr_code is None:
+            qr_code = render_qr_code(provisioning_uri, image_format)
+            self.qr_cache.set(provisioning_uri, image_format, qr_code)
+        return qr_code
+    
+    def release_setup(self, secret: str, email: str) -> None:
+        """Descarta o QR code em cache de uma configuração verificada ou abandonada"""
+        self.qr_cache.discard(self.generate_provisioning_uri(secret, email))
     
     async def verify_code(self, secret: str, code: str) -> bool:
         """Verifica se o código TOTP é válido
-        Versão assíncrona para compatibilidade com contexto assíncrono.
+        Cada passo de tempo só é aceito uma vez por usuário (proteção contra replay).
         """
         if not secret or not code:
             raise InvalidMFACodeError("Código ou segredo inválidos")
         
         totp = pyotp.TOTP(secret)
-        return totp.verify(code)
+        now = time.time()
+        current_step = totp.timecode(datetime.fromtimestamp(now))
+        
+        for offset in range(-self.valid_window, self.valid_window + 1):
+            time_step = current_step + offset
+            if strings_equal(code, totp.generate_otp(time_step)):
+                # O passo fica bloqueado até sair da janela de validade
+                ttl = (time_step + self.valid_window + 1) * totp.interval - now
+                if not self.replay_cache.mark_used(secret, time_step, ttl):
+                    logger.warning("Código TOTP reutilizado")
+                    return False
+                return True
+        
+        return False
     
-    async def setup_mfa(self, email: str) -> dict:
+    async def setup_mfa(self, email: str, image_format: str = "png", secret: Optional[str] = None) -> dict:
         """Configura MFA para um usuário e retorna as informações necessárias
-        Versão assíncrona para compatibilidade com contexto assíncrono.
+        Com o segredo de uma configuração pendente, o URI se repete e o QR code vem do cache.
+        A renderização do QR code roda no pool de threads para não bloquear o event loop.
         """
-        # Todas as operações aqui são síncronas, mas o método é assíncrono
-        # para compatibilidade com a interface
-        secret = self.generate_secret()
+        secret = secret or self.generate_secret()
         provisioning_uri = self.generate_provisioning_uri(secret, email)
-        qr_code_url = self.generate_qr_code(provisioning_uri)
         
-        # Retorna um dicionário diretamente, não uma coroutine
+        loop = asyncio.get_running_loop()
+        qr_code_url = await loop.run_in_executor(None, self.generate_qr_code, provisioning_uri, image_format)
+        
         return {
             "secret": secret,
             "qr_code_url": qr_code_url,
             "provisioning_uri": provisioning_uri
-        } 
\ No newline at end of file
+        }
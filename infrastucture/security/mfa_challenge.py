@@ -0,0 +1,110 @@
+import copy
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from uuid import UUID
+
+from jose import JWTError
+
+from core.entities.user import User
+from core.exceptions.user_exceptions import InvalidMFAChallengeError
+from core.interfaces.security import MFAChallengeService
+from infrastucture.security.jwt_keys import JWTKeyStore, get_jwt_key_store
+
+logger = logging.getLogger(__name__)
+
+# Validade do desafio entre /auth/check-mfa e /auth/mfa/login
+MFA_CHALLENGE_EXPIRE_SECONDS = int(os.getenv("MFA_CHALLENGE_EXPIRE_SECONDS", "300"))
+
+CHALLENGE_TOKEN_TYPE = "mfa_challenge"
+
+
+class JWTMFAChallengeService(MFAChallengeService):
+    """
+    Desafio MFA assinado com as mesmas chaves do access token.
+
+    O token não tem a claim `sub`, então não é aceito por get_current_user, e só é aceito
+    aqui se `typ` for "mfa_challenge". O usuário carregado na primeira etapa fica guardado
+    por jti neste processo; se a segunda etapa cair em outro worker, o caso de uso busca o
+    usuário por id.
+    """
+
+    def __init__(
+        self,
+        key_store: Optional[JWTKeyStore] = None,
+        expire_seconds: int = MFA_CHALLENGE_EXPIRE_SECONDS,
+        max_pending: int = 10000
+    ):
+        self.key_store = key_store or get_jwt_key_store()
+        self.expire_seconds = expire_seconds
+        self.max_pending = max_pending
+        self._pending: "OrderedDict[str, Tuple[float, Optional[User]]]" = OrderedDict()
+
+    def issue(self, user: User) -> str:
+        jti = uuid.uuid4().hex
+        token = self.key_store.encode({
+            "typ": CHALLENGE_TOKEN_TYPE,
+            "uid": str(user.id),
+            "jti": jti,
+            "exp": datetime.utcnow() + timedelta(seconds=self.expire_seconds),
+        })
+
+        self._pending[jti] = (time.time() + self.expire_seconds, copy.copy(user))
+        self._evict()
+
+        return token
+
+    def resolve(self, challenge_token: str) -> Tuple[UUID, Optional[User]]:
+        claims = self._decode(challenge_token)
+
+        user = None
+        entry = self._pending.get(claims["jti"])
+        if entry is not None:
+            if entry[1] is None:
+                # Desafio já concluído neste processo
+                raise InvalidMFAChallengeError()
+            user = copy.copy(entry[1])
+
+        return UUID(claims["uid"]), user
+
+    def discard(self, challenge_token: str) -> None:
+        try:
+            claims = self._decode(challenge_token)
+        except InvalidMFAChallengeError:
+            return
+        # Mantém o jti até o exp do token para recusar um segundo uso
+        self._pending[claims["jti"]] = (float(claims["exp"]), None)
+        self._pending.move_to_end(claims["jti"])
+        self._evict()
+
+    def _evict(self) -> None:
+        now = time.time()
+        while self._pending:
+            expires_at, _ = next(iter(self._pending.values()))
+            if expires_at > now and len(self._pending) <= self.max_pending:
+                break
+            self._pending.popitem(last=False)
+
+    def _decode(self, challenge_token: str) -> dict:
+        try:
+            claims = self.key_store.decode(challenge_token)
+        except JWTError:
+            raise InvalidMFAChallengeError()
+
+        if claims.get("typ") != CHALLENGE_TOKEN_TYPE or not claims.get("uid") or not claims.get("jti"):
+            raise InvalidMFAChallengeError()
+        return claims
+
+
+_challenge_service: Optional[JWTMFAChallengeService] = None
+
+
+def get_mfa_challenge_service() -> JWTMFAChallengeService:
+    global _challenge_service
+    if _challenge_service is None:
+        _challenge_service = JWTMFAChallengeService()
+    return _challenge_service
@@ -1,12 +1,187 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
 from passlib.context import CryptContext
+
 from core.interfaces.security import PasswordHasher
+from core.exceptions.user_exceptions import PasswordHasherOverloadedError
 
-class BCryptPasswordHasher(PasswordHasher):
-    def __init__(self):
-        self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+logger = logging.getLogger(__name__)
+
+# Número de processos dedicados ao bcrypt (padrão: um por núcleo)
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+# Máximo de operações em andamento (executando + na fila) antes de rejeitar com 503
+PASSWORD_HASH_MAX_INFLIGHT = int(os.getenv("PASSWORD_HASH_MAX_INFLIGHT", "64"))
+# Quantidade de amostras de latência mantidas para as métricas
+PASSWORD_HASH_LATENCY_WINDOW = 1000
+
+# Algoritmo e custo dos hashes novos (calibrar com `python -m infrastucture.security.password_calibration`)
+PASSWORD_HASH_SCHEME = os.getenv("PASSWORD_HASH_SCHEME", "bcrypt")
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "3"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", "65536"))
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "2"))
+
+
+def build_crypt_context(
+    scheme: str = PASSWORD_HASH_SCHEME,
+    bcrypt_rounds: int = BCRYPT_ROUNDS,
+    argon2_time_cost: int = ARGON2_TIME_COST,
+    argon2_memory_cost: int = ARGON2_MEMORY_COST,
+    argon2_parallelism: int = ARGON2_PARALLELISM
+) -> CryptContext:
+    """
+    Cria o CryptContext com o custo configurado.
     
+    Hashes de outro algoritmo ou com custo diferente continuam sendo verificados,
+    mas são marcados por `needs_update` para serem refeitos no próximo login.
+    """
+    options = {"bcrypt__rounds": bcrypt_rounds}
+    schemes = ["bcrypt"]
+    if scheme == "argon2":
+        schemes = ["argon2", "bcrypt"]
+        options.update({
+            "argon2__time_cost": argon2_time_cost,
+            "argon2__memory_cost": argon2_memory_cost,
+            "argon2__parallelism": argon2_parallelism,
+        })
+    return CryptContext(schemes=schemes, deprecated="auto", **options)
+
+
+# Contexto usado dentro dos processos do pool
+_worker_context = build_crypt_context()
+
+
+def _hash_in_worker(password: str) -> str:
+    return _worker_context.hash(password)
+
+
+def _verify_in_worker(plain_password: str, hashed_password: str) -> bool:
+    return _worker_context.verify(plain_password, hashed_password)
+
+
+class PasswordHashingService:
+    """
+    Executa hashing e verificação de senhas em um pool de processos limitado,
+    liberando o event loop durante o bcrypt.
+
+    Quando o número de operações em andamento atinge `max_inflight`, novas
+    requisições são rejeitadas com PasswordHasherOverloadedError.
+    """
+
+    def __init__(self, max_workers: int = PASSWORD_HASH_WORKERS, max_inflight: int = PASSWORD_HASH_MAX_INFLIGHT):
+        self.max_workers = max(1, max_workers)
+        self.max_inflight = max(1, max_inflight)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._latencies = deque(maxlen=PASSWORD_HASH_LATENCY_WINDOW)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            logger.info(f"Iniciando pool de hashing de senhas com {self.max_workers} processos")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._executor
+
+    async def _run(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self._inflight >= self.max_inflight:
+            self._rejected += 1
+            logger.warning(f"Pool de hashing saturado ({self._inflight} em andamento), rejeitando requisição")
+            raise PasswordHasherOverloadedError()
+
+        self._inflight += 1
+        started_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), func, *args)
+            self._completed += 1
+            return result
+        except Exception:
+            self._failed += 1
+            raise
+        finally:
+            self._inflight -= 1
+            self._latencies.append(time.perf_counter() - started_at)
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_in_worker, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify_in_worker, plain_password, hashed_password)
+
+    def get_stats(self) -> dict:
+        """Retorna métricas de fila e latência do pool"""
+        samples = sorted(self._latencies)
+
+        def percentile(p: float) -> Optional[float]:
+            if not samples:
+                return None
+            index = min(len(samples) - 1, int(round(p * (len(samples) - 1))))
+            return round(samples[index] * 1000, 2)
+
+        return {
+            "workers": self.max_workers,
+            "max_inflight": self.max_inflight,
+            "inflight": self._inflight,
+            "queue_depth": max(0, self._inflight - self.max_workers),
+            "completed": self._completed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "latency_ms": {
+                "p50": percentile(0.50),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(samples[-1] * 1000, 2) if samples else None,
+            },
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+_hashing_service: Optional[PasswordHashingService] = None
+
+
+def get_password_hashing_service() -> PasswordHashingService:
+    """Retorna o serviço de hashing compartilhado pelo processo da API"""
+    global _hashing_service
+    if _hashing_service is None:
+        _hashing_service = PasswordHashingService()
+    return _hashing_service
+
+
+def shutdown_password_hashing_service() -> None:
+    global _hashing_service
+    if _hashing_service is not None:
+        _hashing_service.shutdown()
+        _hashing_service = None
+
+
+class BCryptPasswordHasher(PasswordHasher):
+    def __init__(self, hashing_service: Optional[PasswordHashingService] = None):
+        self.pwd_context = build_crypt_context()
+        self.hashing_service = hashing_service or get_password_hashing_service()
+
     def hash_password(self, password: str) -> str:
         return self.pwd_context.hash(password)
-    
+
     def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+        return self.pwd_context.verify(plain_password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        return self.pwd_context.needs_update(hashed_password)
+
+    async def hash_password_async(self, password: str) -> str:
+        return await self.hashing_service.hash(password)
+
+    async def verify_password_async(self, plain_password: str, hashed_password: str) -> bool:
+        return await self.hashing_service.verify(plain_password, hashed_password)
@@ -0,0 +1,84 @@
+import argparse
+import statistics
+import time
+from typing import List, Optional, Tuple
+
+from infrastucture.security.password import (
+    ARGON2_MEMORY_COST,
+    ARGON2_PARALLELISM,
+    build_crypt_context,
+)
+
+CALIBRATION_PASSWORD = "calibracao-de-custo"
+
+
+def measure_verify_ms(context, samples: int) -> float:
+    """Mediana, em ms, de uma verificação de senha com o contexto informado"""
+    hashed = context.hash(CALIBRATION_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        context.verify(CALIBRATION_PASSWORD, hashed)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_bcrypt(target_ms: float, samples: int, min_rounds: int = 10, max_rounds: int = 16) -> Tuple[Optional[int], List[Tuple[int, float]]]:
+    """
+    Mede a verificação para cada custo do bcrypt e retorna o maior que cabe no orçamento.
+
+    Como cada round a mais dobra o tempo, a busca para no primeiro custo acima do alvo.
+    """
+    results = []
+    chosen = None
+    for rounds in range(min_rounds, max_rounds + 1):
+        elapsed = measure_verify_ms(build_crypt_context("bcrypt", bcrypt_rounds=rounds), samples)
+        results.append((rounds, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen, results
+
+
+def calibrate_argon2(target_ms: float, samples: int, max_time_cost: int = 10) -> Tuple[Optional[int], List[Tuple[int, float]]]:
+    """Mesma busca do bcrypt variando o time_cost do argon2 (memória e paralelismo fixos)"""
+    results = []
+    chosen = None
+    for time_cost in range(1, max_time_cost + 1):
+        context = build_crypt_context(
+            "argon2",
+            argon2_time_cost=time_cost,
+            argon2_memory_cost=ARGON2_MEMORY_COST,
+            argon2_parallelism=ARGON2_PARALLELISM
+        )
+        elapsed = measure_verify_ms(context, samples)
+        results.append((time_cost, elapsed))
+        if elapsed > target_ms:
+            break
+        chosen = time_cost
+    return chosen, results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Mede o custo de hash de senha neste hardware e sugere a configuração para o orçamento de latência"
+    )
+    parser.add_argument("--scheme", choices=["bcrypt", "argon2"], default="bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Tempo máximo por verificação de senha")
+    parser.add_argument("--samples", type=int, default=5, help="Verificações medidas por custo")
+    args = parser.parse_args()
+
+    if args.scheme == "argon2":
+        chosen, results = calibrate_argon2(args.target_ms, args.samples)
+        env_name = "ARGON2_TIME_COST"
+    else:
+        chosen, results = calibrate_bcrypt(args.target_ms, args.samples)
+        env_name = "BCRYPT_ROUNDS"
+
+    for cost, elapsed in results:
+        print(f"{env_name}={cost}: {elapsed:.1f} ms")
+
+    if chosen is None:
+        print(f"Nenhum custo cabe em {args.target_ms:.0f} ms; use o menor custo medido ou aumente o orçamento")
+    else:
+        print(f"\nRecomendado: PASSWORD_HASH_SCHEME={args.scheme} {env_name}={chosen}")
@@ -0,0 +1,134 @@
+import copy
+import hashlib
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from core.entities.user import User
+
+logger = logging.getLogger(__name__)
+
+# Tempo máximo que um usuário autenticado fica em cache (limitado também pelo exp do token)
+PRINCIPAL_CACHE_TTL_SECONDS = int(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+# Invalidações aguardando o commit, em Session.info
+PENDING_INVALIDATIONS_KEY = "principal_cache_pending_invalidations"
+
+
+class PrincipalCache:
+    """
+    Cache LRU em memória dos usuários autenticados, indexado pelo digest do token.
+
+    Guarda as claims já decodificadas e a entidade User, evitando decodificar o JWT
+    e consultar a tabela users a cada requisição protegida. As entradas expiram no
+    menor valor entre o TTL configurado e o `exp` do token, e são invalidadas pelo
+    repositório sempre que o usuário é alterado ou removido, antes e depois do commit.
+    """
+
+    def __init__(self, max_size: int = PRINCIPAL_CACHE_MAX_SIZE, ttl_seconds: int = PRINCIPAL_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any], User]]" = OrderedDict()
+        self._keys_by_user: Dict[UUID, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], User]]:
+        if self.max_size <= 0:
+            return None
+
+        key = self.token_digest(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, claims, user = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        # Cópia para que alterações feitas na rota não contaminem o cache
+        return claims, copy.copy(user)
+
+    def set(self, token: str, claims: Dict[str, Any], user: User) -> None:
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.time() + self.ttl_seconds
+        token_exp = claims.get("exp")
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        if expires_at <= time.time():
+            return
+
+        key = self.token_digest(token)
+        self._remove(key)
+        self._entries[key] = (expires_at, claims, copy.copy(user))
+        self._keys_by_user.setdefault(user.id, set()).add(key)
+
+        while len(self._entries) > self.max_size:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def invalidate_user(self, user_id: UUID) -> None:
+        """Remove todas as entradas de um usuário (ex.: desativação ou mudança de MFA)"""
+        keys = self._keys_by_user.pop(user_id, set())
+        for key in keys:
+            self._entries.pop(key, None)
+        if keys:
+            logger.debug(f"Cache de autenticação invalidado: user_id={user_id}")
+
+    def invalidate_user_on_commit(self, session: Session, user_id: UUID) -> None:
+        """
+        Invalida agora e de novo após o commit da sessão: até o commit, uma requisição
+        concorrente ainda lê a linha antiga e pode colocá-la de volta no cache.
+        """
+        self.invalidate_user(user_id)
+        session.info.setdefault(PENDING_INVALIDATIONS_KEY, set()).add((self, user_id))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._keys_by_user.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[2].id
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+    def get_stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session: Session) -> None:
+    for cache, user_id in session.info.pop(PENDING_INVALIDATIONS_KEY, ()):
+        cache.invalidate_user(user_id)
+
+
+principal_cache = PrincipalCache()
@@ -0,0 +1,213 @@
+import ipaddress
+import logging
+import os
+import random
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple, Union
+
+from fastapi import Request
+from sqlalchemy import text
+
+from core.exceptions.user_exceptions import TooManyLoginAttemptsError
+
+logger = logging.getLogger(__name__)
+
+# Limites de tentativas de login por janela deslizante
+LOGIN_RATE_LIMIT_WINDOW_SECONDS = int(os.getenv("LOGIN_RATE_LIMIT_WINDOW_SECONDS", "60"))
+LOGIN_RATE_LIMIT_PER_EMAIL = int(os.getenv("LOGIN_RATE_LIMIT_PER_EMAIL", "5"))
+LOGIN_RATE_LIMIT_PER_IP = int(os.getenv("LOGIN_RATE_LIMIT_PER_IP", "20"))
+# "memory" (por processo) ou "postgres" (compartilhado entre workers)
+LOGIN_RATE_LIMIT_BACKEND = os.getenv("LOGIN_RATE_LIMIT_BACKEND", "memory")
+# Proxies/balanceadores na frente da API (IPs ou CIDRs separados por vírgula); o cabeçalho
+# de IP encaminhado só é lido em conexões vindas deles
+TRUSTED_PROXIES = [
+    ipaddress.ip_network(network.strip(), strict=False)
+    for network in os.getenv("TRUSTED_PROXIES", "").split(",") if network.strip()
+]
+FORWARDED_FOR_HEADER = os.getenv("FORWARDED_FOR_HEADER", "X-Forwarded-For")
+
+
+def _is_trusted_proxy(address: str, trusted_proxies: List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]]) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted_proxies)
+
+
+def client_ip(
+    request: Request,
+    trusted_proxies: List[Union[ipaddress.IPv4Network, ipaddress.IPv6Network]] = TRUSTED_PROXIES,
+    header: str = FORWARDED_FOR_HEADER
+) -> Optional[str]:
+    """
+    IP do cliente para o limite por IP. Atrás de um proxy confiável, request.client é o
+    próprio proxy: usa o endereço mais à direita do cabeçalho que não seja de outro proxy
+    confiável, já que os anteriores podem ter sido enviados pelo cliente.
+    """
+    if request.client is None:
+        return None
+    peer = request.client.host
+    if not _is_trusted_proxy(peer, trusted_proxies):
+        return peer
+
+    forwarded = [address.strip() for address in request.headers.get(header, "").split(",") if address.strip()]
+    for address in reversed(forwarded):
+        if not _is_trusted_proxy(address, trusted_proxies):
+            return address
+    return forwarded[0] if forwarded else peer
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def hit(self, key: str, window_seconds: int) -> float:
+        """Registra uma tentativa e retorna a contagem estimada na janela deslizante"""
+        pass
+
+
+def _sliding_count(current: int, previous: int, now: float, window_seconds: int) -> float:
+    # Janela deslizante aproximada: a janela anterior pesa proporcionalmente ao tempo restante
+    elapsed = (now % window_seconds) / window_seconds
+    return previous * (1 - elapsed) + current
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Contadores por processo; cada worker do uvicorn mantém os seus"""
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        # chave -> (índice da janela, tentativas na janela atual, tentativas na anterior)
+        self._counters: Dict[str, Tuple[int, int, int]] = {}
+
+    async def hit(self, key: str, window_seconds: int) -> float:
+        now = time.time()
+        window = int(now // window_seconds)
+
+        last_window, current, previous = self._counters.get(key, (window, 0, 0))
+        if last_window == window - 1:
+            previous, current = current, 0
+        elif last_window != window:
+            previous, current = 0, 0
+
+        current += 1
+        self._counters[key] = (window, current, previous)
+
+        if len(self._counters) > self.max_keys:
+            self._evict_stale(window)
+
+        return _sliding_count(current, previous, now, window_seconds)
+
+    def _evict_stale(self, window: int) -> None:
+        stale = [key for key, (last_window, _, _) in self._counters.items() if last_window < window - 1]
+        for key in stale:
+            del self._counters[key]
+
+
+class PostgresRateLimitBackend(RateLimitBackend):
+    """
+    Contadores na tabela UNLOGGED rate_limit_counters, compartilhados entre workers.
+
+    Cada tentativa custa um único statement (upsert da janela atual + leitura da anterior),
+    executado em uma sessão própria para não depender do commit da requisição.
+    """
+
+    HIT_QUERY = text("""
+        WITH hit AS (
+            INSERT INTO rate_limit_counters (key, window_start, hits)
+            VALUES (:key, :window, 1)
+            ON CONFLICT (key, window_start) DO UPDATE SET hits = rate_limit_counters.hits + 1
+            RETURNING hits
+        )
+        SELECT
+            (SELECT hits FROM hit) AS current,
+            COALESCE((
+                SELECT hits FROM rate_limit_counters
+                WHERE key = :key AND window_start = :previous_window
+            ), 0) AS previous
+    """)
+
+    CLEANUP_QUERY = text("DELETE FROM rate_limit_counters WHERE window_start < :cutoff")
+
+    def __init__(self, session_factory=None, cleanup_probability: float = 0.01):
+        if session_factory is None:
+            from infrastucture.database.base import async_session
+            session_factory = async_session
+        self.session_factory = session_factory
+        self.cleanup_probability = cleanup_probability
+
+    async def hit(self, key: str, window_seconds: int) -> float:
+        now = time.time()
+        window = int(now // window_seconds)
+
+        async with self.session_factory() as session:
+            result = await session.execute(
+                self.HIT_QUERY,
+                {"key": key, "window": window, "previous_window": window - 1}
+            )
+            row = result.one()
+
+            if random.random() < self.cleanup_probability:
+                await session.execute(self.CLEANUP_QUERY, {"cutoff": window - 1})
+
+            await session.commit()
+
+        return _sliding_count(row.current, row.previous, now, window_seconds)
+
+
+class LoginThrottle:
+    """
+    Limita tentativas de login por email e por IP antes de qualquer verificação de senha.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        email_limit: int = LOGIN_RATE_LIMIT_PER_EMAIL,
+        ip_limit: int = LOGIN_RATE_LIMIT_PER_IP,
+        window_seconds: int = LOGIN_RATE_LIMIT_WINDOW_SECONDS
+    ):
+        self.backend = backend
+        self.email_limit = email_limit
+        self.ip_limit = ip_limit
+        self.window_seconds = window_seconds
+        self.allowed = 0
+        self.rejected = {"ip": 0, "email": 0}
+
+    async def check(self, email: str, client_ip: Optional[str]) -> None:
+        """
+        Registra a tentativa e lança TooManyLoginAttemptsError se algum limite for excedido.
+        """
+        if client_ip:
+            ip_count = await self.backend.hit(f"login:ip:{client_ip}", self.window_seconds)
+            if ip_count > self.ip_limit:
+                self.rejected["ip"] += 1
+                logger.warning(f"Limite de tentativas de login por IP excedido: {client_ip}")
+                raise TooManyLoginAttemptsError(retry_after=self.window_seconds)
+
+        email_count = await self.backend.hit(f"login:email:{email.strip().lower()}", self.window_seconds)
+        if email_count > self.email_limit:
+            self.rejected["email"] += 1
+            logger.warning(f"Limite de tentativas de login por email excedido: {email}")
+            raise TooManyLoginAttemptsError(retry_after=self.window_seconds)
+
+        self.allowed += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "window_seconds": self.window_seconds,
+            "email_limit": self.email_limit,
+            "ip_limit": self.ip_limit,
+            "allowed": self.allowed,
+            "rejected": dict(self.rejected),
+        }
+
+
+def _build_backend() -> RateLimitBackend:
+    if LOGIN_RATE_LIMIT_BACKEND == "postgres":
+        return PostgresRateLimitBackend()
+    return InMemoryRateLimitBackend()
+
+
+login_throttle = LoginThrottle(_build_backend())
@@ -1,17 +1,17 @@
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any
-from jose import jwt, JWTError
-import os
+from jose import JWTError
 from dotenv import load_dotenv
 
 from core.interfaces.security import TokenService
+from infrastucture.security.jwt_keys import get_jwt_key_store
 
 load_dotenv()
 
 class JWTTokenService(TokenService):
     def __init__(self):
-        self.secret_key = os.getenv("SECRET_KEY")
-        self.algorithm = os.getenv("ALGORITHM", "HS256")
+        self.key_store = get_jwt_key_store()
+        self.algorithm = self.key_store.algorithm
     
     def create_access_token(self, data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
         to_encode = data.copy()
@@ -22,13 +22,13 @@ class JWTTokenService(TokenService):
             expire = datetime.utcnow() + timedelta(minutes=15)
         
         to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, self.secret_key, algorithm=self.algorithm)
+        encoded_jwt = self.key_store.encode(to_encode)
         
         return encoded_jwt
     
     def verify_token(self, token: str) -> Dict[str, Any]:
         try:
-            payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+            payload = self.key_store.decode(token)
             return payload
         except JWTError:
             return {}
\ No newline at end of file
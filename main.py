@@ -10,9 +10,9 @@ from fastapi.responses import RedirectResponse
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
-from infrastucture.api.routers import auth, documents, transport, chatbot, health, oauth
-from infrastucture.database.session import get_db
-from infrastucture.database.init_enum import initialize_enums
+from infrastucture.api.routers import auth, documents, transport, chatbot, health, oauth, jwks
+from infrastucture.security.password import shutdown_password_hashing_service
+from infrastucture.security.jwt_keys import get_jwt_key_store
 
 def setup_logging():
     os.makedirs("logs", exist_ok=True)
@@ -78,17 +78,15 @@ async def lifespan(app: FastAPI):
     logger.info(f"Banco de dados configurado: {db_connection}")
     logger.info(f"Modo de depuração: {os.getenv('DEBUG', 'False')}")
     
-    try:
-        logger.info("Inicializando enums no banco de dados...")
-        async for db_session in get_db():
-            await initialize_enums(db_session)
-            break
-        logger.info("Enums inicializados com sucesso")
-    except Exception as e:
-        logger.error(f"Erro ao inicializar enums: {str(e)}")
+    # Carregar as chaves JWT uma única vez, falhando cedo se estiverem ausentes
+    key_store = get_jwt_key_store()
+    logger.info(f"Assinatura JWT: {key_store.algorithm}, kid ativo: {key_store.active_kid}")
+    
+    # Enums e demais passos de schema rodam no deploy (alembic upgrade head), não a cada worker
     
     yield
     
+    shutdown_password_hashing_service()
     logger.info("Aplicação finalizada")
 
 app = FastAPI(
@@ -164,6 +162,7 @@ app.include_router(documents.router, prefix=api_v1_prefix)
 app.include_router(transport.router, prefix=api_v1_prefix)
 app.include_router(chatbot.router, prefix=api_v1_prefix)
 app.include_router(health.router, prefix=api_v1_prefix)
+app.include_router(jwks.router)
 
 app.mount("/static", StaticFiles(directory="infrastucture/api/static"), name="static")
 
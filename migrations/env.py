@@ -2,11 +2,12 @@ import asyncio
 import os
 from logging.config import fileConfig
 
-from sqlalchemy import pool
+from sqlalchemy import inspect, pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
 from alembic import context
+from alembic.script import ScriptDirectory
 from dotenv import load_dotenv
 
 # Carregar variáveis de ambiente
@@ -14,6 +15,8 @@ load_dotenv()
 
 # Importar modelos para o Alembic detectar
 from infrastucture.database.models import Base
+from infrastucture.database.init_enum import run_schema_steps
+from infrastucture.database.base import DB_POOL_MODE, transaction_pooler_connect_args
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -67,11 +70,42 @@ def run_migrations_offline() -> None:
         context.run_migrations()
 
 
+def should_run_schema_steps(connection: Connection, applied_steps: list) -> bool:
+    """
+    Os passos de schema só rodam ao fim de um upgrade que chegou ao head: nunca em
+    downgrade, stamp ou comandos de consulta (current, history), nem antes de existir
+    a tabela schema_versions.
+    """
+    try:
+        destination = context.get_revision_argument()
+    except KeyError:
+        # current, history, check...: comandos sem revisão de destino
+        return False
+    # stamp recebe uma tupla de revisões; upgrade, uma revisão só
+    if not isinstance(destination, str):
+        return False
+    if any(step.is_stamp or not step.is_upgrade for step in applied_steps):
+        return False
+
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    if destination not in heads or set(context.get_context().get_current_heads()) != heads:
+        return False
+    return inspect(connection).has_table("schema_versions")
+
+
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    applied_steps = []
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        on_version_apply=lambda step, **kw: applied_steps.append(step)
+    )
 
     with context.begin_transaction():
         context.run_migrations()
+        # Passos de schema versionados (enums), uma vez por deploy e sob advisory lock
+        if should_run_schema_steps(connection, applied_steps):
+            run_schema_steps(connection)
 
 
 async def run_migrations_online() -> None:
@@ -85,6 +119,7 @@ async def run_migrations_online() -> None:
         config.get_section(config.config_ini_section),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args=transaction_pooler_connect_args() if DB_POOL_MODE == "transaction" else {},
     )
 
     async with connectable.connect() as connection:
@@ -0,0 +1,38 @@
+"""add access path indexes
+
+Revision ID: add_access_path_indexes
+Revises: add_rate_limit_counters_table
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_access_path_indexes'
+down_revision = 'add_rate_limit_counters_table'
+branch_labels = None
+depends_on = None
+
+
+# (nome, tabela, colunas); transport_cards.user_id e users.email já têm índice único
+INDEXES = [
+    # GET /documents: filtro por usuário ordenado por criação
+    ('ix_documents_user_id_created_at', 'documents', ['user_id', 'created_at']),
+    # Limpeza periódica dos contadores antigos do limitador de login
+    ('ix_rate_limit_counters_window_start', 'rate_limit_counters', ['window_start']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY não bloqueia escritas, mas não pode rodar dentro de uma transação.
+    # Um build interrompido deixa o índice INVALID; por isso o DROP ... IF EXISTS antes.
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
+            op.create_index(name, table, columns, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _ in INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,40 @@
+"""add covering index for card statement pagination
+
+Revision ID: add_card_statement_covering_index
+Revises: add_card_transactions_table
+Create Date: 2026-10-17 18:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_card_statement_covering_index'
+down_revision = 'add_card_transactions_table'
+branch_labels = None
+depends_on = None
+
+OLD_INDEX = 'ix_card_transactions_card_id_created_at_id'
+NEW_INDEX = 'ix_card_transactions_statement'
+KEY_COLUMNS = ['card_id', 'created_at', 'id']
+INCLUDED_COLUMNS = ['user_id', 'transaction_type', 'amount', 'balance_after', 'description']
+
+
+def upgrade() -> None:
+    # O índice novo é criado antes de remover o antigo: o extrato nunca fica sem índice.
+    # Um build interrompido deixa o índice INVALID; por isso o DROP ... IF EXISTS antes.
+    with op.get_context().autocommit_block():
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {NEW_INDEX}')
+        op.create_index(
+            NEW_INDEX, 'card_transactions', KEY_COLUMNS,
+            postgresql_include=INCLUDED_COLUMNS, postgresql_concurrently=True
+        )
+        op.drop_index(OLD_INDEX, table_name='card_transactions', postgresql_concurrently=True, if_exists=True)
+        # Index-only scan depende do visibility map em dia (VACUUM também não roda em transação)
+        op.execute('VACUUM (ANALYZE) card_transactions')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {OLD_INDEX}')
+        op.create_index(OLD_INDEX, 'card_transactions', KEY_COLUMNS, postgresql_concurrently=True)
+        op.drop_index(NEW_INDEX, table_name='card_transactions', postgresql_concurrently=True, if_exists=True)
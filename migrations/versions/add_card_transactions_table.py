@@ -0,0 +1,52 @@
+"""add card transactions ledger
+
+Revision ID: add_card_transactions_table
+Revises: add_uuid7_defaults
+Create Date: 2026-10-17 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'add_card_transactions_table'
+down_revision = 'add_uuid7_defaults'
+branch_labels = None
+depends_on = None
+
+transaction_type = postgresql.ENUM('OPENING_BALANCE', 'RECHARGE', 'CHARGE', name='cardtransactiontype')
+
+
+def upgrade() -> None:
+    op.create_table(
+        'card_transactions',
+        sa.Column('id', sa.UUID(), nullable=False, server_default=sa.text('uuid_generate_v7()')),
+        sa.Column('card_id', sa.UUID(), nullable=False),
+        sa.Column('user_id', sa.UUID(), nullable=False),
+        sa.Column('transaction_type', transaction_type, nullable=False),
+        sa.Column('amount', sa.Numeric(10, 2), nullable=False),
+        sa.Column('balance_after', sa.Numeric(10, 2), nullable=False),
+        sa.Column('description', sa.String(100), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['card_id'], ['transport_cards.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_card_transactions_card_id_created_at_id', 'card_transactions', ['card_id', 'created_at', 'id']
+    )
+    # Saldos anteriores ao extrato viram um lançamento inicial: a soma do extrato
+    # passa a ser igual ao saldo de todos os cartões desde já
+    op.execute("""
+        INSERT INTO card_transactions (card_id, user_id, transaction_type, amount, balance_after, description)
+        SELECT id, user_id, 'OPENING_BALANCE', balance, balance, 'Saldo anterior ao extrato'
+        FROM transport_cards
+        WHERE balance <> 0
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_card_transactions_card_id_created_at_id', table_name='card_transactions')
+    op.drop_table('card_transactions')
+    transaction_type.drop(op.get_bind(), checkfirst=True)
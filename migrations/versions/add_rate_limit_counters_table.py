@@ -0,0 +1,30 @@
+"""add rate limit counters table
+
+Revision ID: add_rate_limit_counters_table
+Revises: add_refresh_tokens_table
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_rate_limit_counters_table'
+down_revision = 'add_refresh_tokens_table'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: contadores efêmeros do limitador de login, sem custo de WAL
+    op.execute("""
+        CREATE UNLOGGED TABLE rate_limit_counters (
+            key VARCHAR NOT NULL,
+            window_start BIGINT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (key, window_start)
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('rate_limit_counters')
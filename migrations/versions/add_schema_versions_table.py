@@ -0,0 +1,30 @@
+"""add schema versions table
+
+Revision ID: add_schema_versions_table
+Revises: add_access_path_indexes
+Create Date: 2026-10-17 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'add_schema_versions_table'
+down_revision = 'add_access_path_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Versão aplicada de cada passo de schema fora do Alembic (ver init_enum.run_schema_steps)
+    op.create_table(
+        'schema_versions',
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('version', sa.String(), nullable=False),
+        sa.Column('applied_at', sa.DateTime(timezone=True), server_default=sa.text('now()')),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('schema_versions')
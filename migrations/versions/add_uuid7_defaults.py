@@ -0,0 +1,52 @@
+"""use uuid7 for new primary keys
+
+Revision ID: add_uuid7_defaults
+Revises: add_schema_versions_table
+Create Date: 2026-10-17 16:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = 'add_uuid7_defaults'
+down_revision = 'add_schema_versions_table'
+branch_labels = None
+depends_on = None
+
+TABLES = ['users', 'documents', 'transport_cards', 'refresh_tokens']
+
+
+def upgrade() -> None:
+    # A aplicação já gera UUIDv7 (core.entities.ids.uuid7); o padrão no banco cobre inserts
+    # feitos fora dela. Só as linhas novas mudam: as chaves UUIDv4 existentes continuam
+    # válidas e não são reescritas (seriam atualizações em cascata nas FKs e um índice novo
+    # inteiro). O índice fica "compacto" à medida que as inserções novas dominam.
+    #
+    # Parte de um UUIDv4 (variante correta), sobrescreve os 48 bits iniciais com o
+    # timestamp em ms e troca a versão de 4 para 7 ligando os bits 52 e 53.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION uuid_generate_v7() RETURNS uuid AS $$
+            SELECT encode(
+                set_bit(
+                    set_bit(
+                        overlay(
+                            uuid_send(gen_random_uuid())
+                            PLACING substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) FROM 3)
+                            FROM 1 FOR 6
+                        ),
+                        52, 1
+                    ),
+                    53, 1
+                ),
+                'hex'
+            )::uuid
+        $$ LANGUAGE sql VOLATILE
+    """)
+    for table in TABLES:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id SET DEFAULT uuid_generate_v7()')
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'ALTER TABLE {table} ALTER COLUMN id DROP DEFAULT')
+    op.execute('DROP FUNCTION IF EXISTS uuid_generate_v7()')
@@ -0,0 +1,93 @@
+"""
+Benchmark de concorrência das cobranças no mesmo cartão: leitura + débito em Python + UPDATE
+(antes) vs. UPDATE ... SET balance = balance - :amount WHERE balance >= :amount (depois).
+
+Dispara centenas de cobranças simultâneas, cada uma na própria sessão/transação, e confere
+se o saldo final bate com o número de cobranças aceitas (diferença = atualização perdida).
+Requer o banco configurado (DB_HOST, DB_USER, ...) com as migrações aplicadas:
+
+    python -m tests.benchmarks.bench_card_charges --charges 500
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+
+from core.entities.transport_card import TransportCard
+from core.entities.user import User
+from core.exceptions.transport_exceptions import InsufficientBalanceError
+from core.use_cases.transport_card_use_cases import ChargeTransportCardUseCase
+from infrastucture.database.base import async_session, engine
+from infrastucture.repositories.transport_card_repository import SQLAlchemyTransportCardRepository
+from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
+
+FARE = Decimal("4.40")
+
+
+# Fluxo anterior (ler o cartão, debitar na entidade e gravar o saldo calculado), só para comparação
+
+async def legacy_charge(session, user_id: uuid.UUID) -> None:
+    repository = SQLAlchemyTransportCardRepository(session)
+    transport_card = await repository.get_by_user_id(user_id)
+    transport_card.deduct_balance(FARE)
+    await repository.update(transport_card)
+
+
+async def atomic_charge(session, user_id: uuid.UUID) -> None:
+    use_case = ChargeTransportCardUseCase(SQLAlchemyTransportCardRepository(session), SQLAlchemyUserRepository(session))
+    await use_case.execute(user_id, FARE)
+
+
+async def run_scenario(name: str, charge, charges: int, initial_balance: Decimal) -> None:
+    async with async_session() as session:
+        user = await SQLAlchemyUserRepository(session).create_if_absent(User(
+            email=f"bench-{uuid.uuid4().hex}@example.com",
+            hashed_password="hash",
+            is_active=True,
+            is_admin=False
+        ))
+        await SQLAlchemyTransportCardRepository(session).create(TransportCard(user_id=user.id, balance=initial_balance))
+        await session.commit()
+
+    accepted = 0
+    rejected = 0
+
+    async def one_charge() -> None:
+        nonlocal accepted, rejected
+        async with async_session() as session:
+            try:
+                await charge(session, user.id)
+                await session.commit()
+                accepted += 1
+            except InsufficientBalanceError:
+                await session.rollback()
+                rejected += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one_charge() for _ in range(charges)))
+    elapsed = time.perf_counter() - start
+
+    async with async_session() as session:
+        final_balance = (await SQLAlchemyTransportCardRepository(session).get_by_user_id(user.id)).balance
+
+    expected_balance = initial_balance - FARE * accepted
+    lost_updates = (final_balance - expected_balance) / FARE
+    print(f"{name:<8} {charges / elapsed:8.0f} cobranças/s  aceitas {accepted:4d}  recusadas {rejected:4d}  "
+          f"saldo final {final_balance:8.2f}  esperado {expected_balance:8.2f}  perdidas {lost_updates:4.0f}")
+
+
+async def run(charges: int) -> None:
+    # Saldo para cerca de metade das cobranças: exercita também a recusa por saldo insuficiente
+    initial_balance = FARE * (charges // 2)
+    await run_scenario("antes", legacy_charge, charges, initial_balance)
+    await run_scenario("depois", atomic_charge, charges, initial_balance)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara cobranças simultâneas no mesmo cartão antes e depois do débito atômico")
+    parser.add_argument("--charges", type=int, default=300)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.charges))
@@ -0,0 +1,194 @@
+"""
+Benchmark do envio de passagens pelos validadores: uma cobrança por requisição (antes) vs.
+lote aplicado em uma transação com SQL em conjunto (depois), com 10 mil passagens por lote.
+
+O modo --no-db mede só a parte em Python do lote (validação do corpo, decisão de cada passagem
+e montagem da resposta), com repositórios em memória. O modo completo requer o banco
+configurado (DB_HOST, DB_USER, ...) com as migrações aplicadas:
+
+    python -m tests.benchmarks.bench_charge_batch --events 10000
+    python -m tests.benchmarks.bench_charge_batch --events 10000 --no-db
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy import text
+
+from core.entities.charge_event import ChargeEvent, ChargeEventStatus
+from core.entities.ids import uuid7
+from core.entities.transport_card import TransportCard
+from core.exceptions.transport_exceptions import InsufficientBalanceError
+from core.use_cases.transport_card_use_cases import ChargeBatchUseCase, ChargeTransportCardUseCase
+from infrastucture.api.dtos.transport_dtos import CardChargeBatchRequest, CardChargeBatchResponse, CardChargeEventResult
+
+FARE = Decimal("4.40")
+
+
+def build_events(user_ids: List[uuid.UUID], count: int, seed: int = 42) -> List[ChargeEvent]:
+    rng = random.Random(seed)
+    return [ChargeEvent(uuid7(), rng.choice(user_ids), FARE, "Catraca") for _ in range(count)]
+
+
+def summary(name: str, events: int, elapsed: float, counts: Dict[ChargeEventStatus, int]) -> None:
+    totals = "  ".join(f"{status.value} {counts.get(status, 0):5d}" for status in ChargeEventStatus)
+    print(f"{name:<8} {events / elapsed:9.0f} passagens/s  ({elapsed:7.3f} s)  {totals}")
+
+
+class InMemoryTransportCardRepository:
+    def __init__(self, cards: Dict[uuid.UUID, TransportCard]):
+        self.cards = cards
+
+    async def lock_by_user_ids(self, user_ids):
+        return {user_id: self.cards[user_id] for user_id in user_ids if user_id in self.cards}
+
+    async def apply_charges(self, transport_cards, transactions):
+        pass
+
+
+class InMemoryCardTransactionRepository:
+    async def get_existing_ids(self, transaction_ids):
+        return set()
+
+
+async def run_without_db(events: int, cards: int) -> None:
+    print("Lote sem banco (validação, decisão e resposta)")
+    user_ids = [uuid.uuid4() for _ in range(cards)]
+    payload = {"events": [
+        {"event_id": str(event.event_id), "user_id": str(event.user_id), "amount": str(event.amount), "description": event.description}
+        for event in build_events(user_ids, events)
+    ]}
+    repository = InMemoryTransportCardRepository({
+        user_id: TransportCard(user_id=user_id, balance=FARE * 10) for user_id in user_ids
+    })
+
+    start = time.perf_counter()
+    batch = CardChargeBatchRequest.model_validate(payload)
+    validated = time.perf_counter()
+    results = await ChargeBatchUseCase(repository, InMemoryCardTransactionRepository()).execute([
+        ChargeEvent(event.event_id, event.user_id, event.amount, event.description) for event in batch.events
+    ])
+    decided = time.perf_counter()
+    CardChargeBatchResponse(
+        results=[CardChargeEventResult.model_validate(result) for result in results],
+        accepted=0, insufficient=0, duplicate=0, not_found=0
+    ).model_dump_json()
+    finished = time.perf_counter()
+
+    print(f"validação {validated - start:7.3f} s  decisão {decided - validated:7.3f} s  resposta {finished - decided:7.3f} s")
+
+
+async def create_cards(engine, prefix: str, cards: int) -> List[uuid.UUID]:
+    async with engine.begin() as connection:
+        await connection.execute(text("""
+            INSERT INTO users (id, email, hashed_password, is_active, is_admin, mfa_enabled, auth_provider)
+            SELECT uuid_generate_v7(), :prefix || '-' || i || '@example.com', 'hash', true, false, false, 'LOCAL'
+            FROM generate_series(1, :cards) AS i
+        """), {"prefix": prefix, "cards": cards})
+        # Saldo para cerca de 80% das passagens: exercita também a recusa por saldo insuficiente
+        await connection.execute(text("""
+            INSERT INTO transport_cards (id, user_id, balance)
+            SELECT uuid_generate_v7(), id, :balance FROM users WHERE email LIKE :prefix || '-%'
+        """), {"prefix": prefix, "balance": FARE * 8})
+        result = await connection.execute(text("SELECT id FROM users WHERE email LIKE :prefix || '-%'"), {"prefix": prefix})
+        return [row[0] for row in result]
+
+
+async def delete_cards(engine, prefix: str) -> None:
+    async with engine.begin() as connection:
+        for table in ("card_transactions", "transport_cards"):
+            await connection.execute(
+                text(f"DELETE FROM {table} WHERE user_id IN (SELECT id FROM users WHERE email LIKE :prefix || '-%')"),
+                {"prefix": prefix}
+            )
+        await connection.execute(text("DELETE FROM users WHERE email LIKE :prefix || '-%'"), {"prefix": prefix})
+
+
+async def check_ledger(engine, prefix: str) -> int:
+    """Cartões cujo saldo difere do último balance_after do extrato (deve ser zero)"""
+    async with engine.connect() as connection:
+        return (await connection.execute(text("""
+            SELECT count(*) FROM transport_cards c JOIN users u ON u.id = c.user_id
+            WHERE u.email LIKE :prefix || '-%'
+              AND c.balance <> COALESCE((
+                  SELECT t.balance_after FROM card_transactions t
+                  WHERE t.card_id = c.id ORDER BY t.created_at DESC, t.id DESC LIMIT 1
+              ), c.balance)
+        """), {"prefix": prefix})).scalar()
+
+
+async def run_per_tap(async_session, events: List[ChargeEvent]) -> Dict[ChargeEventStatus, int]:
+    """Fluxo atual dos validadores: uma transação (usuário, cartão, débito) por passagem"""
+    from infrastucture.repositories.transport_card_repository import SQLAlchemyTransportCardRepository
+    from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
+
+    counts = {ChargeEventStatus.ACCEPTED: 0, ChargeEventStatus.INSUFFICIENT: 0}
+    for event in events:
+        async with async_session() as session:
+            use_case = ChargeTransportCardUseCase(SQLAlchemyTransportCardRepository(session), SQLAlchemyUserRepository(session))
+            try:
+                await use_case.execute(event.user_id, event.amount, event.description)
+                await session.commit()
+                counts[ChargeEventStatus.ACCEPTED] += 1
+            except InsufficientBalanceError:
+                counts[ChargeEventStatus.INSUFFICIENT] += 1
+    return counts
+
+
+async def run_batch(async_session, events: List[ChargeEvent]) -> Dict[ChargeEventStatus, int]:
+    from infrastucture.repositories.card_transaction_repository import SQLAlchemyCardTransactionRepository
+    from infrastucture.repositories.transport_card_repository import SQLAlchemyTransportCardRepository
+
+    async with async_session() as session:
+        use_case = ChargeBatchUseCase(SQLAlchemyTransportCardRepository(session), SQLAlchemyCardTransactionRepository(session))
+        results = await use_case.execute(events)
+        await session.commit()
+
+    counts: Dict[ChargeEventStatus, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    return counts
+
+
+async def run(events: int, cards: int) -> None:
+    from infrastucture.database.base import async_session, engine
+
+    print("\nPassagens no banco (uma transação por passagem vs. um lote)")
+    prefixes = [f"bench-batch-{uuid.uuid4().hex}" for _ in range(2)]
+    try:
+        for name, prefix, apply_events in (("antes", prefixes[0], run_per_tap), ("depois", prefixes[1], run_batch)):
+            user_ids = await create_cards(engine, prefix, cards)
+            scenario_events = build_events(user_ids, events)
+
+            start = time.perf_counter()
+            counts = await apply_events(async_session, scenario_events)
+            summary(name, events, time.perf_counter() - start, counts)
+
+            mismatched = await check_ledger(engine, prefix)
+            if mismatched:
+                print(f"{'':<8} ATENÇÃO: {mismatched} cartões com saldo diferente do extrato")
+
+        # Reenvio do mesmo lote: tudo deve voltar como duplicate, sem alterar saldos
+        start = time.perf_counter()
+        counts = await run_batch(async_session, scenario_events)
+        summary("reenvio", events, time.perf_counter() - start, counts)
+    finally:
+        for prefix in prefixes:
+            await delete_cards(engine, prefix)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara passagens enviadas uma a uma e em lote")
+    parser.add_argument("--events", type=int, default=10_000, help="Passagens por lote")
+    parser.add_argument("--cards", type=int, default=2_000, help="Cartões distintos entre as passagens")
+    parser.add_argument("--no-db", action="store_true", help="Mede apenas a parte em Python do lote")
+    args = parser.parse_args()
+
+    asyncio.run(run_without_db(args.events, args.cards))
+    if not args.no_db:
+        asyncio.run(run(args.events, args.cards))
@@ -0,0 +1,107 @@
+"""
+Benchmark do mapeamento linha -> entidade em listagens grandes (GET /documents):
+dataclass com __dict__ e __post_init__ (antes) vs. dataclass com __slots__ e from_row (depois).
+
+Não precisa de banco; as linhas são tuplas nomeadas com os mesmos campos do SELECT:
+
+    python -m tests.benchmarks.bench_entity_mapping --documents 50000
+"""
+import argparse
+import time
+import tracemalloc
+import uuid
+from collections import namedtuple
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable, List
+
+from core.entities.document import Document, DocumentType
+from tests.benchmarks.bench_repository_writes import report
+
+DocumentRow = namedtuple("DocumentRow", ["id", "user_id", "document_type", "file_path", "name", "created_at", "updated_at"])
+
+
+# Entidade e mapeamento anteriores, mantidos só para comparação
+
+@dataclass
+class LegacyDocument:
+    user_id: uuid.UUID
+    document_type: DocumentType
+    file_path: str
+    name: str
+    id: uuid.UUID = None
+    created_at: datetime = None
+    updated_at: datetime = None
+
+    def __post_init__(self):
+        if self.id is None:
+            self.id = uuid.uuid4()
+        if self.created_at is None:
+            self.created_at = datetime.now()
+        if self.updated_at is None:
+            self.updated_at = datetime.now()
+        if not isinstance(self.document_type, DocumentType):
+            self.document_type = DocumentType(self.document_type)
+
+
+def legacy_map(row: DocumentRow) -> LegacyDocument:
+    doc_type = row.document_type
+    if isinstance(doc_type, str):
+        try:
+            doc_type = DocumentType(doc_type)
+        except ValueError:
+            doc_type = DocumentType.OUTRO
+    return LegacyDocument(
+        id=row.id,
+        user_id=row.user_id,
+        document_type=doc_type,
+        file_path=row.file_path,
+        name=row.name,
+        created_at=row.created_at,
+        updated_at=row.updated_at
+    )
+
+
+def make_rows(count: int) -> List[DocumentRow]:
+    user_id = uuid.uuid4()
+    now = datetime.now(timezone.utc)
+    return [
+        DocumentRow(uuid.uuid4(), user_id, DocumentType.CPF, f"{user_id}/{i}.pdf", "CPF", now, now)
+        for i in range(count)
+    ]
+
+
+def measure_listing(rounds: int, rows: List[DocumentRow], mapper: Callable) -> List[float]:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        [mapper(row) for row in rows]
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def measure_memory(rows: List[DocumentRow], mapper: Callable) -> int:
+    tracemalloc.start()
+    entities = [mapper(row) for row in rows]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del entities
+    return size
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara o mapeamento de documentos antes e depois de __slots__ + from_row")
+    parser.add_argument("--documents", type=int, default=10_000, help="Documentos por listagem")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.documents)
+
+    before = measure_listing(args.rounds, rows, legacy_map)
+    after = measure_listing(args.rounds, rows, Document.from_row)
+    report(f"Listagem de {args.documents}", before, after)
+
+    before_bytes = measure_memory(rows, legacy_map)
+    after_bytes = measure_memory(rows, Document.from_row)
+    print(f"{'Memória por documento':<26} antes:  {before_bytes / args.documents:7.1f} B")
+    print(f"{'':<26} depois: {after_bytes / args.documents:7.1f} B")
@@ -0,0 +1,132 @@
+"""
+Microbenchmark das consultas dos caminhos quentes: select ORM montado a cada chamada (antes)
+vs. select Core pré-montado com linhas simples (depois).
+
+A primeira parte mede só o preparo do statement (montagem + chave do cache de compilação)
+e não precisa de banco. A segunda mede a chamada completa do repositório e requer o banco
+configurado (DB_HOST, DB_USER, ...) com as migrações aplicadas:
+
+    python -m tests.benchmarks.bench_repository_lookups --iterations 5000
+    python -m tests.benchmarks.bench_repository_lookups --no-db
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+from typing import Callable, List
+
+from sqlalchemy import select
+
+from core.entities.document import Document, DocumentType
+from core.entities.transport_card import TransportCard
+from core.entities.user import User
+from infrastucture.database.base import async_session, engine
+from infrastucture.database.models import DocumentModel, TransportCardModel, UserModel
+from infrastucture.repositories.document_repository import SELECT_DOCUMENT_BY_ID, SQLAlchemyDocumentRepository
+from infrastucture.repositories.transport_card_repository import SELECT_CARD_BY_USER_ID, SQLAlchemyTransportCardRepository
+from infrastucture.repositories.user_repository import SELECT_USER_BY_EMAIL, SELECT_USER_BY_ID, SQLAlchemyUserRepository
+from tests.benchmarks.bench_repository_writes import measure, report
+
+
+# Implementações anteriores (select ORM a cada chamada, objeto hidratado no identity map)
+
+async def legacy_get_user_by_id(session, user_id: uuid.UUID) -> User:
+    result = await session.execute(select(UserModel).where(UserModel.id == user_id))
+    return SQLAlchemyUserRepository(session)._map_to_entity(result.scalars().first())
+
+
+async def legacy_get_user_by_email(session, email: str) -> User:
+    result = await session.execute(select(UserModel).where(UserModel.email == email))
+    return SQLAlchemyUserRepository(session)._map_to_entity(result.scalars().first())
+
+
+async def legacy_get_card_by_user_id(session, user_id: uuid.UUID) -> TransportCard:
+    result = await session.execute(select(TransportCardModel).where(TransportCardModel.user_id == user_id))
+    return SQLAlchemyTransportCardRepository(session)._map_to_entity(result.scalars().first())
+
+
+async def legacy_get_document_by_id(session, document_id: uuid.UUID) -> Document:
+    result = await session.execute(select(DocumentModel).where(DocumentModel.id == document_id))
+    return SQLAlchemyDocumentRepository(session)._map_to_entity(result.scalars().first())
+
+
+def measure_sync(iterations: int, operation: Callable[[], object]) -> List[float]:
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        operation()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def run_statement_preparation(iterations: int) -> None:
+    print("Preparo do statement (montagem + chave de cache), sem banco")
+    value = uuid.uuid4()
+    cases = [
+        ("User.get_by_id", lambda: select(UserModel).where(UserModel.id == value), SELECT_USER_BY_ID),
+        ("User.get_by_email", lambda: select(UserModel).where(UserModel.email == "a@b.com"), SELECT_USER_BY_EMAIL),
+        ("TransportCard.get_by_user", lambda: select(TransportCardModel).where(TransportCardModel.user_id == value), SELECT_CARD_BY_USER_ID),
+        ("Document.get_by_id", lambda: select(DocumentModel).where(DocumentModel.id == value), SELECT_DOCUMENT_BY_ID),
+    ]
+    for name, build, prebuilt in cases:
+        before = measure_sync(iterations, lambda: build()._generate_cache_key())
+        after = measure_sync(iterations, lambda: prebuilt._generate_cache_key())
+        report(name, before, after)
+
+
+async def run_repository_calls(iterations: int) -> None:
+    print("\nChamada completa do repositório (ida ao banco incluída)")
+    async with async_session() as session:
+        user_repository = SQLAlchemyUserRepository(session)
+        card_repository = SQLAlchemyTransportCardRepository(session)
+        document_repository = SQLAlchemyDocumentRepository(session)
+
+        user = await user_repository.create_if_absent(User(
+            email=f"bench-{uuid.uuid4().hex}@example.com",
+            hashed_password="hash",
+            is_active=True,
+            is_admin=False
+        ))
+        await card_repository.create(TransportCard(user_id=user.id, balance=Decimal("10.00")))
+        document = await document_repository.create(
+            Document(user_id=user.id, document_type=DocumentType.OUTRO, file_path="/dev/null", name="bench")
+        )
+        # Sem objetos no identity map: o caminho antigo hidrata de verdade a cada chamada
+        session.expunge_all()
+
+        try:
+            cases = [
+                ("User.get_by_id",
+                 lambda i: legacy_get_user_by_id(session, user.id),
+                 lambda i: user_repository.get_by_id(user.id)),
+                ("User.get_by_email",
+                 lambda i: legacy_get_user_by_email(session, user.email),
+                 lambda i: user_repository.get_by_email(user.email)),
+                ("TransportCard.get_by_user",
+                 lambda i: legacy_get_card_by_user_id(session, user.id),
+                 lambda i: card_repository.get_by_user_id(user.id)),
+                ("Document.get_by_id",
+                 lambda i: legacy_get_document_by_id(session, document.id),
+                 lambda i: document_repository.get_by_id(document.id)),
+            ]
+            for name, legacy, current in cases:
+                before = await measure(iterations, legacy)
+                session.expunge_all()
+                after = await measure(iterations, current)
+                report(name, before, after)
+        finally:
+            await session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara as consultas dos caminhos quentes antes e depois dos selects pré-montados")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--no-db", action="store_true", help="Mede apenas o preparo do statement")
+    args = parser.parse_args()
+
+    run_statement_preparation(args.iterations)
+    if not args.no_db:
+        asyncio.run(run_repository_calls(args.iterations))
@@ -0,0 +1,136 @@
+"""
+Benchmark das escritas dos repositórios: SELECT + flush do ORM (antes) vs. UPDATE/DELETE ... RETURNING (depois).
+
+Requer o banco configurado (DB_HOST, DB_USER, ...) com as migrações aplicadas:
+
+    python -m tests.benchmarks.bench_repository_writes --iterations 500
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+from decimal import Decimal
+from typing import Awaitable, Callable, List
+
+from sqlalchemy import select
+
+from core.entities.document import Document, DocumentType
+from core.entities.transport_card import TransportCard
+from core.entities.user import User
+from infrastucture.database.base import async_session, engine
+from infrastucture.database.models import DocumentModel, TransportCardModel, UserModel
+from infrastucture.repositories.document_repository import SQLAlchemyDocumentRepository
+from infrastucture.repositories.transport_card_repository import SQLAlchemyTransportCardRepository
+from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
+
+
+# Implementações anteriores (SELECT do objeto ORM, alteração e flush), mantidas só para comparação
+
+async def legacy_update_user(session, user: User) -> None:
+    result = await session.execute(select(UserModel).where(UserModel.id == user.id))
+    db_user = result.scalars().first()
+    db_user.email = user.email
+    db_user.hashed_password = user.hashed_password
+    db_user.is_active = user.is_active
+    db_user.is_admin = user.is_admin
+    db_user.mfa_enabled = user.mfa_enabled
+    db_user.mfa_secret = user.mfa_secret
+    await session.flush()
+
+
+async def legacy_update_card(session, card: TransportCard) -> None:
+    result = await session.execute(select(TransportCardModel).where(TransportCardModel.id == card.id))
+    db_card = result.scalars().first()
+    db_card.balance = card.balance
+    db_card.updated_at = card.updated_at
+    await session.flush()
+
+
+async def legacy_delete_document(session, document_id: uuid.UUID) -> None:
+    result = await session.execute(select(DocumentModel).where(DocumentModel.id == document_id))
+    db_document = result.scalars().first()
+    await session.delete(db_document)
+    await session.flush()
+
+
+async def measure(iterations: int, operation: Callable[[int], Awaitable[None]]) -> List[float]:
+    timings = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        await operation(i)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, before: List[float], after: List[float]) -> None:
+    def summary(timings: List[float]) -> str:
+        ordered = sorted(timings)
+        p95 = ordered[int(len(ordered) * 0.95) - 1]
+        return f"média {statistics.mean(ordered):7.3f} ms  p95 {p95:7.3f} ms"
+
+    print(f"{name:<26} antes:  {summary(before)}")
+    print(f"{'':<26} depois: {summary(after)}")
+
+
+async def run(iterations: int) -> None:
+    async with async_session() as session:
+        user = User(
+            email=f"bench-{uuid.uuid4().hex}@example.com",
+            hashed_password="hash",
+            is_active=True,
+            is_admin=False
+        )
+        user_repository = SQLAlchemyUserRepository(session)
+        card_repository = SQLAlchemyTransportCardRepository(session)
+        document_repository = SQLAlchemyDocumentRepository(session)
+
+        user = await user_repository.create_if_absent(user)
+        card = await card_repository.create(TransportCard(user_id=user.id, balance=Decimal("0.00")))
+
+        async def create_documents() -> List[uuid.UUID]:
+            documents = []
+            for _ in range(iterations):
+                document = await document_repository.create(
+                    Document(user_id=user.id, document_type=DocumentType.OUTRO, file_path="/dev/null", name="bench")
+                )
+                documents.append(document.id)
+            return documents
+
+        # Cada iteração altera um campo; sem mudança o flush do ORM não emitiria o UPDATE
+        def with_password(i: int) -> User:
+            user.hashed_password = f"hash-{i}"
+            return user
+
+        def with_balance(i: int) -> TransportCard:
+            card.balance = Decimal(i)
+            return card
+
+        try:
+            before = await measure(iterations, lambda i: legacy_update_user(session, with_password(i)))
+            after = await measure(iterations, lambda i: user_repository.update(with_password(i)))
+            report("UserRepository.update", before, after)
+
+            before = await measure(iterations, lambda i: legacy_update_card(session, with_balance(i)))
+            after = await measure(iterations, lambda i: card_repository.update(with_balance(i)))
+            report("TransportCard.update", before, after)
+
+            # Sessão limpa para que o SELECT do caminho antigo vá de fato ao banco
+            session.expunge_all()
+            documents = await create_documents()
+            before = await measure(iterations, lambda i: legacy_delete_document(session, documents[i]))
+            documents = await create_documents()
+            after = await measure(iterations, lambda i: document_repository.delete(documents[i]))
+            report("DocumentRepository.delete", before, after)
+        finally:
+            await session.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara as escritas dos repositórios antes e depois do RETURNING")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.iterations))
@@ -0,0 +1,72 @@
+"""
+Benchmark de inserção com chave primária UUIDv4 (antes) vs. UUIDv7 (depois).
+
+Insere as mesmas linhas em duas tabelas temporárias, cada uma com uma estratégia de chave,
+e compara a vazão, o tamanho do índice da chave primária e o volume de WAL gerado.
+Requer o banco configurado (DB_HOST, DB_USER, ...):
+
+    python -m tests.benchmarks.bench_uuid_inserts --rows 1000000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Callable
+
+from sqlalchemy import text
+
+from core.entities.ids import uuid7
+from infrastucture.database.base import engine
+
+BATCH_SIZE = 10_000
+
+
+async def run_strategy(name: str, key_factory: Callable[[], uuid.UUID], rows: int) -> dict:
+    table = f"bench_uuid_{name}"
+    async with engine.begin() as connection:
+        await connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+        # Mesmo formato de users: chave UUID e uma coluna de texto indexada só pela PK
+        await connection.execute(text(f"CREATE TABLE {table} (id uuid PRIMARY KEY, payload text NOT NULL)"))
+
+    try:
+        async with engine.connect() as connection:
+            wal_start = (await connection.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar()
+            await connection.commit()
+
+            start = time.perf_counter()
+            for offset in range(0, rows, BATCH_SIZE):
+                records = [(key_factory(), f"linha {i}") for i in range(offset, min(offset + BATCH_SIZE, rows))]
+                raw_connection = await connection.get_raw_connection()
+                await raw_connection.driver_connection.executemany(
+                    f"INSERT INTO {table} (id, payload) VALUES ($1, $2)", records
+                )
+            elapsed = time.perf_counter() - start
+
+            result = await connection.execute(text(f"""
+                SELECT pg_wal_lsn_diff(pg_current_wal_lsn(), CAST(:wal_start AS pg_lsn)),
+                       pg_relation_size('{table}_pkey')
+            """), {"wal_start": wal_start})
+            wal_bytes, index_bytes = result.first()
+    finally:
+        async with engine.begin() as connection:
+            await connection.execute(text(f"DROP TABLE IF EXISTS {table}"))
+
+    return {"rows_per_s": rows / elapsed, "wal_mb": wal_bytes / 1024 ** 2, "index_mb": index_bytes / 1024 ** 2}
+
+
+async def run(rows: int) -> None:
+    before = await run_strategy("v4", uuid.uuid4, rows)
+    after = await run_strategy("v7", uuid7, rows)
+    await engine.dispose()
+
+    print(f"{'':<16} {'linhas/s':>12} {'WAL (MB)':>10} {'índice PK (MB)':>15}")
+    for label, stats in (("UUIDv4 (antes)", before), ("UUIDv7 (depois)", after)):
+        print(f"{label:<16} {stats['rows_per_s']:>12,.0f} {stats['wal_mb']:>10.1f} {stats['index_mb']:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara inserções com chave UUIDv4 e UUIDv7")
+    parser.add_argument("--rows", type=int, default=500_000)
+    args = parser.parse_args()
+
+    asyncio.run(run(args.rows))
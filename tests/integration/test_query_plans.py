@@ -0,0 +1,129 @@
+import json
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import pytest_asyncio
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from infrastucture.database.base import engine
+from infrastucture.repositories.card_transaction_repository import SQLAlchemyCardTransactionRepository
+from infrastucture.repositories.document_repository import SQLAlchemyDocumentRepository
+from infrastucture.repositories.transport_card_repository import SQLAlchemyTransportCardRepository
+from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
+
+# Precisa de um Postgres com as migrações aplicadas: RUN_DB_TESTS=true pytest tests/integration/test_query_plans.py
+pytestmark = pytest.mark.skipif(
+    os.getenv("RUN_DB_TESTS", "False").lower() != "true",
+    reason="Teste que depende do banco de dados"
+)
+
+FIXTURE_USERS = 2000
+DOCUMENTS_PER_USER = 25
+TRANSACTIONS_PER_CARD = 25
+WATCHED_TABLES = {"users", "documents", "transport_cards", "card_transactions"}
+
+
+@pytest_asyncio.fixture
+async def large_dataset():
+    """Massa de dados grande o bastante para o planner preferir índices; tudo é desfeito no rollback."""
+    async with engine.connect() as connection:
+        transaction = await connection.begin()
+
+        await connection.execute(text("""
+            INSERT INTO users (id, email, hashed_password, is_active, is_admin, mfa_enabled, auth_provider)
+            SELECT gen_random_uuid(), 'plan-' || i || '@example.com', 'hash', true, false, false, 'LOCAL'
+            FROM generate_series(1, :users) AS i
+        """), {"users": FIXTURE_USERS})
+        await connection.execute(text("""
+            INSERT INTO documents (id, user_id, document_type, file_path, name, created_at)
+            SELECT gen_random_uuid(), u.id, 'OUTRO', '/dev/null', 'doc', now() - (d || ' minutes')::interval
+            FROM users u CROSS JOIN generate_series(1, :per_user) AS d
+            WHERE u.email LIKE 'plan-%'
+        """), {"per_user": DOCUMENTS_PER_USER})
+        await connection.execute(text("""
+            INSERT INTO transport_cards (id, user_id, balance)
+            SELECT gen_random_uuid(), id, 10 FROM users WHERE email LIKE 'plan-%'
+        """))
+        await connection.execute(text("""
+            INSERT INTO card_transactions (id, card_id, user_id, transaction_type, amount, balance_after, created_at)
+            SELECT gen_random_uuid(), c.id, c.user_id, 'CHARGE', -1, 10, now() - (t || ' minutes')::interval
+            FROM transport_cards c JOIN users u ON u.id = c.user_id
+            CROSS JOIN generate_series(1, :per_card) AS t
+            WHERE u.email LIKE 'plan-%'
+        """), {"per_card": TRANSACTIONS_PER_CARD})
+        await connection.execute(text("ANALYZE users, documents, transport_cards, card_transactions"))
+
+        sample_user_id = (await connection.execute(
+            text("SELECT id FROM users WHERE email = 'plan-1@example.com'")
+        )).scalar()
+        sample_document_id = (await connection.execute(
+            text("SELECT id FROM documents WHERE user_id = :user_id LIMIT 1"), {"user_id": sample_user_id}
+        )).scalar()
+        sample_card_id = (await connection.execute(
+            text("SELECT id FROM transport_cards WHERE user_id = :user_id"), {"user_id": sample_user_id}
+        )).scalar()
+
+        yield connection, sample_user_id, sample_document_id, sample_card_id
+
+        await transaction.rollback()
+
+
+async def capture_statements(connection, operation):
+    """Executa a operação do repositório e devolve os statements SQL que ela emitiu"""
+    captured = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    sync_connection = connection.sync_connection
+    event.listen(sync_connection, "before_cursor_execute", before_cursor_execute)
+    try:
+        async with AsyncSession(bind=connection) as session:
+            await operation(session)
+    finally:
+        event.remove(sync_connection, "before_cursor_execute", before_cursor_execute)
+    return captured
+
+
+def find_seq_scans(plan_node, found=None):
+    found = [] if found is None else found
+    if plan_node.get("Node Type") == "Seq Scan" and plan_node.get("Relation Name") in WATCHED_TABLES:
+        found.append(plan_node["Relation Name"])
+    for child in plan_node.get("Plans", []):
+        find_seq_scans(child, found)
+    return found
+
+
+@pytest.mark.asyncio
+async def test_repository_queries_use_indexes(large_dataset):
+    """Falha se alguma consulta dos repositórios fizer seq scan em tabelas grandes."""
+    connection, user_id, document_id, card_id = large_dataset
+    statement_key = (datetime.now(timezone.utc) - timedelta(minutes=10), uuid.uuid4())
+
+    operations = {
+        "DocumentRepository.get_by_user_id": lambda s: SQLAlchemyDocumentRepository(s).get_by_user_id(user_id),
+        "DocumentRepository.get_by_id": lambda s: SQLAlchemyDocumentRepository(s).get_by_id(document_id),
+        "TransportCardRepository.get_by_user_id": lambda s: SQLAlchemyTransportCardRepository(s).get_by_user_id(user_id),
+        "UserRepository.get_by_id": lambda s: SQLAlchemyUserRepository(s).get_by_id(user_id),
+        "UserRepository.get_by_email": lambda s: SQLAlchemyUserRepository(s).get_by_email("plan-1@example.com"),
+        "CardTransactionRepository.get_by_card_id": lambda s: SQLAlchemyCardTransactionRepository(s).get_by_card_id(card_id),
+        "CardTransactionRepository.get_by_card_id (cursor)":
+            lambda s: SQLAlchemyCardTransactionRepository(s).get_by_card_id(card_id, 50, statement_key),
+    }
+
+    failures = {}
+    for name, operation in operations.items():
+        for statement, parameters in await capture_statements(connection, operation):
+            result = await connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            explain = result.scalar()
+            # asyncpg devolve o json do EXPLAIN como texto
+            plan = (json.loads(explain) if isinstance(explain, str) else explain)[0]["Plan"]
+            seq_scans = find_seq_scans(plan)
+            if seq_scans:
+                failures[name] = seq_scans
+
+    assert not failures, f"Seq scan em consultas dos repositórios: {failures}"
@@ -10,6 +10,7 @@ from core.interfaces.repositories import UserRepository
 from core.interfaces.security import PasswordHasher, TokenService
 from infrastucture.api.routers.auth import router
 from infrastucture.api.dtos.user_dtos import UserCreate, UserLogin
+from infrastucture.security.rate_limiter import InMemoryRateLimitBackend, LoginThrottle
 
 
 @pytest.fixture
@@ -23,6 +24,9 @@ def mock_password_hasher():
     hasher = MagicMock(spec=PasswordHasher)
     hasher.hash_password.return_value = "hashed_password"
     hasher.verify_password.return_value = True
+    hasher.hash_password_async.return_value = "hashed_password"
+    hasher.verify_password_async.return_value = True
+    hasher.needs_rehash.return_value = False
     return hasher
 
 
@@ -33,6 +37,12 @@ def mock_token_service():
     return service
 
 
+@pytest.fixture
+def mock_refresh_token_repository():
+    repository = AsyncMock()
+    return repository
+
+
 @pytest.fixture
 def sample_user():
     return User(
@@ -46,7 +56,7 @@ def sample_user():
 
 
 @pytest.fixture
-def client(mock_user_repository, mock_password_hasher, mock_token_service):
+def client(mock_user_repository, mock_password_hasher, mock_token_service, mock_refresh_token_repository):
     # Criar um app FastAPI para testar as rotas
     app = FastAPI()
     app.include_router(router)
@@ -57,8 +67,10 @@ def client(mock_user_repository, mock_password_hasher, mock_token_service):
     
     # Configurar os patches para os mocks
     with patch("infrastucture.api.routers.auth.SQLAlchemyUserRepository", return_value=mock_user_repository), \
+         patch("infrastucture.api.routers.auth.SQLAlchemyRefreshTokenRepository", return_value=mock_refresh_token_repository), \
          patch("infrastucture.api.routers.auth.BCryptPasswordHasher", return_value=mock_password_hasher), \
          patch("infrastucture.api.routers.auth.JWTTokenService", return_value=mock_token_service), \
+         patch("infrastucture.api.routers.auth.login_throttle", LoginThrottle(InMemoryRateLimitBackend(), email_limit=3)), \
          patch("infrastucture.api.routers.auth.get_db", side_effect=override_get_db):
         # Criar um cliente de teste
         client = TestClient(app)
@@ -68,8 +80,7 @@ def client(mock_user_repository, mock_password_hasher, mock_token_service):
 class TestAuthRouter:
     def test_register_success(self, client, mock_user_repository, sample_user, mock_token_service):
         # Configurar mocks
-        mock_user_repository.get_by_email.return_value = None
-        mock_user_repository.create.return_value = sample_user
+        mock_user_repository.create_if_absent.return_value = sample_user
         mock_token_service.create_access_token.return_value = "jwt_token"
         
         # Executar requisição
@@ -86,14 +97,13 @@ class TestAuthRouter:
         assert "token_type" in data
         assert data["token_type"] == "bearer"
         
-        # Verificar chamadas aos mocks
-        # O método get_by_email é chamado duas vezes durante o fluxo de registro
-        assert mock_user_repository.get_by_email.call_count == 2
-        mock_user_repository.create.assert_called_once()
+        # Verificar chamadas aos mocks: o registro é um único INSERT ... ON CONFLICT
+        mock_user_repository.get_by_email.assert_not_called()
+        mock_user_repository.create_if_absent.assert_called_once()
 
     def test_register_user_already_exists(self, client, mock_user_repository, sample_user):
         # Configurar mocks
-        mock_user_repository.get_by_email.return_value = sample_user
+        mock_user_repository.create_if_absent.return_value = None
         
         # Executar requisição
         response = client.post(
@@ -107,7 +117,7 @@ class TestAuthRouter:
         assert "detail" in data
         
         # Verificar chamadas aos mocks
-        mock_user_repository.get_by_email.assert_called_once_with("test@example.com")
+        mock_user_repository.create_if_absent.assert_called_once()
         mock_user_repository.create.assert_not_called()
 
     def test_login_success(self, client, mock_user_repository, sample_user, mock_token_service):
@@ -148,4 +158,41 @@ class TestAuthRouter:
         assert "detail" in data
         
         # Verificar chamadas aos mocks
-        mock_user_repository.get_by_email.assert_called_once_with("wrong@example.com") 
\ No newline at end of file
+        mock_user_repository.get_by_email.assert_called_once_with("wrong@example.com") 
+    def test_login_returns_refresh_token(self, client, mock_user_repository, sample_user, mock_refresh_token_repository):
+        # Configurar mocks
+        mock_user_repository.get_by_email.return_value = sample_user
+        
+        # Executar requisição
+        response = client.post(
+            "/auth/login",
+            json={"email": "test@example.com", "password": "password123"}
+        )
+        
+        # Verificar resultado
+        assert response.status_code == 200
+        data = response.json()
+        assert data["refresh_token"]
+        
+        # Apenas o hash do refresh token deve ser persistido
+        stored_token = mock_refresh_token_repository.create.call_args[0][0]
+        assert stored_token.token_hash != data["refresh_token"]
+        assert stored_token.user_id == sample_user.id
+
+
+    def test_login_throttled_before_password_check(self, client, mock_user_repository, sample_user, mock_password_hasher):
+        # Configurar mocks
+        mock_user_repository.get_by_email.return_value = sample_user
+        
+        # Executar requisições acima do limite por email
+        responses = [
+            client.post("/auth/login", json={"email": "test@example.com", "password": "password123"})
+            for _ in range(4)
+        ]
+        
+        # Verificar resultado
+        assert [r.status_code for r in responses] == [200, 200, 200, 429]
+        assert "Retry-After" in responses[-1].headers
+        
+        # A tentativa bloqueada não deve chegar à verificação de senha
+        assert mock_password_hasher.verify_password_async.call_count == 3
@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import create_engine, text
+
+from infrastucture.database import session as session_module
+from infrastucture.database.base import WriteTrackingSession, _has_dml_cte, session_has_writes
+from infrastucture.repositories.transport_card_repository import ADD_BALANCE, DEDUCT_BALANCE, SELECT_CARD_BY_USER_ID
+
+
+class TestWriteTracking:
+    @pytest.fixture
+    def sync_session(self):
+        engine = create_engine("sqlite://")
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY)"))
+        session = WriteTrackingSession(engine)
+        yield session
+        session.close()
+
+    def test_select_is_not_a_write(self, sync_session):
+        """Testa se leituras não marcam a sessão como alterada."""
+        sync_session.execute(text("SELECT * FROM items"))
+
+        assert session_has_writes(sync_session) is False
+
+    def test_insert_is_a_write(self, sync_session):
+        """Testa se um INSERT marca a sessão para commit."""
+        sync_session.execute(text("INSERT INTO items (id) VALUES (1)"))
+
+        assert session_has_writes(sync_session) is True
+
+    def test_select_with_dml_cte_is_a_write(self):
+        """Testa se um SELECT sobre CTE de UPDATE/INSERT (saldo + extrato) conta como escrita."""
+        assert _has_dml_cte(ADD_BALANCE) is True
+        assert _has_dml_cte(DEDUCT_BALANCE) is True
+        assert _has_dml_cte(SELECT_CARD_BY_USER_ID) is False
+
+
+class TestGetDb:
+    def _session_factory(self, has_writes):
+        session = MagicMock()
+        session.info = {"has_writes": has_writes}
+        session.new = session.dirty = session.deleted = ()
+        session.commit = AsyncMock()
+        session.rollback = AsyncMock()
+
+        factory = MagicMock()
+        factory.return_value.__aenter__ = AsyncMock(return_value=session)
+        factory.return_value.__aexit__ = AsyncMock(return_value=False)
+        return factory, session
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("has_writes", [True, False])
+    async def test_commit_only_after_writes(self, has_writes):
+        """Testa se o COMMIT só é enviado quando a requisição escreveu algo."""
+        factory, session = self._session_factory(has_writes)
+
+        with patch.object(session_module, "async_session", factory):
+            generator = session_module.get_db()
+            await generator.__anext__()
+            with pytest.raises(StopAsyncIteration):
+                await generator.__anext__()
+
+        assert session.commit.called is has_writes
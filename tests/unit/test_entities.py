@@ -0,0 +1,70 @@
+from collections import namedtuple
+from dataclasses import fields
+from datetime import datetime, timedelta
+from decimal import Decimal
+from uuid import uuid4
+
+from core.entities.card_transaction import CardTransaction, CardTransactionType
+from core.entities.document import Document, DocumentType
+from core.entities.transport_card import TransportCard
+from core.entities.user import AuthProvider, User
+
+CREATED_AT = datetime(2025, 1, 1)
+UPDATED_AT = CREATED_AT + timedelta(days=30)
+
+
+class TestEntitiesFromRow:
+    def test_user_from_row_keeps_database_values(self):
+        """Testa se o usuário criado a partir da linha mantém todos os valores do banco."""
+        Row = namedtuple("Row", [
+            "id", "email", "hashed_password", "is_active", "is_admin", "created_at", "updated_at",
+            "mfa_enabled", "mfa_secret", "auth_provider", "profile_picture"
+        ])
+        row = Row(uuid4(), "test@example.com", "hash", True, False, CREATED_AT, UPDATED_AT,
+                  True, "SECRET", AuthProvider.GOOGLE, None)
+
+        user = User.from_row(row)
+
+        assert user == User(**row._asdict())
+        assert not hasattr(user, "__dict__")
+
+    def test_document_from_row_keeps_database_values(self):
+        """Testa se o documento criado a partir da linha é igual ao criado pelo construtor."""
+        Row = namedtuple("Row", ["id", "user_id", "document_type", "file_path", "name", "created_at", "updated_at"])
+        row = Row(uuid4(), uuid4(), DocumentType.CPF, "user/doc.pdf", "CPF", CREATED_AT, UPDATED_AT)
+
+        document = Document.from_row(row)
+
+        assert document == Document(**row._asdict())
+        assert not hasattr(document, "__dict__")
+
+    def test_transport_card_from_row_keeps_updated_at(self):
+        """Testa se o cartão criado a partir da linha não sobrescreve o updated_at do banco."""
+        Row = namedtuple("Row", ["id", "user_id", "balance", "created_at", "updated_at"])
+        row = Row(uuid4(), uuid4(), Decimal("12.50"), CREATED_AT, UPDATED_AT)
+
+        transport_card = TransportCard.from_row(row)
+
+        assert transport_card.updated_at == UPDATED_AT
+        assert transport_card.balance == Decimal("12.50")
+        assert not hasattr(transport_card, "__dict__")
+
+    def test_card_transaction_from_row_keeps_database_values(self):
+        """Testa se o lançamento criado a partir da linha é igual ao criado pelo construtor."""
+        Row = namedtuple("Row", [
+            "id", "card_id", "user_id", "transaction_type", "amount", "balance_after", "description", "created_at"
+        ])
+        row = Row(uuid4(), uuid4(), uuid4(), CardTransactionType.CHARGE, Decimal("-4.40"), Decimal("8.10"), None, CREATED_AT)
+
+        transaction = CardTransaction.from_row(row)
+
+        assert transaction == CardTransaction(**row._asdict())
+        assert not hasattr(transaction, "__dict__")
+
+    def test_slotted_entities_keep_constructor_defaults(self):
+        """Testa se os __slots__ declarados a partir dos campos mantêm os padrões do construtor."""
+        user = User(email="test@example.com", hashed_password="hash", is_active=True, is_admin=False)
+
+        assert user.mfa_secret is None and user.auth_provider == AuthProvider.LOCAL
+        assert User.__slots__ == tuple(field.name for field in fields(User))
+        assert not hasattr(user, "__dict__")
@@ -0,0 +1,152 @@
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from core.exceptions.idempotency_exceptions import IdempotencyKeyInProgressError, IdempotencyKeyReuseError
+from infrastucture.api.dtos.transport_dtos import CardChargeRequest, TransportCardRecharge, TransportCardResponse
+from infrastucture.api.idempotency import IdempotencyCache, IdempotencyStore, StoredResponse, request_fingerprint
+
+
+def stored_response(request_hash="hash", ttl=60):
+    return StoredResponse(request_hash, 200, {"balance": "10.00"}, time.time() + ttl)
+
+
+def result_with(row):
+    result = MagicMock()
+    result.first.return_value = row
+    result.one.return_value = row
+    return result
+
+
+class TestIdempotencyCache:
+    def test_evicts_least_recently_used(self):
+        """Testa se o cache descarta a chave usada há mais tempo ao atingir o limite."""
+        cache = IdempotencyCache(max_size=2)
+        user_id = uuid.uuid4()
+        cache.set(user_id, "a", stored_response())
+        cache.set(user_id, "b", stored_response())
+        cache.get(user_id, "a")
+
+        cache.set(user_id, "c", stored_response())
+
+        assert cache.get(user_id, "a") is not None
+        assert cache.get(user_id, "b") is None
+        assert cache.get(user_id, "c") is not None
+
+    def test_expired_entries_are_dropped(self):
+        """Testa se entradas vencidas não são devolvidas nem armazenadas."""
+        cache = IdempotencyCache(max_size=10)
+        user_id = uuid.uuid4()
+        cache.set(user_id, "vencida", stored_response(ttl=-1))
+        cache._entries[(user_id, "expirando")] = stored_response(ttl=-1)
+
+        assert cache.get(user_id, "vencida") is None
+        assert cache.get(user_id, "expirando") is None
+        assert cache.get_stats()["size"] == 0
+
+    def test_keys_are_scoped_by_user(self):
+        """Testa se a mesma chave de usuários diferentes não se mistura."""
+        cache = IdempotencyCache(max_size=10)
+        cache.set(uuid.uuid4(), "chave", stored_response())
+
+        assert cache.get(uuid.uuid4(), "chave") is None
+
+
+class TestRequestFingerprint:
+    def test_fingerprint_depends_on_operation_and_body(self):
+        """Testa se o digest muda com o endpoint e com o corpo da requisição."""
+        recharge = request_fingerprint("recharge", TransportCardRecharge(amount=Decimal("10.00")))
+
+        assert recharge == request_fingerprint("recharge", TransportCardRecharge(amount=Decimal("10.00")))
+        assert recharge != request_fingerprint("charge", CardChargeRequest(amount=Decimal("10.00")))
+        assert recharge != request_fingerprint("recharge", TransportCardRecharge(amount=Decimal("20.00")))
+
+
+class TestIdempotencyStore:
+    @pytest.mark.asyncio
+    async def test_new_key_is_claimed(self):
+        """Testa se uma chave nova é reservada no banco e a operação deve ser executada."""
+        session = AsyncMock()
+        session.execute.return_value = result_with(("claimed",))
+        store = IdempotencyStore(IdempotencyCache(), cleanup_probability=0)
+
+        stored = await store.begin(session, uuid.uuid4(), "chave", "hash")
+
+        assert stored is None
+        session.execute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_existing_key_replays_stored_response_and_caches_it(self):
+        """Testa se uma chave já concluída devolve a resposta gravada e passa a vir do cache."""
+        user_id = uuid.uuid4()
+        row = MagicMock(request_hash="hash", status_code=200, response={"balance": "10.00"},
+                        expires_at=datetime.now(timezone.utc) + timedelta(hours=1))
+        session = AsyncMock()
+        session.execute.side_effect = [result_with(None), result_with(row)]
+        store = IdempotencyStore(IdempotencyCache(), cleanup_probability=0)
+
+        stored = await store.begin(session, user_id, "chave", "hash")
+        cached = await store.begin(session, user_id, "chave", "hash")
+
+        assert stored.body == {"balance": "10.00"}
+        assert cached is stored
+        assert session.execute.call_count == 2
+        response = stored.to_response()
+        assert response.status_code == 200
+        assert response.headers["Idempotent-Replayed"] == "true"
+
+    @pytest.mark.asyncio
+    async def test_key_reused_with_other_request_is_rejected(self):
+        """Testa se a mesma chave com outro corpo é recusada."""
+        user_id = uuid.uuid4()
+        cache = IdempotencyCache()
+        cache.set(user_id, "chave", stored_response(request_hash="outra"))
+        store = IdempotencyStore(cache)
+
+        with pytest.raises(IdempotencyKeyReuseError):
+            await store.begin(AsyncMock(), user_id, "chave", "hash")
+
+    @pytest.mark.asyncio
+    async def test_key_without_response_is_in_progress(self):
+        """Testa se uma chave registrada sem resposta é tratada como em processamento."""
+        row = MagicMock(request_hash="hash", status_code=None, response=None,
+                        expires_at=datetime.now(timezone.utc) + timedelta(hours=1))
+        session = AsyncMock()
+        session.execute.side_effect = [result_with(None), result_with(row)]
+        store = IdempotencyStore(IdempotencyCache(), cleanup_probability=0)
+
+        with pytest.raises(IdempotencyKeyInProgressError):
+            await store.begin(session, uuid.uuid4(), "chave", "hash")
+
+    @pytest.mark.asyncio
+    async def test_complete_commits_and_caches_response(self):
+        """Testa se a resposta é gravada, a transação confirmada e só então colocada no cache."""
+        user_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        response = TransportCardResponse(id=uuid.uuid4(), user_id=user_id, balance=Decimal("15.00"), created_at=now, updated_at=now)
+        session = AsyncMock()
+        store = IdempotencyStore(IdempotencyCache())
+
+        await store.complete(session, user_id, "chave", "hash", 200, response)
+
+        session.execute.assert_called_once()
+        session.commit.assert_called_once()
+        cached = store.cache.get(user_id, "chave")
+        assert cached.body["balance"] == "15.00"
+        assert cached.request_hash == "hash"
+
+    @pytest.mark.asyncio
+    async def test_cleanup_runs_after_claim(self):
+        """Testa se a limpeza das chaves expiradas roda, por amostragem, após reservar uma chave."""
+        session = AsyncMock()
+        session.execute.return_value = result_with(("claimed",))
+        store = IdempotencyStore(IdempotencyCache(), cleanup_probability=1)
+
+        await store.begin(session, uuid.uuid4(), "chave", "hash")
+
+        assert session.execute.call_count == 2
+        assert session.execute.call_args.args[0] is IdempotencyStore.CLEANUP_QUERY
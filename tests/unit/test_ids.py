@@ -0,0 +1,33 @@
+import time
+
+from core.entities.ids import uuid7
+from core.entities.user import User
+
+
+class TestUUID7:
+    def test_version_and_variant(self):
+        """Testa se o UUID gerado é da versão 7 com a variante RFC 9562."""
+        value = uuid7()
+
+        assert value.version == 7
+        assert value.variant == "specified in RFC 4122"
+
+    def test_keys_are_strictly_increasing(self):
+        """Testa se chaves geradas em sequência (mesmo milissegundo inclusive) são crescentes."""
+        keys = [uuid7() for _ in range(10_000)]
+
+        assert keys == sorted(keys)
+        assert len(set(keys)) == len(keys)
+
+    def test_prefix_is_current_timestamp(self):
+        """Testa se os 48 bits iniciais são o timestamp atual em milissegundos."""
+        before_ms = time.time_ns() // 1_000_000
+        value = uuid7()
+
+        assert abs((value.int >> 80) - before_ms) < 1000
+
+    def test_entities_use_uuid7(self):
+        """Testa se as entidades novas recebem chave UUIDv7."""
+        user = User(email="test@example.com", hashed_password="hash", is_active=True, is_admin=False)
+
+        assert user.id.version == 7
@@ -0,0 +1,83 @@
+import os
+import pytest
+from jose import JWTError, jwk
+
+from infrastucture.security.jwt_keys import JWTKeyStore, generate_key
+
+
+@pytest.fixture(scope="module")
+def rsa_keys_dir(tmp_path_factory):
+    # Geração de RSA em Python puro é lenta: uma chave para todo o módulo
+    keys_dir = tmp_path_factory.mktemp("rsa_keys")
+    generate_key(str(keys_dir), "chave-1", "RS256")
+    return str(keys_dir)
+
+
+class TestJWTKeyStore:
+    def test_hs256_round_trip(self):
+        """Testa se o modo HS256 continua funcionando com o SECRET_KEY."""
+        store = JWTKeyStore("HS256", secret_key="segredo")
+
+        token = store.encode({"sub": "123"})
+
+        assert store.decode(token)["sub"] == "123"
+        assert store.jwks() == {"keys": []}
+
+    def test_rs256_round_trip(self, rsa_keys_dir):
+        """Testa assinatura com kid e verificação pela chave pública."""
+        store = JWTKeyStore("RS256", keys_dir=rsa_keys_dir)
+
+        token = store.encode({"sub": "123"})
+
+        assert store.decode(token)["sub"] == "123"
+        assert store.active_kid == "chave-1"
+
+    def test_es256_round_trip(self, tmp_path):
+        """Testa assinatura e verificação com chave de curva elíptica."""
+        generate_key(str(tmp_path), "chave-ec", "ES256")
+        store = JWTKeyStore("ES256", keys_dir=str(tmp_path))
+
+        assert store.decode(store.encode({"sub": "123"}))["sub"] == "123"
+
+    def test_jwks_exposes_only_public_keys(self, rsa_keys_dir):
+        """Testa se o JWKS publica apenas material público, verificável por terceiros."""
+        store = JWTKeyStore("RS256", keys_dir=rsa_keys_dir)
+        token = store.encode({"sub": "123"})
+
+        public_jwk = store.jwks()["keys"][0]
+
+        assert public_jwk["kid"] == "chave-1"
+        assert "d" not in public_jwk
+        # Um verificador externo só precisa do JWK público
+        from jose import jwt
+        assert jwt.decode(token, public_jwk, algorithms=["RS256"])["sub"] == "123"
+
+    def test_rotation_keeps_previous_key_for_verification(self, tmp_path):
+        """Testa se tokens assinados pela chave anterior continuam válidos após a rotação."""
+        generate_key(str(tmp_path), "chave-1", "ES256")
+        old_store = JWTKeyStore("ES256", keys_dir=str(tmp_path))
+        old_token = old_store.encode({"sub": "123"})
+
+        # Rotação: nova chave ativa e apenas a parte pública da antiga no diretório
+        old_key_path = os.path.join(str(tmp_path), "chave-1.pem")
+        with open(old_key_path) as key_file:
+            public_pem = jwk.construct(key_file.read(), "ES256").public_key().to_pem()
+        with open(old_key_path, "wb") as key_file:
+            key_file.write(public_pem)
+        generate_key(str(tmp_path), "chave-2", "ES256")
+
+        new_store = JWTKeyStore("ES256", keys_dir=str(tmp_path), active_kid="chave-2")
+
+        assert new_store.decode(old_token)["sub"] == "123"
+        assert new_store.decode(new_store.encode({"sub": "456"}))["sub"] == "456"
+        assert {k["kid"] for k in new_store.jwks()["keys"]} == {"chave-1", "chave-2"}
+
+    def test_unknown_kid_is_rejected(self, tmp_path):
+        """Testa se tokens com kid desconhecido são rejeitados."""
+        generate_key(str(tmp_path / "outra"), "desconhecida", "ES256")
+        generate_key(str(tmp_path / "ativa"), "chave-1", "ES256")
+        foreign_store = JWTKeyStore("ES256", keys_dir=str(tmp_path / "outra"))
+        store = JWTKeyStore("ES256", keys_dir=str(tmp_path / "ativa"))
+
+        with pytest.raises(JWTError):
+            store.decode(foreign_store.encode({"sub": "123"}))
@@ -0,0 +1,139 @@
+import base64
+import pyotp
+import pytest
+from unittest.mock import AsyncMock
+
+from core.entities.user import User
+from core.exceptions.user_exceptions import InvalidMFAChallengeError
+from core.use_cases.user_use_cases import SetupMFAUseCase, VerifyMFAUseCase
+from infrastucture.security.jwt_keys import JWTKeyStore
+from infrastucture.security.mfa import PyOTPMFAService, QRCodeCache, TOTPReplayCache
+from infrastucture.security.mfa_challenge import JWTMFAChallengeService
+
+
+class TestMFAQRCode:
+    @pytest.fixture
+    def mfa_service(self):
+        return PyOTPMFAService(qr_cache=QRCodeCache(max_size=10, ttl_seconds=60))
+
+    @pytest.mark.asyncio
+    async def test_setup_mfa_renders_svg(self, mfa_service):
+        """Testa se a configuração de MFA gera o QR code em SVG quando solicitado."""
+        setup_info = await mfa_service.setup_mfa("test@example.com", "svg")
+
+        prefix = "data:image/svg+xml;base64,"
+        assert setup_info["qr_code_url"].startswith(prefix)
+        svg = base64.b64decode(setup_info["qr_code_url"][len(prefix):])
+        assert b"<svg" in svg
+
+    @pytest.mark.asyncio
+    async def test_setup_mfa_renders_png_by_default(self, mfa_service):
+        """Testa se o formato padrão continua sendo PNG."""
+        setup_info = await mfa_service.setup_mfa("test@example.com")
+
+        assert setup_info["qr_code_url"].startswith("data:image/png;base64,")
+
+    def test_qr_code_is_cached_until_setup_released(self, mfa_service):
+        """Testa se o QR code é reaproveitado e descartado ao encerrar a configuração."""
+        secret = mfa_service.generate_secret()
+        uri = mfa_service.generate_provisioning_uri(secret, "test@example.com")
+
+        first = mfa_service.generate_qr_code(uri, "svg")
+        second = mfa_service.generate_qr_code(uri, "svg")
+
+        assert first == second
+        assert mfa_service.qr_cache.get_stats()["hits"] == 1
+
+        mfa_service.release_setup(secret, "test@example.com")
+
+        assert mfa_service.qr_cache.get(uri, "svg") is None
+
+
+    @pytest.mark.asyncio
+    async def test_repeated_setup_reuses_pending_secret_and_cached_qr_code(self, mfa_service):
+        """Testa se uma nova configuração pendente repete o segredo e o QR code vem do cache até a verificação."""
+        # Arrange
+        user = User(email="test@example.com", hashed_password="hash", is_active=True, is_admin=False)
+        user_repository = AsyncMock()
+        user_repository.get_by_id.return_value = user
+        setup_use_case = SetupMFAUseCase(user_repository, mfa_service)
+
+        # Act
+        first = await setup_use_case.execute(user.id, "svg")
+        second = await setup_use_case.execute(user.id, "svg")
+
+        # Assert
+        assert second["secret"] == first["secret"] == user.mfa_secret
+        assert second["qr_code_url"] == first["qr_code_url"]
+        assert mfa_service.qr_cache.get_stats()["hits"] == 1
+        user_repository.update.assert_called_once()
+
+        # Verificada a configuração, o QR code sai do cache
+        await VerifyMFAUseCase(user_repository, mfa_service).execute(user.id, pyotp.TOTP(user.mfa_secret).now())
+        assert mfa_service.qr_cache.get(first["provisioning_uri"], "svg") is None
+
+
+class TestTOTPReplay:
+    @pytest.fixture
+    def mfa_service(self):
+        return PyOTPMFAService(replay_cache=TOTPReplayCache())
+
+    @pytest.mark.asyncio
+    async def test_code_cannot_be_reused(self, mfa_service):
+        """Testa se o mesmo código TOTP é recusado na segunda utilização."""
+        secret = mfa_service.generate_secret()
+        code = pyotp.TOTP(secret).now()
+
+        assert await mfa_service.verify_code(secret, code) is True
+        assert await mfa_service.verify_code(secret, code) is False
+        assert mfa_service.replay_cache.rejected == 1
+
+    @pytest.mark.asyncio
+    async def test_replay_is_tracked_per_user(self, mfa_service):
+        """Testa se o uso de um passo por um usuário não bloqueia outro usuário."""
+        first_secret = mfa_service.generate_secret()
+        second_secret = mfa_service.generate_secret()
+
+        assert await mfa_service.verify_code(first_secret, pyotp.TOTP(first_secret).now()) is True
+        assert await mfa_service.verify_code(second_secret, pyotp.TOTP(second_secret).now()) is True
+
+
+class TestMFAChallenge:
+    @pytest.fixture
+    def challenge_service(self):
+        return JWTMFAChallengeService(JWTKeyStore("HS256", secret_key="test-secret"), expire_seconds=60)
+
+    @pytest.fixture
+    def user(self):
+        return User(
+            email="test@example.com",
+            hashed_password="hashed_password",
+            is_active=True,
+            is_admin=False,
+            mfa_enabled=True,
+            mfa_secret="SECRET"
+        )
+
+    def test_resolve_returns_user_from_first_step(self, challenge_service, user):
+        """Testa se o desafio devolve o usuário carregado na primeira etapa."""
+        token = challenge_service.issue(user)
+
+        user_id, cached_user = challenge_service.resolve(token)
+
+        assert user_id == user.id
+        assert cached_user.email == user.email
+
+    def test_discarded_challenge_is_rejected(self, challenge_service, user):
+        """Testa se um desafio concluído não pode ser usado de novo."""
+        token = challenge_service.issue(user)
+        challenge_service.discard(token)
+
+        with pytest.raises(InvalidMFAChallengeError):
+            challenge_service.resolve(token)
+
+    def test_access_token_is_not_a_challenge(self, challenge_service):
+        """Testa se um access token comum não é aceito como desafio MFA."""
+        access_token = challenge_service.key_store.encode({"sub": "user-id", "email": "test@example.com"})
+
+        with pytest.raises(InvalidMFAChallengeError):
+            challenge_service.resolve(access_token)
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+
+from core.exceptions.user_exceptions import PasswordHasherOverloadedError
+from infrastucture.security.password import BCryptPasswordHasher, PasswordHashingService, build_crypt_context
+
+
+class TestPasswordHashingService:
+    @pytest.fixture
+    def hashing_service(self):
+        service = PasswordHashingService(max_workers=1, max_inflight=2)
+        yield service
+        service.shutdown()
+
+    @pytest.mark.asyncio
+    async def test_hash_and_verify_in_pool(self, hashing_service):
+        """Testa se o hash gerado no pool é verificado corretamente."""
+        hasher = BCryptPasswordHasher(hashing_service)
+
+        hashed = await hasher.hash_password_async("senha_segura")
+
+        assert hashed != "senha_segura"
+        assert await hasher.verify_password_async("senha_segura", hashed) is True
+        assert await hasher.verify_password_async("senha_errada", hashed) is False
+        # O hash do pool também deve ser aceito pela verificação síncrona
+        assert hasher.verify_password("senha_segura", hashed) is True
+
+    @pytest.mark.asyncio
+    async def test_rejects_when_inflight_limit_reached(self, hashing_service):
+        """Testa se requisições acima do limite são rejeitadas antes do bcrypt."""
+        hasher = BCryptPasswordHasher(hashing_service)
+
+        results = await asyncio.gather(
+            *(hasher.hash_password_async("senha_segura") for _ in range(4)),
+            return_exceptions=True
+        )
+
+        rejected = [r for r in results if isinstance(r, PasswordHasherOverloadedError)]
+        assert len(rejected) == 2
+
+        stats = hashing_service.get_stats()
+        assert stats["rejected"] == 2
+        assert stats["completed"] == 2
+        assert stats["inflight"] == 0
+        assert stats["latency_ms"]["p50"] is not None
+
+
+class TestPasswordHashCost:
+    def test_needs_update_when_rounds_change(self):
+        """Testa se hashes com custo diferente do configurado são marcados para rehash."""
+        old_hash = build_crypt_context(bcrypt_rounds=4).hash("senha_segura")
+        context = build_crypt_context(bcrypt_rounds=5)
+
+        assert context.needs_update(old_hash) is True
+        assert context.needs_update(context.hash("senha_segura")) is False
+        # O hash antigo continua válido até ser refeito
+        assert context.verify("senha_segura", old_hash) is True
@@ -0,0 +1,85 @@
+import time
+import uuid
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from core.entities.user import User
+from infrastucture.security.principal_cache import PrincipalCache
+
+
+def make_user():
+    return User(
+        id=uuid.uuid4(),
+        email="test@example.com",
+        hashed_password="hashed_password",
+        is_active=True,
+        is_admin=False
+    )
+
+
+class TestPrincipalCache:
+    def test_returns_cached_user(self):
+        """Testa se o usuário armazenado é retornado pelo mesmo token."""
+        cache = PrincipalCache(max_size=10, ttl_seconds=60)
+        user = make_user()
+
+        cache.set("token", {"sub": str(user.id)}, user)
+        claims, cached_user = cache.get("token")
+
+        assert claims["sub"] == str(user.id)
+        assert cached_user.id == user.id
+        assert cache.get("outro_token") is None
+
+    def test_entry_bounded_by_token_exp(self):
+        """Testa se a entrada não sobrevive ao exp do token."""
+        cache = PrincipalCache(max_size=10, ttl_seconds=60)
+        user = make_user()
+
+        cache.set("token", {"sub": str(user.id), "exp": time.time() - 1}, user)
+
+        assert cache.get("token") is None
+
+    def test_invalidate_user_removes_all_tokens(self):
+        """Testa se a invalidação remove todos os tokens do usuário."""
+        cache = PrincipalCache(max_size=10, ttl_seconds=60)
+        user = make_user()
+        other_user = make_user()
+
+        cache.set("token_1", {}, user)
+        cache.set("token_2", {}, user)
+        cache.set("token_3", {}, other_user)
+        cache.invalidate_user(user.id)
+
+        assert cache.get("token_1") is None
+        assert cache.get("token_2") is None
+        assert cache.get("token_3") is not None
+
+    def test_invalidate_on_commit_drops_entries_cached_before_commit(self):
+        """Testa se a linha antiga colocada de volta no cache antes do commit é removida após o commit."""
+        cache = PrincipalCache(max_size=10, ttl_seconds=60)
+        user = make_user()
+        cache.set("token", {}, user)
+
+        with Session(create_engine("sqlite://")) as session:
+            cache.invalidate_user_on_commit(session, user.id)
+            assert cache.get("token") is None
+
+            # Requisição concorrente lê a linha ainda não confirmada e a coloca de volta
+            cache.set("token", {}, user)
+            session.commit()
+
+        assert cache.get("token") is None
+
+    def test_evicts_least_recently_used(self):
+        """Testa se a entrada menos usada é descartada ao atingir o limite."""
+        cache = PrincipalCache(max_size=2, ttl_seconds=60)
+
+        cache.set("token_1", {}, make_user())
+        cache.set("token_2", {}, make_user())
+        cache.get("token_1")
+        cache.set("token_3", {}, make_user())
+
+        assert cache.get("token_1") is not None
+        assert cache.get("token_2") is None
+        assert cache.get("token_3") is not None
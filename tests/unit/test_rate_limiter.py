@@ -0,0 +1,96 @@
+import ipaddress
+import pytest
+from unittest.mock import patch
+
+from starlette.requests import Request
+
+from core.exceptions.user_exceptions import TooManyLoginAttemptsError
+from infrastucture.security.rate_limiter import InMemoryRateLimitBackend, LoginThrottle, client_ip
+
+
+class TestInMemoryRateLimitBackend:
+    @pytest.mark.asyncio
+    async def test_counts_hits_in_current_window(self):
+        """Testa se as tentativas são contadas por chave."""
+        backend = InMemoryRateLimitBackend()
+
+        with patch("infrastucture.security.rate_limiter.time.time", return_value=1000.0):
+            assert await backend.hit("a", 60) == 1
+            assert await backend.hit("a", 60) == 2
+            assert await backend.hit("b", 60) == 1
+
+    @pytest.mark.asyncio
+    async def test_previous_window_is_weighted(self):
+        """Testa se a janela anterior pesa proporcionalmente ao tempo restante."""
+        backend = InMemoryRateLimitBackend()
+
+        # 4 tentativas no fim da janela [960, 1020)
+        with patch("infrastucture.security.rate_limiter.time.time", return_value=1019.0):
+            for _ in range(4):
+                await backend.hit("a", 60)
+
+        # Metade da janela seguinte: 4 * 0.5 + 1
+        with patch("infrastucture.security.rate_limiter.time.time", return_value=1050.0):
+            assert await backend.hit("a", 60) == pytest.approx(3.0)
+
+        # Duas janelas depois, o histórico é descartado
+        with patch("infrastucture.security.rate_limiter.time.time", return_value=1200.0):
+            assert await backend.hit("a", 60) == 1
+
+
+class TestLoginThrottle:
+    @pytest.mark.asyncio
+    async def test_rejects_after_email_limit(self):
+        """Testa se o email é bloqueado após o limite, sem afetar outros emails."""
+        throttle = LoginThrottle(InMemoryRateLimitBackend(), email_limit=2, ip_limit=100, window_seconds=60)
+
+        await throttle.check("Vitima@Example.com", "10.0.0.1")
+        await throttle.check("vitima@example.com", "10.0.0.2")
+
+        with pytest.raises(TooManyLoginAttemptsError) as exc_info:
+            await throttle.check("vitima@example.com", "10.0.0.3")
+
+        assert exc_info.value.retry_after == 60
+        await throttle.check("outro@example.com", "10.0.0.1")
+        assert throttle.get_stats()["rejected"] == {"ip": 0, "email": 1}
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_ip_limit(self):
+        """Testa se um IP tentando vários emails é bloqueado."""
+        throttle = LoginThrottle(InMemoryRateLimitBackend(), email_limit=100, ip_limit=3, window_seconds=60)
+
+        for i in range(3):
+            await throttle.check(f"user{i}@example.com", "10.0.0.1")
+
+        with pytest.raises(TooManyLoginAttemptsError):
+            await throttle.check("user9@example.com", "10.0.0.1")
+
+        assert throttle.get_stats()["rejected"]["ip"] == 1
+
+
+def make_request(peer, forwarded_for=None):
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    return Request({"type": "http", "client": (peer, 50000), "headers": headers})
+
+
+class TestClientIp:
+    TRUSTED = [ipaddress.ip_network("10.0.0.0/8")]
+
+    def test_uses_forwarded_address_from_trusted_proxy(self):
+        """Testa se, atrás do balanceador, o IP vem do cabeçalho e não do próprio proxy."""
+        request = make_request("10.0.0.5", "203.0.113.7, 10.0.0.9")
+
+        assert client_ip(request, self.TRUSTED) == "203.0.113.7"
+
+    def test_ignores_spoofed_addresses_left_of_the_proxy(self):
+        """Testa se endereços inseridos pelo cliente antes do proxy não são usados."""
+        request = make_request("10.0.0.5", "1.2.3.4, 198.51.100.20")
+
+        assert client_ip(request, self.TRUSTED) == "198.51.100.20"
+
+    def test_ignores_header_from_untrusted_peer(self):
+        """Testa se o cabeçalho é ignorado quando a conexão não vem de um proxy confiável."""
+        request = make_request("198.51.100.20", "1.2.3.4")
+
+        assert client_ip(request, self.TRUSTED) == "198.51.100.20"
+        assert client_ip(make_request("10.0.0.5", "1.2.3.4"), []) == "10.0.0.5"
@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import MagicMock
+
+from infrastucture.database.init_enum import document_type_enum_version, run_schema_steps
+
+
+def make_connection(applied_versions, enum_labels=()):
+    """Conexão falsa que responde às consultas de schema_versions e pg_enum"""
+    connection = MagicMock()
+
+    def execute(statement, parameters=None):
+        sql = str(statement)
+        result = MagicMock()
+        if "FROM schema_versions" in sql:
+            result.fetchall.return_value = list(applied_versions.items())
+        elif "pg_enum" in sql:
+            result.fetchall.return_value = [(label,) for label in enum_labels]
+        return result
+
+    connection.execute.side_effect = execute
+    return connection
+
+
+def executed_sql(connection):
+    return [str(call.args[0]) for call in connection.execute.call_args_list]
+
+
+class TestSchemaSteps:
+    def test_skips_steps_already_recorded(self):
+        """Testa se nenhum DDL é emitido quando a versão registrada é a atual."""
+        connection = make_connection({"documenttype_enum": document_type_enum_version()})
+
+        applied = run_schema_steps(connection)
+
+        assert applied == []
+        statements = executed_sql(connection)
+        assert "pg_advisory_xact_lock" in statements[0]
+        assert len(statements) == 2
+
+    def test_applies_and_records_outdated_step(self):
+        """Testa se o enum é criado e a versão registrada quando não há registro."""
+        connection = make_connection({})
+
+        applied = run_schema_steps(connection)
+
+        assert applied == ["documenttype_enum"]
+        statements = executed_sql(connection)
+        assert any("CREATE TYPE documenttype" in sql for sql in statements)
+        assert "INSERT INTO schema_versions" in statements[-1]
+        assert connection.execute.call_args_list[-1].args[1]["version"] == document_type_enum_version()
+
+    def test_adds_only_missing_enum_values(self):
+        """Testa se apenas os valores ausentes são adicionados a um enum existente."""
+        connection = make_connection({"documenttype_enum": "versao-antiga"}, ["ID", "CPF", "PASSPORT", "OUTRO"])
+
+        run_schema_steps(connection)
+
+        alters = [sql for sql in executed_sql(connection) if "ALTER TYPE" in sql]
+        assert alters == ["ALTER TYPE documenttype ADD VALUE IF NOT EXISTS 'DRIVING_LICENSE'"]
@@ -0,0 +1,66 @@
+import base64
+from datetime import datetime, timezone
+
+from core.entities.document import DocumentType
+from infrastucture.database.seed import (
+    CARD_COLUMNS,
+    CARD_TRANSACTION_COLUMNS,
+    DOCUMENT_COLUMNS,
+    USER_COLUMNS,
+    SyntheticDataGenerator,
+    write_placeholder_files,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def make_generator(**kwargs):
+    return SyntheticDataGenerator(hashed_password="hash", seed=7, prefix="teste", now=NOW, **kwargs)
+
+
+class TestSyntheticDataGenerator:
+    def test_batch_is_deterministic_for_the_same_seed(self):
+        """Testa se a mesma semente gera exatamente os mesmos registros."""
+        assert make_generator().batch(0, 200) == make_generator().batch(0, 200)
+
+    def test_mfa_secrets_are_base32_totp_secrets(self):
+        """Testa se os usuários com MFA recebem segredos base32 de 160 bits, e os demais nenhum."""
+        users, _, _, _ = make_generator().batch(0, 500)
+        mfa_index, secret_index = USER_COLUMNS.index("mfa_enabled"), USER_COLUMNS.index("mfa_secret")
+
+        secrets = [user[secret_index] for user in users if user[mfa_index]]
+        assert secrets and all(len(base64.b32decode(secret)) == 20 for secret in secrets)
+        assert all(user[secret_index] is None for user in users if not user[mfa_index])
+
+    def test_records_match_columns_and_references(self):
+        """Testa se os registros têm as colunas do COPY e apontam para usuários do mesmo lote."""
+        users, cards, documents, card_transactions = make_generator().batch(0, 1000)
+
+        user_ids = {user[0] for user in users}
+        assert all(len(user) == len(USER_COLUMNS) for user in users)
+        assert all(len(card) == len(CARD_COLUMNS) for card in cards)
+        assert all(len(document) == len(DOCUMENT_COLUMNS) for document in documents)
+        assert len({user[1] for user in users}) == 1000
+        assert {card[1] for card in cards} <= user_ids
+        assert len({card[1] for card in cards}) == len(cards)
+        assert {document[1] for document in documents} <= user_ids
+        assert {document[2] for document in documents} <= {t.value for t in DocumentType}
+        assert all(len(transaction) == len(CARD_TRANSACTION_COLUMNS) for transaction in card_transactions)
+        # Um lançamento de saldo inicial por cartão, igual ao saldo
+        assert {(t[1], t[4]) for t in card_transactions} == {(card[0], card[2]) for card in cards}
+
+    def test_distributions_follow_configuration(self):
+        """Testa se a fração de cartões e a média de documentos ficam perto do configurado."""
+        users, cards, documents, _ = make_generator(card_ratio=0.5, documents_mean=3.0).batch(0, 5000)
+
+        assert 0.45 < len(cards) / len(users) < 0.55
+        assert 2.7 < len(documents) / len(users) < 3.3
+
+    def test_placeholder_files_are_written_once(self, tmp_path):
+        """Testa se os arquivos compartilhados por tipo são criados uma única vez."""
+        generator = make_generator()
+        _, _, documents, _ = generator.batch(0, 100)
+
+        assert write_placeholder_files(str(tmp_path), generator) == len(DocumentType)
+        assert write_placeholder_files(str(tmp_path), generator) == 0
+        assert all((tmp_path / document[3]).exists() for document in documents)
@@ -0,0 +1,291 @@
+import pytest
+import uuid
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from unittest.mock import AsyncMock
+
+from pydantic import ValidationError
+
+from core.entities.card_transaction import CardTransaction, CardTransactionType
+from core.entities.charge_event import ChargeEvent, ChargeEventStatus
+from core.entities.ids import uuid7
+from core.entities.transport_card import TransportCard
+from core.entities.user import User
+from core.exceptions.transport_exceptions import InsufficientBalanceError, InvalidAmountError, TransportCardNotFoundError
+from core.use_cases.transport_card_use_cases import (
+    ChargeBatchUseCase, ChargeTransportCardUseCase, GetCardStatementUseCase, RechargeTransportCardUseCase
+)
+from infrastucture.api.dtos.transport_dtos import CardChargeEvent, decode_statement_cursor, encode_statement_cursor
+
+
+@pytest.fixture
+def user():
+    return User(email="test@example.com", hashed_password="hash", is_active=True, is_admin=False)
+
+
+@pytest.fixture
+def user_repository_mock(user):
+    repository = AsyncMock()
+    repository.get_by_id.return_value = user
+    return repository
+
+
+@pytest.fixture
+def transport_card_repository_mock():
+    return AsyncMock()
+
+
+class TestRechargeTransportCardUseCase:
+    @pytest.mark.asyncio
+    async def test_recharge_adds_balance_in_database(self, user, user_repository_mock, transport_card_repository_mock):
+        """Testa se a recarga é feita por um único incremento no banco, sem ler o cartão antes."""
+        # Arrange
+        card = TransportCard(user_id=user.id, balance=Decimal("15.00"))
+        transport_card_repository_mock.add_balance.return_value = card
+        use_case = RechargeTransportCardUseCase(transport_card_repository_mock, user_repository_mock)
+
+        # Act
+        result = await use_case.execute(user.id, Decimal("10.00"))
+
+        # Assert
+        assert result == card
+        transport_card_repository_mock.add_balance.assert_called_once_with(user.id, Decimal("10.00"), None)
+        transport_card_repository_mock.get_by_user_id.assert_not_called()
+        transport_card_repository_mock.update.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_recharge_rejects_non_positive_amount(self, user, user_repository_mock, transport_card_repository_mock):
+        """Testa se valores não positivos são recusados antes de ir ao banco."""
+        use_case = RechargeTransportCardUseCase(transport_card_repository_mock, user_repository_mock)
+
+        with pytest.raises(InvalidAmountError):
+            await use_case.execute(user.id, Decimal("0"))
+
+        transport_card_repository_mock.add_balance.assert_not_called()
+
+
+class TestChargeTransportCardUseCase:
+    @pytest.mark.asyncio
+    async def test_charge_deducts_balance_in_database(self, user, user_repository_mock, transport_card_repository_mock):
+        """Testa se a cobrança com saldo é um único débito condicional no banco."""
+        # Arrange
+        card = TransportCard(user_id=user.id, balance=Decimal("5.60"))
+        transport_card_repository_mock.deduct_balance.return_value = card
+        use_case = ChargeTransportCardUseCase(transport_card_repository_mock, user_repository_mock)
+
+        # Act
+        result = await use_case.execute(user.id, Decimal("4.40"), "Passagem de ônibus")
+
+        # Assert
+        assert result == card
+        transport_card_repository_mock.deduct_balance.assert_called_once_with(user.id, Decimal("4.40"), "Passagem de ônibus")
+        transport_card_repository_mock.get_by_user_id.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_charge_without_balance_raises_insufficient_balance(self, user, user_repository_mock, transport_card_repository_mock):
+        """Testa se o débito recusado pelo banco com cartão existente vira saldo insuficiente."""
+        # Arrange
+        transport_card_repository_mock.deduct_balance.return_value = None
+        transport_card_repository_mock.get_by_user_id.return_value = TransportCard(user_id=user.id, balance=Decimal("1.00"))
+        use_case = ChargeTransportCardUseCase(transport_card_repository_mock, user_repository_mock)
+
+        # Act & Assert
+        with pytest.raises(InsufficientBalanceError):
+            await use_case.execute(user.id, Decimal("4.40"))
+
+    @pytest.mark.asyncio
+    async def test_charge_without_card_raises_not_found(self, user_repository_mock, transport_card_repository_mock):
+        """Testa se o débito recusado sem cartão vira cartão não encontrado."""
+        # Arrange
+        transport_card_repository_mock.deduct_balance.return_value = None
+        transport_card_repository_mock.get_by_user_id.return_value = None
+        use_case = ChargeTransportCardUseCase(transport_card_repository_mock, user_repository_mock)
+
+        # Act & Assert
+        with pytest.raises(TransportCardNotFoundError):
+            await use_case.execute(uuid.uuid4(), Decimal("4.40"))
+
+
+
+def make_transactions(card: TransportCard, count: int):
+    now = datetime.now(timezone.utc)
+    return [
+        CardTransaction(
+            card_id=card.id, user_id=card.user_id, transaction_type=CardTransactionType.CHARGE,
+            amount=Decimal("-4.40"), balance_after=Decimal("10.00"), created_at=now - timedelta(minutes=i)
+        )
+        for i in range(count)
+    ]
+
+
+class TestGetCardStatementUseCase:
+    @pytest.mark.asyncio
+    async def test_page_with_more_items_returns_next_key(self, user, transport_card_repository_mock):
+        """Testa se um lançamento além do limite gera a chave da próxima página a partir do último exibido."""
+        # Arrange
+        card = TransportCard(user_id=user.id, balance=Decimal("10.00"))
+        transactions = make_transactions(card, 3)
+        card_transaction_repository_mock = AsyncMock()
+        card_transaction_repository_mock.get_by_card_id.return_value = transactions
+        use_case = GetCardStatementUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        # Act
+        page, next_key = await use_case.get_page(card.id, 2)
+
+        # Assert
+        assert page == transactions[:2]
+        assert next_key == (transactions[1].created_at, transactions[1].id)
+        card_transaction_repository_mock.get_by_card_id.assert_called_once_with(card.id, 3, None)
+
+    @pytest.mark.asyncio
+    async def test_last_page_has_no_next_key(self, user, transport_card_repository_mock):
+        """Testa se a última página não devolve chave de continuação."""
+        # Arrange
+        card = TransportCard(user_id=user.id, balance=Decimal("10.00"))
+        transactions = make_transactions(card, 2)
+        before = (datetime.now(timezone.utc), uuid.uuid4())
+        card_transaction_repository_mock = AsyncMock()
+        card_transaction_repository_mock.get_by_card_id.return_value = transactions
+        use_case = GetCardStatementUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        # Act
+        page, next_key = await use_case.get_page(card.id, 2, before)
+
+        # Assert
+        assert page == transactions
+        assert next_key is None
+        card_transaction_repository_mock.get_by_card_id.assert_called_once_with(card.id, 3, before)
+
+    @pytest.mark.asyncio
+    async def test_statement_without_card_raises_not_found(self, transport_card_repository_mock):
+        """Testa se o extrato de usuário sem cartão vira cartão não encontrado."""
+        # Arrange
+        transport_card_repository_mock.get_by_user_id.return_value = None
+        use_case = GetCardStatementUseCase(transport_card_repository_mock, AsyncMock())
+
+        # Act & Assert
+        with pytest.raises(TransportCardNotFoundError):
+            await use_case.get_card(uuid.uuid4())
+
+
+class TestStatementCursor:
+    def test_cursor_round_trip(self):
+        """Testa se o cursor opaco devolve exatamente a chave (created_at, id) codificada."""
+        key = (datetime(2026, 10, 17, 12, 30, 15, 123456, tzinfo=timezone.utc), uuid.uuid4())
+
+        cursor = encode_statement_cursor(key)
+
+        assert "=" not in cursor
+        assert decode_statement_cursor(cursor) == key
+
+    @pytest.mark.parametrize("cursor", ["nao-e-cursor", "", "W10", "WyJ4IiwieSJd"])
+    def test_invalid_cursor_raises_value_error(self, cursor):
+        """Testa se cursores adulterados são recusados com ValueError."""
+        with pytest.raises(ValueError):
+            decode_statement_cursor(cursor)
+
+
+class TestChargeBatchUseCase:
+    @pytest.fixture
+    def card(self, user):
+        return TransportCard(user_id=user.id, balance=Decimal("10.00"))
+
+    @pytest.fixture
+    def card_transaction_repository_mock(self):
+        repository = AsyncMock()
+        repository.get_existing_ids.return_value = set()
+        return repository
+
+    @pytest.mark.asyncio
+    async def test_taps_are_applied_in_order_on_running_balance(self, user, card, transport_card_repository_mock, card_transaction_repository_mock):
+        """Testa se as passagens do mesmo cartão são decididas em ordem sobre o saldo corrente e gravadas de uma vez."""
+        # Arrange
+        transport_card_repository_mock.lock_by_user_ids.return_value = {user.id: card}
+        events = [ChargeEvent(uuid.uuid4(), user.id, Decimal(amount)) for amount in ("4.40", "4.40", "4.40", "1.20")]
+        use_case = ChargeBatchUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        # Act
+        results = await use_case.execute(events)
+
+        # Assert
+        assert [result.status for result in results] == [
+            ChargeEventStatus.ACCEPTED, ChargeEventStatus.ACCEPTED, ChargeEventStatus.INSUFFICIENT, ChargeEventStatus.ACCEPTED
+        ]
+        assert [result.balance for result in results] == [Decimal("5.60"), Decimal("1.20"), Decimal("1.20"), Decimal("0.00")]
+        transport_card_repository_mock.apply_charges.assert_called_once()
+        cards, transactions = transport_card_repository_mock.apply_charges.call_args.args
+        assert cards == [card] and card.balance == Decimal("0.00")
+        assert [transaction.id for transaction in transactions] == [events[0].event_id, events[1].event_id, events[3].event_id]
+        assert all(transaction.amount < 0 for transaction in transactions)
+        assert [transaction.balance_after for transaction in transactions] == [Decimal("5.60"), Decimal("1.20"), Decimal("0.00")]
+
+    @pytest.mark.asyncio
+    async def test_duplicates_and_unknown_users_are_reported(self, user, card, transport_card_repository_mock, card_transaction_repository_mock):
+        """Testa se eventos já lançados, repetidos no lote ou sem cartão não são cobrados."""
+        # Arrange
+        already_recorded = ChargeEvent(uuid.uuid4(), user.id, Decimal("1.00"))
+        repeated = ChargeEvent(uuid.uuid4(), user.id, Decimal("1.00"))
+        without_card = ChargeEvent(uuid.uuid4(), uuid.uuid4(), Decimal("1.00"))
+        transport_card_repository_mock.lock_by_user_ids.return_value = {user.id: card}
+        card_transaction_repository_mock.get_existing_ids.return_value = {already_recorded.event_id}
+        use_case = ChargeBatchUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        # Act
+        results = await use_case.execute([already_recorded, repeated, repeated, without_card])
+
+        # Assert
+        assert [result.status for result in results] == [
+            ChargeEventStatus.DUPLICATE, ChargeEventStatus.ACCEPTED, ChargeEventStatus.DUPLICATE, ChargeEventStatus.NOT_FOUND
+        ]
+        _, transactions = transport_card_repository_mock.apply_charges.call_args.args
+        assert [transaction.id for transaction in transactions] == [repeated.event_id]
+
+    @pytest.mark.asyncio
+    async def test_batch_without_accepted_taps_writes_nothing(self, transport_card_repository_mock, card_transaction_repository_mock):
+        """Testa se um lote sem passagens aceitas não executa a gravação."""
+        # Arrange
+        transport_card_repository_mock.lock_by_user_ids.return_value = {}
+        use_case = ChargeBatchUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        # Act
+        results = await use_case.execute([ChargeEvent(uuid.uuid4(), uuid.uuid4(), Decimal("4.40"))])
+
+        # Assert
+        assert results[0].status == ChargeEventStatus.NOT_FOUND
+        transport_card_repository_mock.apply_charges.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_non_positive_amount(self, transport_card_repository_mock, card_transaction_repository_mock):
+        """Testa se um valor não positivo recusa o lote antes de bloquear os cartões."""
+        use_case = ChargeBatchUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        with pytest.raises(InvalidAmountError):
+            await use_case.execute([ChargeEvent(uuid.uuid4(), uuid.uuid4(), Decimal("0"))])
+
+        transport_card_repository_mock.lock_by_user_ids.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_batch_rejects_amount_with_more_than_two_decimal_places(self, transport_card_repository_mock, card_transaction_repository_mock):
+        """Testa se um valor com mais de duas casas decimais recusa o lote em vez de ser arredondado no banco."""
+        use_case = ChargeBatchUseCase(transport_card_repository_mock, card_transaction_repository_mock)
+
+        with pytest.raises(InvalidAmountError):
+            await use_case.execute([ChargeEvent(uuid.uuid4(), uuid.uuid4(), Decimal("4.405"))])
+
+        transport_card_repository_mock.lock_by_user_ids.assert_not_called()
+
+    @pytest.mark.parametrize("amount", ["4.405", "100000000.00"])
+    def test_event_amount_is_limited_to_card_balance_precision(self, amount):
+        """Testa se o corpo do lote recusa valores fora de NUMERIC(10,2)."""
+        with pytest.raises(ValidationError):
+            CardChargeEvent(event_id=uuid7(), user_id=uuid.uuid4(), amount=Decimal(amount))
+
+        assert CardChargeEvent(event_id=uuid7(), user_id=uuid.uuid4(), amount=Decimal("4.40")).amount == Decimal("4.40")
+
+    def test_event_id_must_be_uuid7(self):
+        """Testa se o corpo do lote recusa event_id que não seja UUIDv7, pois o extrato ordena o lote pelo id."""
+        with pytest.raises(ValidationError):
+            CardChargeEvent(event_id=uuid.uuid4(), user_id=uuid.uuid4(), amount=Decimal("4.40"))
+
+        event_id = uuid7()
+        assert CardChargeEvent(event_id=event_id, user_id=uuid.uuid4(), amount=Decimal("4.40")).event_id == event_id
@@ -1,20 +1,27 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import uuid
 
 from core.entities.user import User
-from core.exceptions.user_exceptions import UserAlreadyExistsError, InvalidCredentialsError
-from core.use_cases.user_use_cases import RegisterUserUseCase, LoginUserUseCase, GetUserUseCase
+from core.entities.refresh_token import RefreshToken
+from core.exceptions.user_exceptions import (
+    UserAlreadyExistsError, InvalidCredentialsError, InvalidRefreshTokenError, RefreshTokenReuseError,
+    MFARequiredError, InvalidMFAChallengeError
+)
+from core.use_cases.user_use_cases import (
+    RegisterUserUseCase, LoginUserUseCase, GetUserUseCase,
+    IssueRefreshTokenUseCase, RefreshAccessTokenUseCase, hash_refresh_token,
+    LoginFirstStepUseCase, LoginWithMFAUseCase
+)
+from infrastucture.repositories.user_repository import SQLAlchemyUserRepository
 
 class TestRegisterUserUseCase:
     @pytest.fixture
     def user_repository_mock(self):
         repository = AsyncMock()
-        # Por padrão, get_by_email retorna None (usuário não existe)
-        repository.get_by_email.return_value = None
-        # Por padrão, create retorna um usuário válido
-        repository.create.return_value = User(
+        # Por padrão, create_if_absent retorna um usuário válido (email livre)
+        repository.create_if_absent.return_value = User(
             id=uuid.uuid4(),
             email="test@example.com",
             hashed_password="hashed_password",
@@ -28,8 +35,8 @@ class TestRegisterUserUseCase:
     @pytest.fixture
     def password_hasher_mock(self):
         hasher = MagicMock()
-        hasher.hash_password.return_value = "hashed_password"
-        hasher.verify_password.return_value = True
+        hasher.hash_password_async = AsyncMock(return_value="hashed_password")
+        hasher.verify_password_async = AsyncMock(return_value=True)
         return hasher
     
     @pytest.mark.asyncio
@@ -48,24 +55,17 @@ class TestRegisterUserUseCase:
         assert user.email == email
         assert user.is_active is True
         
-        # Verificar se os métodos foram chamados corretamente
-        user_repository_mock.get_by_email.assert_called_once_with(email)
-        password_hasher_mock.hash_password.assert_called_once_with(password)
-        user_repository_mock.create.assert_called_once()
+        # Verificar se os métodos foram chamados corretamente: uma única ida ao banco
+        user_repository_mock.get_by_email.assert_not_called()
+        password_hasher_mock.hash_password_async.assert_called_once_with(password)
+        user_repository_mock.create_if_absent.assert_called_once()
         
     @pytest.mark.asyncio
     async def test_register_existing_user_raises_error(self, user_repository_mock, password_hasher_mock):
         """Testa se um erro é lançado quando tentamos registrar um usuário que já existe."""
         # Arrange
-        # Configurando o mock para simular usuário já existente
-        existing_user = User(
-            id=uuid.uuid4(),
-            email="existing@example.com",
-            hashed_password="hashed_password",
-            is_active=True,
-            is_admin=False
-        )
-        user_repository_mock.get_by_email.return_value = existing_user
+        # Configurando o mock para simular conflito no INSERT (email já existente)
+        user_repository_mock.create_if_absent.return_value = None
         
         use_case = RegisterUserUseCase(user_repository_mock, password_hasher_mock)
         
@@ -74,8 +74,8 @@ class TestRegisterUserUseCase:
             await use_case.execute("existing@example.com", "password")
         
         # Verificar se os métodos foram chamados corretamente
-        user_repository_mock.get_by_email.assert_called_once()
-        password_hasher_mock.hash_password.assert_not_called()
+        user_repository_mock.get_by_email.assert_not_called()
+        user_repository_mock.create_if_absent.assert_called_once()
         user_repository_mock.create.assert_not_called()
 
 class TestLoginUserUseCase:
@@ -96,7 +96,9 @@ class TestLoginUserUseCase:
     @pytest.fixture
     def password_hasher_mock(self):
         hasher = MagicMock()
-        hasher.verify_password.return_value = True
+        hasher.verify_password_async = AsyncMock(return_value=True)
+        hasher.hash_password_async = AsyncMock(return_value="new_hashed_password")
+        hasher.needs_rehash.return_value = False
         return hasher
     
     @pytest.fixture
@@ -128,7 +130,7 @@ class TestLoginUserUseCase:
         
         # Verificar chamadas de métodos
         user_repository_mock.get_by_email.assert_called_once_with("test@example.com")
-        password_hasher_mock.verify_password.assert_called_once_with("correct_password", "hashed_password")
+        password_hasher_mock.verify_password_async.assert_called_once_with("correct_password", "hashed_password")
         token_service_mock.create_access_token.assert_called_once()
     
     @pytest.mark.asyncio
@@ -149,14 +151,14 @@ class TestLoginUserUseCase:
         
         # Verificar chamadas de métodos
         user_repository_mock.get_by_email.assert_called_once_with("wrong@example.com")
-        password_hasher_mock.verify_password.assert_not_called()
+        password_hasher_mock.verify_password_async.assert_not_called()
         token_service_mock.create_access_token.assert_not_called()
     
     @pytest.mark.asyncio
     async def test_login_invalid_password(self, user_repository_mock, password_hasher_mock, token_service_mock):
         """Testa se um erro é lançado quando a senha está incorreta."""
         # Arrange
-        password_hasher_mock.verify_password.return_value = False
+        password_hasher_mock.verify_password_async.return_value = False
         use_case = LoginUserUseCase(
             user_repository_mock, 
             password_hasher_mock, 
@@ -170,5 +172,229 @@ class TestLoginUserUseCase:
         
         # Verificar chamadas de métodos
         user_repository_mock.get_by_email.assert_called_once_with("test@example.com")
-        password_hasher_mock.verify_password.assert_called_once()
-        token_service_mock.create_access_token.assert_not_called() 
\ No newline at end of file
+        password_hasher_mock.verify_password_async.assert_called_once()
+        token_service_mock.create_access_token.assert_not_called() 
+    
+    @pytest.mark.asyncio
+    async def test_login_rehashes_outdated_hash(self, user_repository_mock, password_hasher_mock, token_service_mock):
+        """Testa se um hash com custo desatualizado é refeito de forma transparente no login."""
+        # Arrange
+        password_hasher_mock.needs_rehash.return_value = True
+        use_case = LoginUserUseCase(
+            user_repository_mock, 
+            password_hasher_mock, 
+            token_service_mock, 
+            30
+        )
+        
+        # Act
+        result = await use_case.execute("test@example.com", "correct_password")
+        
+        # Assert
+        assert result["access_token"] == "test_token"
+        password_hasher_mock.hash_password_async.assert_called_once_with("correct_password")
+        user_repository_mock.update_password_hash.assert_called_once_with(self.test_user.id, "new_hashed_password")
+        user_repository_mock.update.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_login_succeeds_when_rehash_fails(self, user_repository_mock, password_hasher_mock, token_service_mock):
+        """Testa se uma falha ao refazer o hash não impede o login."""
+        # Arrange
+        password_hasher_mock.needs_rehash.return_value = True
+        user_repository_mock.update_password_hash.side_effect = Exception("Falha no banco")
+        use_case = LoginUserUseCase(
+            user_repository_mock, 
+            password_hasher_mock, 
+            token_service_mock, 
+            30
+        )
+        
+        # Act
+        result = await use_case.execute("test@example.com", "correct_password")
+        
+        # Assert
+        assert result["access_token"] == "test_token"
+    
+    @pytest.mark.asyncio
+    async def test_failed_rehash_update_is_isolated_in_savepoint(self, password_hasher_mock, token_service_mock):
+        """Testa se o UPDATE do hash com erro fica em um savepoint e o login ainda emite os tokens."""
+        # Arrange
+        savepoint = MagicMock()
+        savepoint.__aenter__ = AsyncMock()
+        savepoint.__aexit__ = AsyncMock(return_value=False)
+        session = MagicMock()
+        session.begin_nested.return_value = savepoint
+        session.execute = AsyncMock(side_effect=Exception("null value in column \"hashed_password\""))
+        user_repository = SQLAlchemyUserRepository(session)
+        user_repository.get_by_email = AsyncMock(return_value=User(
+            email="test@example.com", hashed_password="hashed_password", is_active=True, is_admin=False
+        ))
+        refresh_token_issuer = AsyncMock()
+        refresh_token_issuer.execute.return_value = ("refresh_token", MagicMock())
+        password_hasher_mock.needs_rehash.return_value = True
+        use_case = LoginUserUseCase(user_repository, password_hasher_mock, token_service_mock, 30, refresh_token_issuer)
+        
+        # Act
+        result = await use_case.execute("test@example.com", "correct_password")
+        
+        # Assert
+        assert result["access_token"] == "test_token"
+        assert result["refresh_token"] == "refresh_token"
+        session.begin_nested.assert_called_once()
+        # O savepoint recebeu o erro (ROLLBACK TO SAVEPOINT) em vez de deixá-lo abortar a transação
+        assert savepoint.__aexit__.call_args.args[0] is Exception
+
+class TestLoginWithMFAChallenge:
+    @pytest.fixture
+    def test_user(self):
+        return User(
+            id=uuid.uuid4(),
+            email="test@example.com",
+            hashed_password="hashed_password",
+            is_active=True,
+            is_admin=False,
+            mfa_enabled=True,
+            mfa_secret="SECRET"
+        )
+    
+    @pytest.fixture
+    def user_repository_mock(self, test_user):
+        repository = AsyncMock()
+        repository.get_by_email.return_value = test_user
+        repository.get_by_id.return_value = test_user
+        return repository
+    
+    @pytest.fixture
+    def password_hasher_mock(self):
+        hasher = MagicMock()
+        hasher.verify_password_async = AsyncMock(return_value=True)
+        return hasher
+    
+    @pytest.fixture
+    def mfa_service_mock(self):
+        service = MagicMock()
+        service.verify_code = AsyncMock(return_value=True)
+        return service
+    
+    @pytest.fixture
+    def challenge_service_mock(self, test_user):
+        service = MagicMock()
+        service.issue.return_value = "challenge_token"
+        service.resolve.return_value = (test_user.id, test_user)
+        return service
+    
+    @pytest.mark.asyncio
+    async def test_first_step_issues_challenge(self, user_repository_mock, password_hasher_mock, challenge_service_mock, test_user):
+        """Testa se a primeira etapa emite o desafio quando o MFA está habilitado."""
+        use_case = LoginFirstStepUseCase(user_repository_mock, password_hasher_mock, challenge_service_mock)
+        
+        with pytest.raises(MFARequiredError) as exc_info:
+            await use_case.execute("test@example.com", "correct_password")
+        
+        assert exc_info.value.user_id == test_user.id
+        assert exc_info.value.challenge_token == "challenge_token"
+    
+    @pytest.mark.asyncio
+    async def test_second_step_skips_password_and_lookup(
+        self, user_repository_mock, password_hasher_mock, mfa_service_mock, challenge_service_mock
+    ):
+        """Testa se a segunda etapa com desafio não refaz o bcrypt nem busca o usuário."""
+        token_service = MagicMock()
+        token_service.create_access_token.return_value = "test_token"
+        use_case = LoginWithMFAUseCase(
+            user_repository_mock, password_hasher_mock, token_service, mfa_service_mock, 30,
+            challenge_service=challenge_service_mock
+        )
+        
+        result = await use_case.execute_with_challenge("challenge_token", "123456")
+        
+        assert result["access_token"] == "test_token"
+        password_hasher_mock.verify_password_async.assert_not_called()
+        user_repository_mock.get_by_email.assert_not_called()
+        user_repository_mock.get_by_id.assert_not_called()
+        challenge_service_mock.discard.assert_called_once_with("challenge_token")
+    
+    @pytest.mark.asyncio
+    async def test_second_step_without_challenge_service(
+        self, user_repository_mock, password_hasher_mock, mfa_service_mock
+    ):
+        """Testa se o desafio é recusado quando o serviço de desafios não está configurado."""
+        use_case = LoginWithMFAUseCase(
+            user_repository_mock, password_hasher_mock, MagicMock(), mfa_service_mock, 30
+        )
+        
+        with pytest.raises(InvalidMFAChallengeError):
+            await use_case.execute_with_challenge("challenge_token", "123456")
+
+
+class TestRefreshAccessTokenUseCase:
+    @pytest.fixture
+    def test_user(self):
+        return User(
+            id=uuid.uuid4(),
+            email="test@example.com",
+            hashed_password="hashed_password",
+            is_active=True,
+            is_admin=False
+        )
+    
+    @pytest.fixture
+    def stored_token(self, test_user):
+        return RefreshToken(
+            user_id=test_user.id,
+            token_hash=hash_refresh_token("refresh_atual"),
+            family_id=uuid.uuid4(),
+            expires_at=datetime.now(timezone.utc) + timedelta(days=1)
+        )
+    
+    @pytest.fixture
+    def refresh_token_repository_mock(self, stored_token):
+        repository = AsyncMock()
+        repository.get_by_token_hash.return_value = stored_token
+        repository.create.side_effect = lambda token: token
+        repository.revoke.return_value = True
+        return repository
+    
+    @pytest.fixture
+    def use_case(self, refresh_token_repository_mock, test_user):
+        user_repository = AsyncMock()
+        user_repository.get_by_id.return_value = test_user
+        token_service = MagicMock()
+        token_service.create_access_token.return_value = "novo_access_token"
+        issuer = IssueRefreshTokenUseCase(refresh_token_repository_mock, 30)
+        return RefreshAccessTokenUseCase(
+            refresh_token_repository_mock, user_repository, token_service, issuer, 30
+        )
+    
+    @pytest.mark.asyncio
+    async def test_refresh_rotates_token(self, use_case, refresh_token_repository_mock, stored_token):
+        """Testa se o refresh emite novo access token e rotaciona o refresh token."""
+        result = await use_case.execute("refresh_atual")
+        
+        assert result["access_token"] == "novo_access_token"
+        assert result["refresh_token"] != "refresh_atual"
+        
+        refresh_token_repository_mock.get_by_token_hash.assert_called_once_with(hash_refresh_token("refresh_atual"))
+        new_token = refresh_token_repository_mock.create.call_args[0][0]
+        assert new_token.family_id == stored_token.family_id
+        assert new_token.token_hash == hash_refresh_token(result["refresh_token"])
+        refresh_token_repository_mock.revoke.assert_called_once_with(stored_token.id, new_token.id)
+    
+    @pytest.mark.asyncio
+    async def test_reused_token_revokes_family(self, use_case, refresh_token_repository_mock, stored_token):
+        """Testa se reutilizar um token rotacionado revoga toda a família."""
+        stored_token.revoked_at = datetime.now(timezone.utc)
+        
+        with pytest.raises(RefreshTokenReuseError):
+            await use_case.execute("refresh_atual")
+        
+        refresh_token_repository_mock.revoke_family.assert_called_once_with(stored_token.family_id)
+        refresh_token_repository_mock.create.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_unknown_token_is_rejected(self, use_case, refresh_token_repository_mock):
+        """Testa se um token desconhecido é rejeitado."""
+        refresh_token_repository_mock.get_by_token_hash.return_value = None
+        
+        with pytest.raises(InvalidRefreshTokenError):
+            await use_case.execute("token_inexistente")